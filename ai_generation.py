@@ -1,18 +1,26 @@
 import json
 import os
 import logging
-import requests
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer
-import chromadb
+import threading
+from typing import Any, List, Dict
+from commanders import DEFAULT_COMMANDER, commander_path, display_name, is_primary
+from diary_memory import MEMORY_DIR, DiaryMemory, load_memory_settings
+from embedder import load_embedder
+from instrumentation import count, span, traced
+from llm_client import chat_completion
+from loadout_tracker import DEFAULT_SHIP, LOADOUT_DIR, ship_description
+from retrieval_cache import RetrievalCache
+from rolling_summaries import DigestStore
+from search_index import index_written
+from stats_rollups import ROLLUPS_FILE, stats_lines
+from travel_index import TRAVEL_DB, travel_facts
+from vector_store import load_vector_settings, open_retrieval_backend
 
 # === CONFIG ===
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
 with open(CONFIG_PATH, "r") as f:
     config = json.load(f)
 
-LM_STUDIO_API = config.get("lm_studio_api", "")
-MODEL_NAME = config.get("model_name", "")
 BASE_DIR = os.path.dirname(__file__)
 RAG_DATA_FOLDER = os.path.join(BASE_DIR, "rag_data")
 COMMANDER_LOGS_FOLDER = os.path.join(RAG_DATA_FOLDER, "commander_logs")
@@ -21,12 +29,46 @@ PROMPT_LOG_FILE = os.path.join(BASE_DIR, "diary_prompt.log")
 os.makedirs(DIARY_OUTPUT_FOLDER, exist_ok=True)
 
 # === INIT: Embedding + Vector Store ===
-chroma_client = chromadb.PersistentClient(path="elite_rag_db")
-collection = chroma_client.get_or_create_collection("elite_dangerous_lore")
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+vector_settings = load_vector_settings(config)
+retrieval_cache = RetrievalCache(vector_settings)
+
+# The embedder (torch or onnxruntime), the retrieval backend (possibly chromadb) and the diary
+# memory are built on first use, so importing this module, e.g. for `--help`, stays cheap.
+_models: Dict[str, Any] = {}
+# Diary queue workers are threads; everything but the LLM call itself (models, caches,
+# memory indexes, the prompt log) is used under this lock.
+_state_lock = threading.RLock()
+
+def load_models() -> Dict[str, Any]:
+    with _state_lock:
+        if not _models:
+            embedder = load_embedder(config)
+            _models["embedding_model"] = embedder
+            _models["retrieval_backend"] = open_retrieval_backend(vector_settings)
+            _models["diary_memory"] = DiaryMemory(embedder, settings=load_memory_settings(config))
+    return _models
+
+# Other commanders' diary memories, keyed by memory folder; the lore collection is shared
+_memories: Dict[str, DiaryMemory] = {}
+
+def diary_memory_for(commander: str) -> DiaryMemory:
+    if is_primary(commander):
+        return load_models()["diary_memory"]
+    memory_dir = commander_path(MEMORY_DIR, commander)
+    with _state_lock:
+        if memory_dir not in _memories:
+            _memories[memory_dir] = DiaryMemory(load_models()["embedding_model"], memory_dir, settings=load_memory_settings(config))
+    return _memories[memory_dir]
+
+def __getattr__(name: str) -> Any:
+    # Keeps ai_generation.embedding_model / .retrieval_backend / .diary_memory working for callers
+    if name in ("embedding_model", "retrieval_backend", "diary_memory"):
+        return load_models()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+@traced()
 def compress_activities(activities: List[str]) -> List[str]:
     from collections import defaultdict
     prefix_counts = defaultdict(list)
@@ -44,33 +86,63 @@ def compress_activities(activities: List[str]) -> List[str]:
     return compressed
 
 def retrieve_knowledge(activities: List[str], top_k: int = 4) -> str:
-    combined = []
-    for activity in activities:
-        embedding = embedding_model.encode(activity).tolist()
+    if not activities:
+        return ""
+    with span("retrieve_knowledge", activities=len(activities), top_k=top_k) as s:
+        retrieval_cache.refresh()
+        results = {activity: retrieval_cache.get(activity, top_k) for activity in activities}
+        missing = [activity for activity, texts in results.items() if texts is None]
+        s["cache_hits"], s["cache_misses"] = len(results) - len(missing), len(missing)
+        count("retrieval_cache.hits", len(results) - len(missing))
+        count("retrieval_cache.misses", len(missing))
         try:
-            results = collection.query(query_embeddings=[embedding], n_results=top_k)
-            for md in results.get("metadatas", [[]])[0]:
-                if md.get("text"):
-                    combined.append(md["text"])
+            if missing:
+                models = load_models()
+                embeddings = models["embedding_model"].encode(missing)
+                for activity, texts in zip(missing, models["retrieval_backend"].query(embeddings, top_k)):
+                    results[activity] = texts
+                    retrieval_cache.put(activity, top_k, texts)
+                retrieval_cache.save()
         except Exception as e:
             logging.warning(f"RAG failed: {e}")
+
+    combined = []
+    for activity in activities:
+        combined.extend(results.get(activity) or [])
     return "\n".join(combined[:5]) if combined else ""
 
 def build_messages(commander: str, date: str, activities: List[str]) -> List[Dict[str, str]]:
     compressed = compress_activities(activities)
     knowledge = retrieve_knowledge(compressed)
+    try:
+        memories = diary_memory_for(commander).recall("\n".join(compressed), date)
+    except Exception as e:
+        logging.warning(f"Memory recall failed: {e}")
+        memories = []
 
+    ship = ship_description(date, commander_path(LOADOUT_DIR, commander)) or (DEFAULT_SHIP if is_primary(commander) else None)
     system_msg = {
         "role": "system",
         "content": (
-            "You are Commander Toadie Mudguts, grizzled pilot of the Krait Mk II 'Rust Lancer'. "
+            f"You are Commander {display_name(commander)}, grizzled pilot{f' of the {ship}' if ship else ''}. "
             "This is your personal log. No summaries. No analysis. No 'thinking aloud'. Just your voice."
         )
     }
 
-    user_content = f"=== LOG ENTRY: CMDR TOADIE MUDGUTS – {date} ===\n\n"
+    user_content = f"=== LOG ENTRY: CMDR {commander.upper()} – {date} ===\n\n"
+    story = DigestStore.for_commander(commander).story_so_far(date)
+    if story:
+        user_content += f"The story so far:\n{story}\n\n"
     user_content += "Another day out in the black...\n\n"
     user_content += "\n".join(f"- {line}" for line in compressed)
+    ledger = stats_lines(date, commander_path(ROLLUPS_FILE, commander))
+    if ledger:
+        user_content += "\n\nFrom the ship's ledger:\n" + "\n".join(f"- {line}" for line in ledger)
+    travel = travel_facts(date, commander_path(TRAVEL_DB, commander))
+    if travel:
+        user_content += "\n\nWorth remembering about where I've been:\n" + "\n".join(f"- {line}" for line in travel)
+    if memories:
+        user_content += "\n\nFrom my older log entries:\n" + "\n".join(f"- {memory}" for memory in memories)
     if knowledge:
         user_content += f"\n\nBits I heard around the station:\n{knowledge}"
     user_content += "\n\nClose the log however you like. End with: **[End of Log]**"
@@ -78,32 +150,36 @@ def build_messages(commander: str, date: str, activities: List[str]) -> List[Dic
     return [system_msg, {"role": "user", "content": user_content}]
 
 def generate_diary(commander: str, date: str, activities: List[str]) -> str:
-    messages = build_messages(commander, date, activities)
-    try:
-        with open(PROMPT_LOG_FILE, "w", encoding="utf-8") as f:
-            json.dump(messages, f, indent=2)
-        response = requests.post(
-            LM_STUDIO_API,
-            json={
-                "model": MODEL_NAME,
-                "messages": messages,
-                "max_tokens": 1200,
-                "temperature": 0.7,
-                "top_p": 0.9,
-            },
-            timeout=180
-        )
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
-    except Exception as e:
-        logging.error(f"Error generating diary: {e}")
-        return "Error: Unable to generate diary entry."
+    """Returns the diary text; raises if the LLM call fails, so nothing is saved for a failed entry."""
+    with span("generate_diary", date=date, activities=len(activities)) as s:
+        with _state_lock:
+            with span("build_messages"):
+                messages = build_messages(commander, date, activities)
+            with open(PROMPT_LOG_FILE, "w", encoding="utf-8") as f:
+                json.dump(messages, f, indent=2)
+        s["prompt_tokens_estimate"] = sum(len(m["content"]) for m in messages) // 4
+        try:
+            return chat_completion(messages, max_tokens=1200, temperature=0.7, top_p=0.9, config=config)
+        except Exception as e:
+            logging.error(f"Error generating diary: {e}")
+            s["error"] = str(e)
+            raise
 
-def save_diary(date: str, content: str):
-    output_path = os.path.join(DIARY_OUTPUT_FOLDER, f"{date}.txt")
+def save_diary(date: str, content: str, commander: str = DEFAULT_COMMANDER):
+    output_folder = commander_path(DIARY_OUTPUT_FOLDER, commander)
+    output_path = os.path.join(output_folder, f"{date}.txt")
     try:
+        os.makedirs(output_folder, exist_ok=True)
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(content)
         logging.info(f"📝 Diary saved to: {output_path}")
     except Exception as e:
         logging.error(f"❌ Failed to save diary: {e}")
+        raise
+    index_written([output_path], commander)
+
+    try:
+        with _state_lock:
+            diary_memory_for(commander).index_diary(date, content)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to index diary into memory: {e}")
@@ -0,0 +1,87 @@
+"""
+Compares the torch and ONNX embedders: throughput in sentences/sec and agreement of the vectors.
+
+Sentences are taken from the commander logs so lengths match real diary queries:
+
+    python benchmark_embedder.py --sentences 2000 --threads 4 --onnx-model models/all-MiniLM-L6-v2-onnx/model_int8.onnx
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from embedder import DEFAULT_EMBEDDER_SETTINGS, OnnxEmbedder, TorchEmbedder
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+COMMANDER_LOGS_FOLDER = os.path.join(os.path.dirname(__file__), "rag_data", "commander_logs")
+
+
+def load_sentences(limit: int) -> List[str]:
+    sentences: List[str] = []
+    for path in sorted(glob.glob(os.path.join(COMMANDER_LOGS_FOLDER, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for entries in data.get("categories", {}).values():
+            sentences.extend(entries)
+    if not sentences:
+        sentences = ["Docked at **Jameson Memorial** in **Shinrarta Dezhra**."]
+    # Repeat the corpus if needed so every run encodes the same number of sentences.
+    return (sentences * (limit // len(sentences) + 1))[:limit]
+
+
+def measure(label: str, embedder, sentences: List[str], repeats: int) -> Dict[str, Any]:
+    embedder.encode(sentences[:32])  # warm-up
+    best = float("inf")
+    vectors = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectors = embedder.encode(sentences)
+        best = min(best, time.perf_counter() - start)
+    rate = len(sentences) / best
+    logging.info(f"   {label:<6} {rate:,.0f} sentences/sec ({best:.2f}s for {len(sentences)})")
+    return {"backend": label, "seconds": round(best, 3), "sentences_per_sec": round(rate, 1), "vectors": vectors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark torch vs ONNX MiniLM embedding")
+    parser.add_argument("--sentences", type=int, default=2000, help="Sentences encoded per run")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per backend; the best is reported")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads (0 = library default)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_EMBEDDER_SETTINGS["batch_size"])
+    parser.add_argument("--onnx-model", default=DEFAULT_EMBEDDER_SETTINGS["onnx_model"])
+    parser.add_argument("--tokenizer", default=DEFAULT_EMBEDDER_SETTINGS["tokenizer"])
+    parser.add_argument("--tolerance", type=float, default=0.99, help="Minimum cosine similarity between backends")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    sentences = load_sentences(args.sentences)
+    logging.info(f"📐 Encoding {len(sentences)} sentences, threads={args.threads or 'default'}")
+
+    torch_run = measure("torch", TorchEmbedder(DEFAULT_EMBEDDER_SETTINGS["model_name"], args.threads, args.batch_size), sentences, args.repeats)
+    onnx_run = measure("onnx", OnnxEmbedder(args.onnx_model, args.tokenizer, args.threads, DEFAULT_EMBEDDER_SETTINGS["max_length"], args.batch_size), sentences, args.repeats)
+
+    cosines = np.sum(torch_run.pop("vectors") * onnx_run.pop("vectors"), axis=1)
+    agreement = {"min_cosine": round(float(cosines.min()), 5), "mean_cosine": round(float(cosines.mean()), 5)}
+    speedup = onnx_run["sentences_per_sec"] / torch_run["sentences_per_sec"]
+    logging.info(f"   agreement {agreement}, ONNX speed-up {speedup:.2f}x")
+
+    report = {"sentences": len(sentences), "threads": args.threads, "onnx_model": args.onnx_model,
+              "runs": [torch_run, onnx_run], "agreement": agreement, "speedup": round(speedup, 2)}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"📦 Benchmark report written to {args.output}")
+
+    if agreement["min_cosine"] < args.tolerance:
+        logging.error(f"❌ ONNX embeddings diverge from torch (min cosine {agreement['min_cosine']} < {args.tolerance})")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
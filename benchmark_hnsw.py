@@ -0,0 +1,190 @@
+"""
+Measures recall@k and query latency of Chroma HNSW settings against exact NumPy search.
+
+Runs against the real lore corpus in rag_data/ (queried with real commander log lines)
+and a synthetic clustered corpus, so the "vector_store" block in config.json can be
+chosen from measurements:
+
+    python benchmark_hnsw.py --k 4 --synthetic-size 100000 --output hnsw_bench.json
+"""
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from vector_store import DEFAULT_VECTOR_SETTINGS, hnsw_metadata, knowledge_text
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+BASE_DIR = os.path.dirname(__file__)
+RAG_DATA_FOLDER = os.path.join(BASE_DIR, "rag_data")
+COMMANDER_LOGS_FOLDER = os.path.join(RAG_DATA_FOLDER, "commander_logs")
+EMBEDDING_DIM = 384
+ADD_BATCH_SIZE = 5000
+
+
+def load_real_corpus() -> Tuple[List[str], List[str]]:
+    """Returns (lore texts, query texts) drawn from rag_data/ and the commander logs."""
+    texts: List[str] = []
+    for path in sorted(glob.glob(os.path.join(RAG_DATA_FOLDER, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list):
+            continue
+        for entry in data:
+            if isinstance(entry, dict) and "name" in entry and "description" in entry:
+                texts.append(knowledge_text(entry))
+
+    queries: List[str] = []
+    for path in sorted(glob.glob(os.path.join(COMMANDER_LOGS_FOLDER, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for entries in data.get("categories", {}).values():
+            queries.extend(entries)
+    return texts, sorted(set(queries))
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    from embedder import load_embedder
+
+    return load_embedder().encode(texts)
+
+
+def synthetic_corpus(size: int, n_queries: int, seed: int = 7) -> Tuple[np.ndarray, np.ndarray]:
+    """Clustered unit vectors, which behave more like sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(size // 400, 16), EMBEDDING_DIM)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=size)
+    corpus = centers[labels] + 0.6 * rng.standard_normal((size, EMBEDDING_DIM)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    picks = rng.integers(0, size, size=n_queries)
+    queries = corpus[picks] + 0.3 * rng.standard_normal((n_queries, EMBEDDING_DIM)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return corpus, queries
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> Tuple[List[set], List[float]]:
+    """Brute-force ground truth; on unit vectors cosine, L2 and IP rank identically."""
+    truth: List[set] = []
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        scores = corpus @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        latencies.append(time.perf_counter() - start)
+        truth.append(set(int(i) for i in top))
+    return truth, latencies
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    ms = np.asarray(latencies) * 1000.0
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+
+def bench_setting(client, corpus: np.ndarray, queries: np.ndarray, truth: List[set], k: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    name = "bench_" + "_".join(str(settings[key]) for key in sorted(settings))
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    collection = client.create_collection(name, metadata=hnsw_metadata(settings))
+
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), ADD_BATCH_SIZE):
+        batch = corpus[offset:offset + ADD_BATCH_SIZE]
+        collection.add(ids=[str(i) for i in range(offset, offset + len(batch))], embeddings=batch.tolist())
+    build_seconds = time.perf_counter() - start
+
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected.intersection(int(i) for i in result["ids"][0]))
+
+    client.delete_collection(name)
+    return {
+        **settings,
+        "recall_at_k": round(hits / (k * len(queries)), 4),
+        "build_seconds": round(build_seconds, 2),
+        **percentiles(latencies),
+    }
+
+
+def run_corpus(label: str, corpus: np.ndarray, queries: np.ndarray, k: int, grid: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import chromadb
+
+    logging.info(f"📐 {label}: {len(corpus)} vectors, {len(queries)} queries, k={k}")
+    truth, brute_latencies = exact_top_k(corpus, queries, k)
+    report = {"corpus": label, "size": int(len(corpus)), "queries": int(len(queries)), "k": k,
+              "numpy_bruteforce": percentiles(brute_latencies), "hnsw": []}
+    logging.info(f"   NumPy brute force: {report['numpy_bruteforce']}")
+
+    client = chromadb.EphemeralClient()
+    for settings in grid:
+        row = bench_setting(client, corpus, queries, truth, k, settings)
+        logging.info(
+            f"   {settings['distance']:>6} M={settings['hnsw_m']:<3} efC={settings['hnsw_ef_construction']:<4} "
+            f"efS={settings['hnsw_ef_search']:<4} recall@{k}={row['recall_at_k']:.3f} "
+            f"p50={row['p50_ms']}ms p99={row['p99_ms']}ms build={row['build_seconds']}s"
+        )
+        report["hnsw"].append(row)
+    return report
+
+
+def build_grid(args) -> List[Dict[str, Any]]:
+    return [
+        {"distance": distance, "hnsw_m": m, "hnsw_ef_construction": ef_c, "hnsw_ef_search": ef_s}
+        for distance, m, ef_c, ef_s in itertools.product(args.distance, args.m, args.ef_construction, args.ef_search)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HNSW settings for the lore collection")
+    parser.add_argument("--k", type=int, default=4, help="Neighbours per query (retrieve_knowledge uses 4)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per corpus")
+    parser.add_argument("--synthetic-size", type=int, default=100_000, help="Synthetic corpus size (0 to skip)")
+    parser.add_argument("--skip-real", action="store_true", help="Skip the real rag_data corpus")
+    parser.add_argument("--distance", nargs="+", default=[DEFAULT_VECTOR_SETTINGS["distance"], "l2"])
+    parser.add_argument("--m", nargs="+", type=int, default=[8, 16, 32])
+    parser.add_argument("--ef-construction", nargs="+", type=int, default=[100, 200])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[10, 32, 64, 128])
+    parser.add_argument("--output", help="Write the full report as JSON to this path")
+    args = parser.parse_args()
+
+    grid = build_grid(args)
+    reports = []
+
+    if not args.skip_real:
+        texts, query_texts = load_real_corpus()
+        if texts and query_texts:
+            random.Random(7).shuffle(query_texts)
+            corpus = embed_texts(texts)
+            queries = embed_texts(query_texts[:args.queries])
+            reports.append(run_corpus("rag_data", corpus, queries, min(args.k, len(corpus)), grid))
+        else:
+            logging.warning("⚠️ No lore entries or commander log lines found; skipping real corpus.")
+
+    if args.synthetic_size > 0:
+        corpus, queries = synthetic_corpus(args.synthetic_size, args.queries)
+        reports.append(run_corpus("synthetic", corpus, queries, args.k, grid))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        logging.info(f"📦 Benchmark report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Compares journal reading strategies on a large exploration-heavy journal.
+
+The baseline is the old extract_events loop (text-mode iteration, strip, json.loads on
+every line). It is measured against journal_reader.read_events with every installed JSON
+parser, both parsing every line and parsing only the events the ingest pipeline consumes:
+
+    python benchmark_journal_reader.py --size-mb 300 --output reader_bench.json
+    python benchmark_journal_reader.py --journal "path/to/Journal.2024-12-08T194512.01.log"
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+from exploration_tracker import ExplorationTracker
+from inventory_tracker import InventoryTracker
+from journal_events import DESCRIBED_EVENTS
+from journal_reader import load_json_parser, read_events
+from loadout_tracker import LoadoutTracker
+from mission_tracker import MissionTracker
+from session_segmenter import SessionSegmenter
+from stats_rollups import StatsRollups
+from trade_ledger import TradeLedger
+from travel_index import TravelIndex
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+# What extract_events asks for with the default trackers
+PIPELINE_EVENTS = DESCRIBED_EVENTS | InventoryTracker.EVENTS | StatsRollups.EVENTS | TravelIndex.EVENTS | LoadoutTracker.EVENTS | MissionTracker.EVENTS | TradeLedger.EVENTS | ExplorationTracker.EVENTS | SessionSegmenter.EVENTS
+
+
+def scan_event(rng: random.Random, system: str, address: int, body_id: int) -> Dict[str, Any]:
+    """A detailed Scan of a planet, the bulk of any exploration journal."""
+    return {
+        "event": "Scan", "ScanType": "Detailed", "BodyName": f"{system} {body_id}", "BodyID": body_id,
+        "Parents": [{"Star": 0}], "StarSystem": system, "SystemAddress": address,
+        "DistanceFromArrivalLS": round(rng.uniform(10, 9000), 3), "TidalLock": rng.random() < 0.3,
+        "TerraformState": "", "PlanetClass": rng.choice(["Icy body", "Rocky body", "High metal content body", "Gas giant with water based life"]),
+        "Atmosphere": "", "AtmosphereType": "None", "Volcanism": "",
+        "MassEM": round(rng.uniform(0.01, 400), 6), "Radius": round(rng.uniform(1e6, 7e7), 3),
+        "SurfaceGravity": round(rng.uniform(0.1, 30), 6), "SurfaceTemperature": round(rng.uniform(20, 900), 6),
+        "SurfacePressure": 0.0, "Landable": rng.random() < 0.5,
+        "Materials": [{"Name": name, "Percent": round(rng.uniform(0.1, 20), 6)} for name in ("iron", "sulphur", "nickel", "carbon", "chromium", "manganese", "phosphorus", "zinc", "germanium", "tin")],
+        "Composition": {"Ice": round(rng.random(), 6), "Rock": round(rng.random(), 6), "Metal": round(rng.random(), 6)},
+        "SemiMajorAxis": rng.uniform(1e9, 1e12), "Eccentricity": round(rng.random() / 10, 6),
+        "OrbitalInclination": round(rng.uniform(-5, 5), 6), "Periapsis": round(rng.uniform(0, 360), 6),
+        "OrbitalPeriod": rng.uniform(1e5, 1e9), "AscendingNode": round(rng.uniform(-180, 180), 6),
+        "MeanAnomaly": round(rng.uniform(0, 360), 6), "RotationPeriod": rng.uniform(1e4, 1e7),
+        "AxialTilt": round(rng.uniform(-1, 1), 6), "WasDiscovered": False, "WasMapped": False,
+    }
+
+
+def exploration_events(rng: random.Random) -> Iterator[Dict[str, Any]]:
+    """Endless jump → honk → scan every body loop, with the usual chatter in between."""
+    jump = 0
+    while True:
+        jump += 1
+        system, address = f"Eol Prou RS-T d3-{jump}", 10_000_000 + jump
+        yield {"event": "FSDJump", "StarSystem": system, "SystemAddress": address, "JumpDist": round(rng.uniform(40, 70), 3), "FuelUsed": 3.2}
+        yield {"event": "FSSDiscoveryScan", "Progress": 0.2, "BodyCount": 20, "NonBodyCount": 3, "SystemName": system, "SystemAddress": address}
+        yield {"event": "Music", "MusicTrack": "Exploration"}
+        for body in range(rng.randint(8, 30)):
+            yield scan_event(rng, system, address, body)
+            if rng.random() < 0.3:
+                yield {"event": "ReceiveText", "From": "", "Message": "$COMMS_entered:#name=Eol Prou;", "Channel": "npc"}
+        yield {"event": "FSSAllBodiesFound", "SystemName": system, "Count": 20}
+        yield {"event": "FuelScoop", "Scooped": 5.0, "Total": 32.0}
+
+
+def journal_line(event: Dict[str, Any]) -> str:
+    """Serialized the way the game does it: `{ "timestamp":"...", "event":"Scan", ... }`."""
+    return "{ " + json.dumps(event, separators=(", ", ":"))[1:] + "\n"
+
+
+def write_large_journal(path: str, size_mb: int, seed: int = 7) -> Dict[str, int]:
+    rng = random.Random(seed)
+    clock = datetime(2024, 12, 8, 19, 0, 0)
+    target = size_mb * 2**20
+    written = lines = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(journal_line({"timestamp": clock.strftime("%Y-%m-%dT%H:%M:%SZ"), "event": "LoadGame", "Commander": "TOADIE MUDGUTS"}))
+        for event in exploration_events(rng):
+            if written >= target:
+                break
+            clock += timedelta(seconds=rng.randint(1, 20))
+            line = journal_line({"timestamp": clock.strftime("%Y-%m-%dT%H:%M:%SZ"), **event})
+            f.write(line)
+            written += len(line)
+            lines += 1
+    return {"bytes": os.path.getsize(path), "lines": lines + 1}
+
+
+def baseline_reader(path: str) -> Iterator[Dict[str, Any]]:
+    """The pre-journal_reader loop: decode and parse every line, filter afterwards."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def bench(name: str, reader: Callable[[], Iterator[Dict[str, Any]]], size: int, wanted: frozenset, repeats: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    events = consumed = 0
+    for _ in range(repeats):
+        events = consumed = 0
+        start = time.perf_counter()
+        for event in reader():
+            events += 1
+            if event.get("event") in wanted:
+                consumed += 1
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    logging.info(f"⏱️ {name}: {best:.2f}s ({size / 2**20 / best:.0f} MiB/s)")
+    return {
+        "reader": name,
+        "best_seconds": round(best, 3),
+        "mib_per_second": round(size / 2**20 / best, 1),
+        "events": events,
+        "pipeline_events": consumed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk journal reading")
+    parser.add_argument("--size-mb", type=int, default=300, help="Size of the synthetic journal")
+    parser.add_argument("--journal", help="Benchmark an existing journal file instead")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.journal
+    if not path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp_dir.name, "Journal.2024-12-08T190000.01.log")
+        logging.info(f"🛰️ Writing a {args.size_mb} MiB exploration journal...")
+        write_large_journal(path, args.size_mb)
+    size = os.path.getsize(path)
+
+    wanted = PIPELINE_EVENTS
+    results = [bench("text+json (baseline)", lambda: baseline_reader(path), size, wanted, args.repeats)]
+    for name in ("json", "orjson", "simdjson"):
+        try:
+            _, loads = load_json_parser(name)
+        except ImportError:
+            logging.info(f"➖ {name} not installed, skipped")
+            continue
+        results.append(bench(f"mmap+{name}, all lines", lambda: read_events(path, None, loads), size, wanted, args.repeats))
+        results.append(bench(f"mmap+{name}, pipeline events", lambda: read_events(path, wanted, loads), size, wanted, args.repeats))
+
+    report = {"journal_bytes": size, "repeats": args.repeats, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"📦 Benchmark report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
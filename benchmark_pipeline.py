@@ -0,0 +1,349 @@
+"""
+End-to-end pipeline benchmark against synthetic journals and a stub LLM.
+
+Generates Journal.*.log files, then runs ingest → summary → index → retrieval → prompt
+build → diary exactly as the real scripts do, but inside a throwaway sandbox (a copy of
+the scripts plus a rewritten config.json) so real logs, summaries and state are never
+touched. The LLM is stub_llm_server.py with a configurable latency, so no GPU or LM
+Studio is needed. Per-stage wall time, Python allocation peak (tracemalloc) and process
+peak RSS are reported as JSON:
+
+    python benchmark_pipeline.py --days 30 --events-per-day 2000 --latency 0.05 --output pipeline_bench.json
+
+Use --embedder hashing to take the embedding model out of the picture entirely.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+# === SYNTHETIC JOURNALS ===
+COMMANDER = "TOADIE MUDGUTS"
+SYSTEMS = ["Sol", "Shinrarta Dezhra", "Deciat", "Colonia", "Maia", "Lave", "Diso", "Leesti", "Achenar", "Alioth"] + [
+    f"Col 285 Sector {chr(65 + i % 26)}{chr(65 + i // 26)}-{i % 9} c{i % 17}" for i in range(40)
+]
+COMMODITIES = ["gold", "silver", "palladium", "tritium", "bertrandite", "indite", "lowtemperaturediamond", "coltan"]
+MISSIONS = ["Mission_Courier", "Mission_Delivery", "Mission_Massacre", "Mission_Collect", "Mission_Salvage"]
+LORE_TOPICS = ["Thargoid", "Federation", "Empire", "Alliance", "Guardian", "Engineer", "Powerplay", "Galnet"]
+
+
+def station_for(system: str) -> str:
+    return f"{system.split()[0]} Orbital {len(system) % 7 + 1}"
+
+
+def session_events(rng: random.Random, start: datetime, count: int, system: str) -> List[Dict[str, Any]]:
+    """One play session: LoadGame, `count` gameplay events drawn from a weighted mix, Shutdown."""
+    clock = start
+
+    def stamp(event: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal clock
+        clock += timedelta(seconds=rng.randint(5, 90))
+        return {"timestamp": clock.strftime("%Y-%m-%dT%H:%M:%SZ"), **event}
+
+    events = [
+        stamp({"event": "Fileheader", "part": 1, "gameversion": "4.0.0.1900"}),
+        stamp({"event": "Commander", "Name": COMMANDER}),
+        stamp({"event": "LoadGame", "Commander": COMMANDER, "Ship": "krait_mkii", "ShipID": 1, "ShipName": "Rust Lancer", "Credits": 50_000_000}),
+        stamp({"event": "Location", "StarSystem": system, "Body": f"{system} A", "Docked": False}),
+        stamp({"event": "Materials", "Raw": [{"Name": "iron", "Count": 40}], "Manufactured": [], "Encoded": [{"Name": "shieldcyclerecordings", "Count": 12}]}),
+        stamp({"event": "Cargo", "Vessel": "Ship", "Count": 0, "Inventory": []}),
+    ]
+    cargo: Dict[str, int] = {}
+    missions: List[int] = []
+    while len(events) < count:
+        roll = rng.random()
+        if roll < 0.35:
+            system = rng.choice(SYSTEMS)
+            events.append(stamp({"event": "FSDJump", "StarSystem": system, "JumpDist": round(rng.uniform(5, 45), 2), "FuelUsed": 2.1}))
+        elif roll < 0.5:
+            station = station_for(system)
+            events.append(stamp({"event": "Docked", "StationName": station, "StarSystem": system, "MarketID": zlib.crc32(station.encode("utf-8"))}))
+            if cargo and rng.random() < 0.6:
+                item, held = rng.choice(sorted(cargo.items()))
+                sold = rng.randint(1, held)
+                price = rng.randint(5_000, 50_000)
+                events.append(stamp({"event": "MarketSell", "Type": item, "Count": sold, "SellPrice": price, "TotalSale": sold * price}))
+                cargo[item] = held - sold
+                if not cargo[item]:
+                    del cargo[item]
+            else:
+                item, bought = rng.choice(COMMODITIES), rng.randint(4, 64)
+                price = rng.randint(2_000, 30_000)
+                events.append(stamp({"event": "MarketBuy", "Type": item, "Count": bought, "BuyPrice": price, "TotalCost": bought * price}))
+                cargo[item] = cargo.get(item, 0) + bought
+            events.append(stamp({"event": "Undocked", "StationName": station}))
+        elif roll < 0.65:
+            events.append(stamp({"event": "Bounty", "Target": "python", "TotalReward": rng.randint(10_000, 400_000), "Reward": rng.randint(10_000, 400_000)}))
+        elif roll < 0.75:
+            mission_id = rng.randint(10**8, 10**9)
+            missions.append(mission_id)
+            events.append(stamp({"event": "MissionAccepted", "MissionID": mission_id, "Name": rng.choice(MISSIONS), "DestinationSystem": rng.choice(SYSTEMS)}))
+        elif roll < 0.82 and missions:
+            mission_id = missions.pop(0)
+            events.append(stamp({"event": "MissionCompleted", "MissionID": mission_id, "Name": rng.choice(MISSIONS), "Reward": rng.randint(50_000, 2_000_000)}))
+        else:
+            # The noise real journals are full of: never summarized, only scanned
+            events.append(stamp({"event": rng.choice(["Music", "ReceiveText", "FuelScoop", "ReservoirReplenished", "Scanned"]), "Channel": "npc"}))
+    events.append(stamp({"event": "Shutdown"}))
+    return events
+
+
+def write_synthetic_journals(log_dir: str, days: int, events_per_day: int, sessions_per_day: int = 2,
+                             start: str = "2024-11-01", seed: int = 7) -> Dict[str, int]:
+    """
+    Writes one Journal.<start time>.01.log per play session.
+
+    Args:
+        log_dir (str): Directory to write into (created if missing).
+        days (int): Consecutive days of play starting at `start`.
+        events_per_day (int): Approximate events per day, split across sessions.
+        sessions_per_day (int): Play sessions (and journal files) per day.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    rng = random.Random(seed)
+    system = SYSTEMS[0]
+    files = events = size = 0
+    first_day = datetime.fromisoformat(start)
+    for day in range(days):
+        for session in range(sessions_per_day):
+            session_start = first_day + timedelta(days=day, hours=10 + session * 6)
+            batch = session_events(rng, session_start, max(events_per_day // sessions_per_day, 8), system)
+            system = next((e["StarSystem"] for e in reversed(batch) if "StarSystem" in e), system)
+            path = os.path.join(log_dir, f"Journal.{session_start.strftime('%Y-%m-%dT%H%M%S')}.01.log")
+            with open(path, "w", encoding="utf-8") as f:
+                for event in batch:
+                    f.write(json.dumps(event) + "\n")
+            files += 1
+            events += len(batch)
+            size += os.path.getsize(path)
+    return {"files": files, "events": events, "bytes": size}
+
+
+def synthetic_lore(size: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(LORE_TOPICS)} report {i}: activity near {rng.choice(SYSTEMS)} involving "
+        f"{rng.choice(COMMODITIES)} shipments and {rng.choice(LORE_TOPICS).lower()} patrols."
+        for i in range(size)
+    ]
+
+
+# === SANDBOX ===
+def make_sandbox(workdir: str, stub: str, embedder_backend: Optional[str]) -> Dict[str, Any]:
+    """Copies the scripts and a rewritten config.json into workdir so every relative and __file__-based path lands there."""
+    for path in glob.glob(os.path.join(BASE_DIR, "*.py")):
+        shutil.copy2(path, workdir)
+    with open(os.path.join(BASE_DIR, "config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    config["log_directory"] = os.path.join(workdir, "journals")
+    config["lm_studio_api"] = stub
+    config.setdefault("vector_store", {})["backend"] = "numpy"
+    embedder = config.setdefault("embedder", {})
+    for key in ("onnx_model", "tokenizer"):
+        if embedder.get(key) and not os.path.isabs(embedder[key]):
+            embedder[key] = os.path.join(BASE_DIR, embedder[key])
+    if embedder_backend:
+        embedder["backend"] = embedder_backend
+
+    with open(os.path.join(workdir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+# === WORKER (runs inside the sandbox) ===
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageTimer:
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        record: Dict[str, Any] = {"stage": name}
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            if self.trace_memory:
+                record["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+            record["peak_rss_mb"] = peak_rss_mb()
+            if record.get("items"):
+                record["ms_per_item"] = round(1000 * record["seconds"] / record["items"], 3)
+            self.stages.append(record)
+            logging.info(f"⏱️ {name}: {record['seconds']:.3f}s")
+
+
+def run_worker(args) -> Dict[str, Any]:
+    """The pipeline itself; cwd and the imported modules are the sandbox copies."""
+    timer = StageTimer(trace_memory=not args.no_tracemalloc)
+
+    # Lore normally comes from rag_data_loader.py; it is built here untimed.
+    from embedder import load_embedder
+    from vector_store import CHROMA_DB_PATH, bump_collection_version, load_config, load_vector_settings, write_numpy_index
+    config = load_config()
+    settings = load_vector_settings(config)
+    lore = synthetic_lore(args.lore_size)
+    setup_embedder = load_embedder(config)
+    write_numpy_index(lore, setup_embedder.encode(lore), CHROMA_DB_PATH, settings["quantization"], settings["keep_float32"])
+    bump_collection_version()
+    del setup_embedder
+
+    import build_commander_summaries as summaries
+    logs = sorted(glob.glob(os.path.join(summaries.LOG_DIR, "Journal.*.log")))
+    trackers = summaries.make_trackers()
+    sessions = summaries.SessionSegmenter()
+
+    dedup = summaries.JournalDeduplicator()
+
+    with timer.stage("ingest") as record:
+        all_events = summaries.ingest_logs(logs, trackers, sessions, dedup)
+        record["items"] = len(logs)
+        record["duplicates_dropped"] = dedup.dropped
+        record["snapshots_unchanged"] = dedup.unchanged
+    with timer.stage("summary") as record:
+        record["items"] = len(all_events)
+        summaries.write_summaries(all_events, trackers, sessions)
+
+    with timer.stage("load_models"):
+        import ai_generation
+        ai_generation.load_models()
+        from generate_diary_entry import list_available_log_dates, load_commander_log
+    with timer.stage("index") as record:
+        from diary_memory import sync_memory
+        record["items"] = sync_memory(ai_generation.diary_memory)
+
+    dates = list_available_log_dates()
+    days = [(date,) + load_commander_log(date) for date in dates]
+    with timer.stage("retrieval") as record:
+        for date, commander, activities in days:
+            compressed = ai_generation.compress_activities(activities)
+            ai_generation.retrieve_knowledge(compressed)
+            ai_generation.diary_memory.recall("\n".join(compressed), date)
+        record["items"] = len(days)
+        record["cache_hits"], record["cache_misses"] = ai_generation.retrieval_cache.hits, ai_generation.retrieval_cache.misses
+
+    prompt_tokens = 0
+    with timer.stage("prompt") as record:
+        for date, commander, activities in days:
+            messages = ai_generation.build_messages(commander, date, activities)
+            prompt_tokens += sum(len(m["content"]) for m in messages) // 4
+        record["items"] = len(days)
+        record["avg_prompt_tokens"] = prompt_tokens // max(len(days), 1)
+
+    diary_days = days[-args.diaries:] if args.diaries else []
+    with timer.stage("diary") as record:
+        for date, commander, activities in diary_days:
+            ai_generation.save_diary(date, ai_generation.generate_diary(commander, date, activities))
+        record["items"] = len(diary_days)
+
+    return {"stages": timer.stages, "days": len(days), "peak_rss_mb": peak_rss_mb()}
+
+
+# === DRIVER ===
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    from stub_llm_server import start_stub_server, stub_url
+
+    server = start_stub_server(latency=args.latency, token_latency=args.token_latency, reply_words=args.reply_words)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="captains_log_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        make_sandbox(workdir, stub_url(server), args.embedder)
+        start = time.perf_counter()
+        journals = write_synthetic_journals(os.path.join(workdir, "journals"), args.days, args.events_per_day, args.sessions_per_day, seed=args.seed)
+        generate_seconds = round(time.perf_counter() - start, 4)
+        logging.info(f"🛰️ Wrote {journals['files']} journals ({journals['events']} events, {journals['bytes'] / 2**20:.1f} MiB)")
+
+        worker = [sys.executable, os.path.join(workdir, "benchmark_pipeline.py"), "--worker",
+                  "--lore-size", str(args.lore_size), "--diaries", str(args.diaries)]
+        if args.no_tracemalloc:
+            worker.append("--no-tracemalloc")
+        completed = subprocess.run(worker, cwd=workdir, stdout=subprocess.PIPE, text=True, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        server.shutdown()
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "pipeline",
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {key: getattr(args, key) for key in ("days", "events_per_day", "sessions_per_day", "lore_size", "diaries", "latency", "token_latency", "reply_words", "embedder", "seed")},
+        "journals": dict(journals, generate_seconds=generate_seconds),
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the journal → diary pipeline against synthetic logs and a stub LLM")
+    parser.add_argument("--days", type=int, default=14, help="Days of synthetic play")
+    parser.add_argument("--events-per-day", type=int, default=1000)
+    parser.add_argument("--sessions-per-day", type=int, default=2)
+    parser.add_argument("--lore-size", type=int, default=5000, help="Synthetic lore entries in the retrieval index")
+    parser.add_argument("--diaries", type=int, default=3, help="Diaries to generate (the most recent days)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub LLM seconds per response")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Stub LLM seconds per generated word")
+    parser.add_argument("--reply-words", type=int, default=300)
+    parser.add_argument("--embedder", choices=("torch", "onnx", "hashing"), help="Override the embedder backend from config.json")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip per-stage allocation tracing (it slows Python code down)")
+    parser.add_argument("--workdir", help="Sandbox directory to use and keep (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary sandbox for inspection")
+    parser.add_argument("--output", help="Write the report as JSON to this path (default: stdout)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    report = run_benchmark(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"📦 Benchmark report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
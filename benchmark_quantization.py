@@ -0,0 +1,111 @@
+"""
+Compares recall@k and footprint of float16 / int8 NumPy indexes against the float32 baseline.
+
+Each quantized format is measured with and without float32 re-scoring of the top
+candidates, on the real rag_data corpus and a synthetic clustered corpus:
+
+    python benchmark_quantization.py --k 4 --synthetic-size 100000 --output quant_bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmark_hnsw import embed_texts, exact_top_k, load_real_corpus, percentiles, synthetic_corpus
+from vector_store import QUANTIZATIONS, NumpyBackend, numpy_index_paths, write_numpy_index
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+
+def index_bytes(index_dir: str, quantization: str, keep_float32: bool) -> Dict[str, int]:
+    """On-disk size of the files a backend maps, and of the matrix it scans on every query."""
+    paths = numpy_index_paths(index_dir, quantization)
+    scanned = os.path.getsize(paths["vectors"])
+    if quantization == "int8":
+        scanned += os.path.getsize(paths["scales"])
+    on_disk = scanned
+    if quantization != "float32" and keep_float32:
+        on_disk += os.path.getsize(paths["float32"])
+    return {"scanned_bytes": scanned, "disk_bytes": on_disk}
+
+
+def bench_format(corpus: np.ndarray, queries: np.ndarray, truth: List[set], k: int, quantization: str, rescore: bool, rescore_factor: int) -> Dict[str, Any]:
+    texts = [str(i) for i in range(len(corpus))]
+    with tempfile.TemporaryDirectory() as index_dir:
+        write_numpy_index(texts, corpus, index_dir, quantization, keep_float32=rescore)
+        backend = NumpyBackend(index_dir, quantization, rescore_factor)
+
+        latencies: List[float] = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = backend.query(query, k)[0]
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected.intersection(int(i) for i in result))
+
+        sizes = index_bytes(index_dir, quantization, rescore)
+        del backend
+    return {
+        "quantization": quantization,
+        "rescore": rescore,
+        "recall_at_k": round(hits / (k * len(queries)), 4),
+        **sizes,
+        **percentiles(latencies),
+    }
+
+
+def run_corpus(label: str, corpus: np.ndarray, queries: np.ndarray, k: int, rescore_factor: int) -> Dict[str, Any]:
+    logging.info(f"📐 {label}: {len(corpus)} vectors, {len(queries)} queries, k={k}")
+    truth, _ = exact_top_k(corpus, queries, k)
+    rows = []
+    for quantization in QUANTIZATIONS:
+        for rescore in ([False] if quantization == "float32" else [False, True]):
+            row = bench_format(corpus, queries, truth, k, quantization, rescore, rescore_factor)
+            logging.info(
+                f"   {quantization:>7} rescore={str(rescore):<5} recall@{k}={row['recall_at_k']:.3f} "
+                f"scanned={row['scanned_bytes'] / 1e6:.1f}MB disk={row['disk_bytes'] / 1e6:.1f}MB "
+                f"p50={row['p50_ms']}ms p99={row['p99_ms']}ms"
+            )
+            rows.append(row)
+    return {"corpus": label, "size": int(len(corpus)), "queries": int(len(queries)), "k": k, "formats": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized NumPy lore indexes")
+    parser.add_argument("--k", type=int, default=4, help="Neighbours per query")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per corpus")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="Candidates re-scored per result")
+    parser.add_argument("--synthetic-size", type=int, default=100_000, help="Synthetic corpus size (0 to skip)")
+    parser.add_argument("--skip-real", action="store_true", help="Skip the real rag_data corpus")
+    parser.add_argument("--output", help="Write the full report as JSON to this path")
+    args = parser.parse_args()
+
+    reports = []
+    if not args.skip_real:
+        texts, query_texts = load_real_corpus()
+        if texts and query_texts:
+            random.Random(7).shuffle(query_texts)
+            corpus = embed_texts(texts)
+            queries = embed_texts(query_texts[:args.queries])
+            reports.append(run_corpus("rag_data", corpus, queries, min(args.k, len(corpus)), args.rescore_factor))
+        else:
+            logging.warning("⚠️ No lore entries or commander log lines found; skipping real corpus.")
+
+    if args.synthetic_size > 0:
+        corpus, queries = synthetic_corpus(args.synthetic_size, args.queries)
+        reports.append(run_corpus("synthetic", corpus, queries, args.k, args.rescore_factor))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        logging.info(f"📦 Benchmark report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Startup time, heavy-import and binary-size check for the captains_log entry point.
+
+Times `captains_log <command> --help` (run from source, or the frozen build with --exe),
+records which heavy packages each command drags in, and sizes the onedir build if there
+is one. Compare against a saved baseline to catch regressions:
+
+    python benchmark_startup.py --baseline startup_baseline.json
+    python benchmark_startup.py --output startup.json
+    python benchmark_startup.py --exe dist/captains_log/captains_log --dist dist/captains_log --save-baseline startup_baseline.json
+    python benchmark_startup.py --exe dist/captains_log/captains_log --dist dist/captains_log --baseline startup_baseline.json
+
+The committed startup_baseline.json was taken from source on a Linux dev machine. Its heavy
+import lists hold anywhere; its timings only mean something on similar hardware, so
+re-save it with --save-baseline before comparing timings or a frozen build elsewhere.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from captains_log import COMMANDS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "chromadb", "onnxruntime", "selenium", "requests")
+# Commands whose --help is safe to run (lore, galnet, normalize-galnet, validate and convert-logs
+# have no argument parser and would do real work)
+DEFAULT_COMMANDS = ("", "run", "ingest", "stats", "trade", "missions", "ship", "exploration", "digests", "diary", "queue", "search", "live", "catalog", "trace")
+MARKER = "@@heavy@@"
+
+PROBE = """
+import json, runpy, sys
+sys.argv = ["captains_log {command}", "--help"]
+try:
+    runpy.run_module({module!r}, run_name="__main__")
+except SystemExit:
+    pass
+print({marker!r} + json.dumps([m for m in {heavy!r} if m in sys.modules]), file=sys.stderr)
+"""
+
+
+def time_command(launcher: List[str], command: str, repeats: int) -> Dict[str, Any]:
+    args = launcher + ([command, "--help"] if command else ["--help"])
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run(args, cwd=BASE_DIR, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            logging.warning(f"⚠️ {' '.join(args)} exited with {result.returncode}: {result.stderr.decode(errors='replace')[-300:]}")
+            break
+    median = statistics.median(timings)
+    logging.info(f"⏱️ {command or '(no command)':<12} {median:8.1f} ms")
+    return {"command": command or "--help", "median_ms": round(median, 1), "min_ms": round(min(timings), 1)}
+
+
+def heavy_imports(command: str) -> List[str]:
+    """Heavy packages in sys.modules after running the command's --help from source."""
+    code = PROBE.format(command=command, module=COMMANDS[command][0], marker=MARKER, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    return ["<probe failed>"]
+
+
+def dist_size(dist_dir: str, top: int = 10) -> Dict[str, Any]:
+    """Total size of an onedir build and its largest top-level entries."""
+    sizes: Dict[str, int] = {}
+    total = 0
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            size = os.path.getsize(os.path.join(root, name))
+            total += size
+            relative = os.path.relpath(os.path.join(root, name), dist_dir).split(os.sep)
+            key = os.path.join(*relative[:2]) if relative[0] == "_internal" and len(relative) > 1 else relative[0]
+            sizes[key] = sizes.get(key, 0) + size
+    largest = sorted(sizes.items(), key=lambda kv: -kv[1])[:top]
+    logging.info(f"📦 {dist_dir}: {total / 2**20:.1f} MiB")
+    return {"total_mb": round(total / 2**20, 1), "largest": [{"path": path, "mb": round(size / 2**20, 2)} for path, size in largest]}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, slack_ms: float = 0.0) -> List[str]:
+    """
+    Regressions of report against baseline: slower commands, a bigger build, new heavy imports.
+    A command only counts as slower past both the relative tolerance and slack_ms, so
+    scheduler jitter on a ~70 ms start is not flagged while a new torch import still is.
+    """
+    problems = []
+    before = {row["command"]: row for row in baseline.get("startup", [])}
+    for row in report["startup"]:
+        old = before.get(row["command"])
+        if old and row["median_ms"] > old["median_ms"] * (1 + tolerance) + slack_ms:
+            problems.append(f"{row['command']}: {row['median_ms']} ms vs {old['median_ms']} ms")
+        if old is not None and len(row.get("heavy_imports", [])) > len(old.get("heavy_imports", [])):
+            problems.append(f"{row['command']}: now imports {', '.join(row['heavy_imports'])}")
+    if report.get("dist") and baseline.get("dist"):
+        if report["dist"]["total_mb"] > baseline["dist"]["total_mb"] * (1 + tolerance):
+            problems.append(f"build size: {report['dist']['total_mb']} MiB vs {baseline['dist']['total_mb']} MiB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark captains_log startup time and build size")
+    parser.add_argument("--exe", help="Frozen executable to time instead of `python captains_log.py`")
+    parser.add_argument("--dist", help="Onedir build folder to size (e.g. dist/captains_log)")
+    parser.add_argument("--commands", nargs="*", default=list(DEFAULT_COMMANDS), help="Commands to time ('' = bare --help)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", help="Fail if slower/bigger than this earlier report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth against the baseline")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="Allowed slowdown in ms on top of --tolerance")
+    parser.add_argument("--save-baseline", help="Also write the report here, for later --baseline runs")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    launcher = [os.path.abspath(args.exe)] if args.exe else [sys.executable, os.path.join(BASE_DIR, "captains_log.py")]
+    report: Dict[str, Any] = {"launcher": args.exe or "python captains_log.py", "python": sys.version.split()[0], "startup": []}
+    for command in args.commands:
+        row = time_command(launcher, command, args.repeats)
+        if command and not args.exe:
+            row["heavy_imports"] = heavy_imports(command)
+            if row["heavy_imports"]:
+                logging.warning(f"🐘 {command} imports {', '.join(row['heavy_imports'])}")
+        report["startup"].append(row)
+    if args.dist:
+        report["dist"] = dist_size(args.dist)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            logging.info(f"📦 Report written to {path}")
+    if not args.output:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance, args.slack_ms)
+        for problem in problems:
+            logging.error(f"❌ Regression: {problem}")
+        if problems:
+            sys.exit(1)
+        logging.info("✅ No startup or size regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,45 @@ import json
 import glob
 import re
 import logging
-from datetime import datetime
+import argparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from diary_queue import load_queue_settings, schedule_sessions
+from commanders import COMMANDER_LOGS_FOLDER, DEFAULT_COMMANDER, commander_path, partition_logs
+from instrumentation import forward_traces_to, span, trace_forwarding
+from exploration_tracker import EXPLORATION_FILE, ExplorationTracker
+from inventory_tracker import INVENTORY_DIR, InventoryTracker
+from journal_dedup import DEDUP_STATE_FILE, JournalDeduplicator
+from journal_events import DESCRIBED_EVENTS, describe_event
+from journal_reader import read_events
+from loadout_tracker import LOADOUT_DIR, LoadoutTracker
+from mission_tracker import MISSIONS_FILE, MissionTracker
+from search_index import index_written
+from ship_catalog import open_catalog
+from session_segmenter import SESSION_STATE_FILE, SessionSegmenter
+from stats_rollups import ROLLUPS_FILE, StatsRollups
+from trade_ledger import LEDGER_FILE, TradeLedger
+from travel_index import TRAVEL_DB, TravelIndex
+from vector_store import load_config
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 # Paths and directories
-LOG_DIR = os.path.join(
-    os.environ["USERPROFILE"],
+config = load_config()
+LOG_DIR = os.path.expandvars(config.get("log_directory") or os.path.join(
+    "%USERPROFILE%",
     "Saved Games",
     "Frontier Developments",
     "Elite Dangerous"
-)
-OUTPUT_DIR = "rag_data/commander_logs"
+))
+OUTPUT_DIR = COMMANDER_LOGS_FOLDER  # the primary commander's; others get rag_data/commander_logs/cmdr_<name>/
+SESSIONS_DIR = os.path.join(OUTPUT_DIR, "sessions")
 INDEX_FILE = "rag_data/processed_index.json"
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(SESSIONS_DIR, exist_ok=True)
 
 # Load processed log index
 if os.path.exists(INDEX_FILE):
@@ -29,103 +50,75 @@ if os.path.exists(INDEX_FILE):
 else:
     processed_logs = set()
 
-def extract_events(logfile):
-    """Extracts key events from a single Elite Dangerous log file and groups them by date."""
+def extract_events(logfile, trackers=(), sessions=None, dedup=None):
+    """
+    Extracts key events from a single Elite Dangerous log file and groups them by date.
+    Events are also passed, in file order, to each tracker that lists them in its EVENTS
+    and to the session segmenter, if one is given. With a deduplicator, replayed lines are
+    dropped before any of that, and unchanged state snapshots reach only the trackers
+    (which reconcile against them) and add no summary lines. Events nobody consumes are
+    never JSON-decoded (see journal_reader.read_events).
+    """
     daily_events = defaultdict(lambda: defaultdict(list))
 
-    try:
-        with open(logfile, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                try:
-                    event_data = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+    wanted = DESCRIBED_EVENTS.union(*(tracker.EVENTS for tracker in trackers))
+    if sessions is not None:
+        wanted |= sessions.EVENTS
 
+    with span("extract_events", file=os.path.basename(logfile), events=0, duplicates=0) as s:
+        try:
+            for event_data in read_events(logfile, wanted):
                 timestamp = event_data.get("timestamp")
                 if not timestamp:
                     continue
-                
-                event_date = datetime.fromisoformat(timestamp.replace("Z", "")).strftime("%Y-%m-%d")
+                s["events"] += 1
+                if dedup is not None and dedup.is_duplicate(event_data):
+                    s["duplicates"] += 1
+                    continue
+
+                event_date = timestamp[:10]
                 event_type = event_data.get("event", "Unknown Event")
 
-                # Process only meaningful events
-                if event_type == "FSDJump":
-                    system = event_data.get("StarSystem", "Unknown System")
-                    daily_events[event_date]["Travel"].append(f"Jumped to **{system}**.")
-
-                elif event_type == "Docked":
-                    station = event_data.get("StationName", "Unknown Station")
-                    system = event_data.get("StarSystem", "Unknown System")
-                    daily_events[event_date]["Docking"].append(f"Docked at **{station}** in **{system}**.")
-
-                elif event_type == "Undocked":
-                    station = event_data.get("StationName", "Unknown Station")
-                    daily_events[event_date]["Docking"].append(f"Undocked from **{station}**.")
-
-                elif event_type == "Location":
-                    system = event_data.get("StarSystem", "Unknown System")
-                    body = event_data.get("Body", "Deep Space")
-                    daily_events[event_date]["Location"].append(f"Current location: **{system}**, **{body}**.")
-
-                elif event_type == "Bounty":
-                    reward = event_data.get("Reward", 0)
-                    daily_events[event_date]["Combat"].append(f"Claimed a bounty of **{reward:,} Cr**.")
-
-                elif event_type == "MarketBuy":
-                    count = event_data.get("Count", 1)
-                    item = event_data.get("Type", "Unknown Item")
-                    daily_events[event_date]["Trade"].append(f"Purchased **{count}x {item}**.")
-
-                elif event_type == "MarketSell":
-                    count = event_data.get("Count", 1)
-                    item = event_data.get("Type", "Unknown Item")
-                    profit = event_data.get("TotalSale", 0)
-                    daily_events[event_date]["Trade"].append(f"Sold **{count}x {item}** for **{profit:,} Cr**.")
-
-                elif event_type == "Materials":
-                    raw_mats = len(event_data.get("Raw", []))
-                    encoded_mats = len(event_data.get("Encoded", []))
-                    manu_mats = len(event_data.get("Manufactured", []))
-                    daily_events[event_date]["Materials"].append(
-                        f"Gathered materials: **{raw_mats} Raw**, **{encoded_mats} Encoded**, **{manu_mats} Manufactured**."
-                    )
-
-                elif event_type == "MissionAccepted":
-                    mission_type = event_data.get("Name", "Unknown Mission")
-                    daily_events[event_date]["Missions"].append(f"Accepted mission: **{mission_type}**.")
-
-                elif event_type == "MissionCompleted":
-                    mission_type = event_data.get("Name", "Unknown Mission")
-                    payout = event_data.get("Reward", 0)
-                    daily_events[event_date]["Missions"].append(f"Completed mission: **{mission_type}**, earning **{payout:,} Cr**.")
-
-    except Exception as e:
-        logging.error(f"Error processing {logfile}: {e}")
+                for tracker in trackers:
+                    if event_type in tracker.EVENTS:
+                        tracker.handle_event(event_data)
+                if dedup is not None and dedup.is_unchanged_snapshot(event_data):
+                    continue
+
+                described = describe_event(event_data)
+                if described:
+                    category, text = described
+                    daily_events[event_date][category].append(text)
+
+                if sessions is not None:
+                    sessions.handle_event(event_data, described)
+
+        except Exception as e:
+            logging.error(f"Error processing {logfile}: {e}")
 
     return daily_events
 
-def save_markdown_summaries(daily_events):
-    """Saves daily events into Markdown and JSON files."""
+def save_markdown_summaries(daily_events, commander=DEFAULT_COMMANDER, output_dir=OUTPUT_DIR):
+    """Saves daily events into Markdown and JSON files. Returns the Markdown files written."""
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
     for date, events in daily_events.items():
         # Save Markdown log
-        md_file = os.path.join(OUTPUT_DIR, f"{date}.md")
+        md_file = os.path.join(output_dir, f"{date}.md")
         with open(md_file, "w", encoding="utf-8") as f:
-            f.write(f"# Commander TOADIE MUDGUTS - Log {date}\n\n")
+            f.write(f"# Commander {commander} - Log {date}\n\n")
             for category, entries in events.items():
                 f.write(f"## {category}\n")
                 for entry in entries:
                     f.write(f"- {entry}\n")
                 f.write("\n")
+        written.append(md_file)
         logging.info(f"📝 Saved daily Markdown log: {md_file}")
 
         # Save JSON log
-        json_file = os.path.join(OUTPUT_DIR, f"{date}.json")
+        json_file = os.path.join(output_dir, f"{date}.json")
         json_data = {
-            "commander": "TOADIE MUDGUTS",
+            "commander": commander,
             "date": date,
             "categories": events
         }
@@ -135,21 +128,49 @@ def save_markdown_summaries(daily_events):
             logging.info(f"📦 Saved daily JSON log: {json_file}")
         except Exception as e:
             logging.error(f"❌ Failed to write JSON log for {date}: {e}")
+    return written
 
-def main():
-    """Scans all logs, extracts summaries, and writes Markdown and JSON files."""
-    all_log_files = glob.glob(os.path.join(LOG_DIR, "Journal.*.log"))
-    new_logs = [lf for lf in all_log_files if lf not in processed_logs]
+def save_session_summaries(sessions, sessions_dir=SESSIONS_DIR):
+    """Saves per-session summaries (one play session, LoadGame to Shutdown) into Markdown and JSON files. Returns the Markdown files written."""
+    os.makedirs(sessions_dir, exist_ok=True)
+    written = []
+    for session in sessions:
+        session_id = session["session_id"]
+        md_file = os.path.join(sessions_dir, f"{session_id}.md")
+        with open(md_file, "w", encoding="utf-8") as f:
+            f.write(f"# Commander {session['commander']} - Session {session_id}\n\n")
+            f.write(f"_{session['start']} to {session['end']}_\n\n")
+            for category, entries in session["categories"].items():
+                f.write(f"## {category}\n")
+                for entry in entries:
+                    f.write(f"- {entry}\n")
+                f.write("\n")
+        written.append(md_file)
 
-    if not new_logs:
-        logging.info("No new logs to process.")
-        return
+        json_file = os.path.join(sessions_dir, f"{session_id}.json")
+        json_data = {
+            "commander": session["commander"],
+            "date": session["start"][:10],
+            "session_id": session_id,
+            "start": session["start"],
+            "end": session["end"],
+            "complete": session.get("complete", True),
+            "categories": session["categories"]
+        }
+        try:
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump(json_data, f, indent=2)
+            logging.info(f"📦 Saved session log: {json_file}")
+        except Exception as e:
+            logging.error(f"❌ Failed to write session log {session_id}: {e}")
+    return written
 
+def ingest_logs(logfiles, trackers, sessions, dedup=None):
+    """Replays journals in order through extract_events and merges their per-day lines."""
     all_events = defaultdict(lambda: defaultdict(list))
-
-    for logfile in new_logs:
+    for logfile in logfiles:
         logging.info(f"Processing {logfile}...")
-        events = extract_events(logfile)
+        events = extract_events(logfile, trackers, sessions, dedup)
 
         for date, event_dict in events.items():
             for category, entries in event_dict.items():
@@ -157,7 +178,104 @@ def main():
 
         processed_logs.add(logfile)
 
-    save_markdown_summaries(all_events)
+    if dedup is not None:
+        dedup.save()
+        if dedup.dropped or dedup.unchanged:
+            logging.info(f"🧹 Skipped {dedup.dropped} replayed events and {dedup.unchanged} unchanged snapshots.")
+    return all_events
+
+def write_summaries(all_events, trackers, sessions, commander=DEFAULT_COMMANDER):
+    """Adds tracker summaries, then writes daily and session summaries. Digests are refreshed by `captains_log digests`."""
+    for tracker in trackers:
+        for date in list(all_events):
+            for category, entries in tracker.daily_summary(date).items():
+                all_events[date][category].extend(entries)
+
+    written = save_markdown_summaries(all_events, commander, commander_path(OUTPUT_DIR, commander))
+
+    # The still-open session is written too (marked incomplete) and rewritten once it ends
+    completed_sessions, open_session = sessions.drain()
+    if open_session is not None:
+        completed_sessions.append(dict(open_session, complete=False))
+    # Tracker lines go on copies so they are never saved into the open session's state
+    for i, session in enumerate(completed_sessions):
+        categories = {category: list(entries) for category, entries in session["categories"].items()}
+        for tracker in trackers:
+            for category, entries in tracker.session_summary(session["start"], session["end"]).items():
+                categories.setdefault(category, []).extend(entries)
+        completed_sessions[i] = dict(session, categories=categories)
+    written += save_session_summaries(completed_sessions, commander_path(SESSIONS_DIR, commander))
+    index_written(written, commander)
+    # Queued before the session state is saved: a crash in between re-closes the session next
+    # run, and queueing the same session again is a no-op
+    if load_queue_settings(config)["enqueue_on_ingest"]:
+        queued = schedule_sessions(commander, [s["session_id"] for s in completed_sessions if s.get("complete", True)])
+        if queued:
+            logging.info(f"📥 Queued {queued} session diaries for {commander}")
+    sessions.save()
+    for tracker in trackers:
+        tracker.save()
+
+def make_trackers(commander=DEFAULT_COMMANDER):
+    """The trackers for one commander, each reading and writing that commander's partition."""
+    return [
+        InventoryTracker(commander_path(INVENTORY_DIR, commander)),
+        StatsRollups(commander_path(ROLLUPS_FILE, commander)),
+        TravelIndex(commander_path(TRAVEL_DB, commander)),
+        LoadoutTracker(commander_path(LOADOUT_DIR, commander)),
+        MissionTracker(commander_path(MISSIONS_FILE, commander)),
+        TradeLedger(commander_path(LEDGER_FILE, commander)),
+        ExplorationTracker(commander_path(EXPLORATION_FILE, commander)),
+    ]
+
+def process_commander(commander, logfiles):
+    """
+    Ingests one commander's new journals into their own trackers, sessions and summaries.
+    Partitions share no files, so commanders can run in separate processes.
+    Returns the journals processed.
+    """
+    logging.info(f"👤 {commander}: {len(logfiles)} new journal(s)")
+    trackers = make_trackers(commander)
+    sessions = SessionSegmenter(commander_path(SESSION_STATE_FILE, commander), commander=commander)
+    dedup = JournalDeduplicator(commander_path(DEDUP_STATE_FILE, commander))
+    all_events = ingest_logs(logfiles, trackers, sessions, dedup)
+    write_summaries(all_events, trackers, sessions, commander)
+    return list(logfiles)
+
+def main():
+    """Scans all logs, extracts summaries, and writes Markdown and JSON files."""
+    parser = argparse.ArgumentParser(description="Read new journals and write daily and session summaries, per commander")
+    parser.add_argument("--commander", help="Only ingest this commander's journals")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Commanders ingested in parallel (default: one per CPU)")
+    args = parser.parse_args()
+
+    all_log_files = glob.glob(os.path.join(LOG_DIR, "Journal.*.log"))
+    # Journal names embed their start time, so sorting replays them in order for the trackers
+    new_logs = sorted(lf for lf in all_log_files if lf not in processed_logs)
+
+    groups = partition_logs(new_logs)
+    if args.commander:
+        groups = {name: logs for name, logs in groups.items() if name == args.commander.upper()}
+    if not groups:
+        logging.info("No new logs to process.")
+        return
+
+    workers = max(1, min(args.workers, len(groups)))
+    if workers == 1:
+        for commander, logfiles in groups.items():
+            process_commander(commander, logfiles)
+    else:
+        logging.info(f"🚀 Ingesting {len(groups)} commanders with {workers} workers")
+        open_catalog().close()  # compiled (if stale) once here, so the workers only ever read it
+        # Workers send their spans here rather than each rotating the shared trace file
+        with trace_forwarding() as trace_queue, \
+                ProcessPoolExecutor(max_workers=workers, initializer=forward_traces_to, initargs=(trace_queue,)) as pool:
+            futures = {commander: pool.submit(process_commander, commander, logfiles) for commander, logfiles in groups.items()}
+            for commander, future in futures.items():
+                try:
+                    processed_logs.update(future.result())
+                except Exception as e:
+                    logging.error(f"❌ Ingest failed for {commander}: {e}")
 
     with open(INDEX_FILE, "w", encoding="utf-8") as f:
         json.dump(list(processed_logs), f, indent=4)
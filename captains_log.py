@@ -0,0 +1,71 @@
+"""
+Single entry point for the Captain's Log tools, and the script the PyInstaller build freezes:
+
+    captains_log ingest
+    captains_log diary --session 2024-12-08T194512
+    captains_log trade --by routes
+
+Each command is the matching script run as __main__, imported only when that command is
+chosen, so `captains_log --help` or a tracker query never pays for torch, chromadb or the
+embedder.
+"""
+import runpy
+import sys
+from typing import Dict, Tuple
+
+# command -> (module run as __main__, help)
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "run": ("pipeline_runner", "Run every out-of-date stage of the refresh, in parallel where possible"),
+    "ingest": ("build_commander_summaries", "Read new journals and write daily and session summaries"),
+    "diary": ("generate_diary_entry", "Write a diary entry for a day or session"),
+    "queue": ("diary_queue", "Queue diary jobs and run them with retries"),
+    "digests": ("rolling_summaries", "Refresh the weekly/monthly digests, or show the story so far"),
+    "stats": ("stats_rollups", "Credits, jumps and mission rollups per day, week and month"),
+    "trade": ("trade_ledger", "Trade routes and commodities ranked by realized profit"),
+    "missions": ("mission_tracker", "Open missions and recent mission outcomes"),
+    "ship": ("loadout_tracker", "Tracked ships and the current loadout"),
+    "exploration": ("exploration_tracker", "Exploration and exobiology facts for a day"),
+    "inventory": ("inventory_tracker", "Materials, cargo and locker holdings"),
+    "travel": ("travel_index", "Systems, stations and routes visited"),
+    "memory": ("diary_memory", "Index and search past diary entries"),
+    "search": ("search_index", "Full-text search over diaries and summaries"),
+    "live": ("live_state", "Watch Status/NavRoute/Market/Cargo.json as they change"),
+    "catalog": ("ship_catalog", "Compile or query the ship/module catalog"),
+    "lore": ("rag_data_loader", "Load rag_data/*.json into the lore vector store"),
+    "galnet": ("fetch_galnet_selenium", "Fetch new Galnet articles (needs Firefox and selenium)"),
+    "normalize-galnet": ("normalize_galnet_for_rag", "Turn fetched Galnet articles into lore entries"),
+    "validate": ("validate_rag_json", "Check the rag_data JSON files"),
+    "convert-logs": ("convert_commander_logs_to_json", "Convert Markdown commander logs to JSON"),
+    "trace": ("instrumentation", "Summarize the pipeline trace file"),
+}
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: captains_log <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_text}" for name, (_, help_text) in COMMANDS.items()]
+    lines += ["", "Run `captains_log <command> --help` for a command's own options."]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(usage())
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command '{command}'.\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module, _ = COMMANDS[command]
+    sys.argv = [f"captains_log {command}"] + rest
+    try:
+        runpy.run_module(module, run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
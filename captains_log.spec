@@ -0,0 +1,74 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# Onedir build of captains_log.py:  pyinstaller captains_log.spec
+#
+# Onedir starts straight from dist/captains_log/ instead of unpacking a onefile archive into
+# a temp folder on every launch. Commands are imported lazily by name, so they are listed as
+# hidden imports; the heavy packages nothing in the frozen app needs are excluded outright.
+#
+# CAPTAINS_LOG_EMBEDDER picks what the diary command may embed with:
+#   onnx (default)  onnxruntime + tokenizers, no torch   (see export_onnx_embedder.py)
+#   torch           sentence-transformers on torch, as in development
+#   none            hashing embedder only; smallest build
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+from captains_log import COMMANDS
+
+embedder = os.environ.get("CAPTAINS_LOG_EMBEDDER", "onnx")
+
+hiddenimports = sorted(module for module, _ in COMMANDS.values())
+excludes = [
+    # Only fetch_galnet_selenium.py and the benchmarks use these
+    "selenium", "matplotlib", "pandas", "IPython", "jupyter", "notebook", "pytest",
+    "tkinter", "gpt4all", "PyInstaller",
+    # Pulled in transitively by the ML stack, never used directly
+    "scipy", "sklearn", "sympy", "tensorflow", "keras", "jax", "torchvision", "torchaudio",
+    "PIL", "cv2", "datasets", "pyarrow",
+]
+if embedder != "torch":
+    excludes += ["torch", "sentence_transformers", "transformers", "safetensors", "huggingface_hub"]
+if embedder == "onnx":
+    hiddenimports += ["onnxruntime", "tokenizers"]
+else:
+    excludes += ["onnxruntime"]
+
+# config.json plus the sources ship_catalog.py compiles on first run
+datas = [("config.json", "."), ("rag_data/modules.json", "rag_data"), ("archive/ships_*.json", "archive")]
+
+a = Analysis(
+    ["captains_log.py"],
+    pathex=[SPECPATH],
+    binaries=[],
+    datas=datas,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes,
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name="captains_log",
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name="captains_log",
+)
@@ -0,0 +1,110 @@
+import os
+import re
+import json
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from journal_trackers import BASE_DIR, STATE_DIR, load_json, write_json_atomic
+
+COMMANDER_LOGS_FOLDER = os.path.join(BASE_DIR, "rag_data", "commander_logs")
+DIARY_FOLDER = os.path.join(BASE_DIR, "diary_logs")
+REGISTRY_FILE = os.path.join(STATE_DIR, "commanders.json")
+CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+HEADER_LINES = 64  # Fileheader, Commander and LoadGame are always among the first lines
+PARTITION_PREFIX = "cmdr_"
+
+# Roots that are split per commander; the primary commander keeps using them directly
+PARTITIONED_ROOTS = (STATE_DIR, COMMANDER_LOGS_FOLDER, DIARY_FOLDER)
+SHARED_STATE = ("catalog.sqlite", "commanders.json")  # the ship catalog and this registry
+
+
+def load_default_commander(config_path: str = CONFIG_PATH) -> str:
+    # Read directly rather than via vector_store.load_config, which would import numpy
+    return (load_json(config_path, {}).get("commander") or "TOADIE MUDGUTS").upper()
+
+
+DEFAULT_COMMANDER = load_default_commander()
+
+
+def commander_slug(name: str) -> str:
+    """'Toadie Mudguts' -> 'toadie_mudguts'"""
+    return re.sub(r"[^a-z0-9]+", "_", (name or "").lower()).strip("_") or "unknown"
+
+
+def is_primary(commander: Optional[str]) -> bool:
+    return not commander or commander.upper() == DEFAULT_COMMANDER
+
+
+def commander_path(path: str, commander: Optional[str] = None) -> str:
+    """
+    Moves a default path under ingest_state/, rag_data/commander_logs/ or diary_logs/ into
+    the commander's partition, e.g. ingest_state/rollups.sqlite ->
+    ingest_state/cmdr_jameson/rollups.sqlite. The primary commander (config.json "commander")
+    keeps the unpartitioned layout, so a single-commander install looks exactly as before.
+    """
+    if is_primary(commander):
+        return path
+    for root in PARTITIONED_ROOTS:
+        try:
+            relative = os.path.relpath(path, root)
+        except ValueError:  # a different drive on Windows
+            continue
+        if relative == "." or not relative.startswith(".."):
+            if root == STATE_DIR and relative in SHARED_STATE:
+                return path
+            partition = os.path.join(root, PARTITION_PREFIX + commander_slug(commander))
+            return partition if relative == "." else os.path.join(partition, relative)
+    return path
+
+
+def detect_commander(logfile: str) -> Optional[Tuple[str, Optional[str]]]:
+    """(commander name, FID) from a journal's Commander or LoadGame event, or None if it has neither."""
+    try:
+        with open(logfile, "r", encoding="utf-8", errors="replace") as f:
+            for _, line in zip(range(HEADER_LINES), f):
+                if '"Commander"' not in line and '"LoadGame"' not in line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("event") == "Commander" and event.get("Name"):
+                    return event["Name"].upper(), event.get("FID")
+                if event.get("event") == "LoadGame" and event.get("Commander"):
+                    return event["Commander"].upper(), event.get("FID")
+    except OSError:
+        pass
+    return None
+
+
+def partition_logs(logfiles: List[str], registry_file: str = REGISTRY_FILE) -> Dict[str, List[str]]:
+    """
+    Groups journals (already in time order) by commander. A journal without a Commander or
+    LoadGame event (a crash right after launch, say) goes with the journal before it.
+    Newly seen commanders and their FIDs are recorded in the registry.
+    """
+    registry = load_json(registry_file, {})
+    groups: Dict[str, List[str]] = {}
+    current = DEFAULT_COMMANDER
+    for logfile in logfiles:
+        found = detect_commander(logfile)
+        if found:
+            current, fid = found
+            entry = registry.setdefault(current, {"slug": commander_slug(current), "first_seen": datetime.date.today().isoformat()})
+            if fid:
+                entry["fid"] = fid
+        groups.setdefault(current, []).append(logfile)
+    if registry:
+        write_json_atomic(registry_file, registry, indent=2)
+    return groups
+
+
+def known_commanders(registry_file: str = REGISTRY_FILE) -> List[str]:
+    """Every commander seen by ingest, primary first."""
+    names = set(load_json(registry_file, {})) | {DEFAULT_COMMANDER}
+    return sorted(names, key=lambda name: (not is_primary(name), name))
+
+
+def display_name(commander: str) -> str:
+    """'TOADIE MUDGUTS' -> 'Toadie Mudguts', for the diary persona."""
+    return commander.title()
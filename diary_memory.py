@@ -0,0 +1,317 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+import argparse
+from datetime import date as date_cls
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from commanders import DEFAULT_COMMANDER, commander_path, known_commanders
+from journal_trackers import STATE_DIR, load_json, write_json_atomic
+from vector_store import load_config, normalize_rows
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+DIARY_FOLDER = os.path.join(BASE_DIR, "diary_logs")
+COMMANDER_LOGS_FOLDER = os.path.join(BASE_DIR, "rag_data", "commander_logs")
+MEMORY_DIR = os.path.join(STATE_DIR, "memory")
+COMPACT_MIN_DEAD = 256  # stale chunks tolerated before the index is rewritten
+
+DEFAULT_MEMORY_SETTINGS: Dict[str, Any] = {
+    "token_budget": 350,
+    "half_life_days": 30,
+    "candidates": 24,
+    "chunk_words": 120,
+}
+
+
+def load_memory_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merges the "memory" block of config.json over DEFAULT_MEMORY_SETTINGS."""
+    if config is None:
+        config = load_config()
+    settings = dict(DEFAULT_MEMORY_SETTINGS)
+    settings.update(config.get("memory", {}) or {})
+    return settings
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return len(text) // 4 + 1
+
+
+def chunk_text(text: str, chunk_words: int) -> List[str]:
+    """Groups paragraphs into chunks of about chunk_words words, splitting oversized paragraphs."""
+    chunks: List[str] = []
+    current: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        words = paragraph.split()
+        if not words:
+            continue
+        if current and len(current) + len(words) > chunk_words:
+            chunks.append(" ".join(current))
+            current = []
+        while len(words) > chunk_words:
+            chunks.append(" ".join(words[:chunk_words]))
+            words = words[chunk_words:]
+        current.extend(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def summary_text(categories: Dict[str, List[str]]) -> str:
+    """Flattens a daily summary into prose-like lines, one paragraph per category."""
+    return "\n\n".join(
+        f"{category}: " + " ".join(line.replace("**", "") for line in lines)
+        for category, lines in categories.items() if lines
+    )
+
+
+class DiaryMemory:
+    """
+    Long-term memory over past diaries and daily summaries.
+
+    Chunks live in their own small index under ingest_state/memory/: normalised float32 rows
+    in vectors.f32 and one JSON record per row in chunks.jsonl. Both files are append-only,
+    so indexing a document writes only that document's chunks. A changed document appends
+    a new batch of chunks and its older batch is masked out; once dead rows outnumber live
+    ones the files are compacted. recall() ranks earlier chunks by cosine similarity
+    weighted by recency and returns as many as fit a fixed token budget.
+    """
+
+    def __init__(self, embedder, memory_dir: str = MEMORY_DIR, settings: Optional[Dict[str, Any]] = None):
+        self.embedder = embedder
+        self.settings = settings or load_memory_settings()
+        self.memory_dir = memory_dir
+        self.vectors_path = os.path.join(memory_dir, "vectors.f32")
+        self.chunks_path = os.path.join(memory_dir, "chunks.jsonl")
+        self.meta_path = os.path.join(memory_dir, "meta.json")
+        self._migrate()
+        self.dim: Optional[int] = load_json(self.meta_path, {}).get("dim")
+        self.chunks: List[Dict[str, Any]] = []
+        self._blocks: List[np.ndarray] = []
+        self._load()
+        self._index_batches()
+
+    def _index_batches(self) -> None:
+        # doc -> [hash, batch, live rows] of its latest batch, and the number of dead rows overall
+        self.latest: Dict[str, List[Any]] = {}
+        for chunk in self.chunks:
+            entry = self.latest.get(chunk["doc"])
+            if entry is None or entry[1] != chunk["batch"]:
+                entry = self.latest[chunk["doc"]] = [chunk["hash"], chunk["batch"], 0]
+            entry[2] += chunk["text"] is not None
+        self.dead = len(self.chunks) - sum(entry[2] for entry in self.latest.values())
+
+    # --- storage --------------------------------------------------------
+
+    def _load(self) -> None:
+        if os.path.exists(self.chunks_path):
+            with open(self.chunks_path, "r", encoding="utf-8") as f:
+                # A line without its newline is a write cut short; it and its row are dropped
+                self.chunks = [json.loads(line) for line in f if line.endswith("\n")]
+        rows = np.fromfile(self.vectors_path, dtype=np.float32) if self.dim and os.path.exists(self.vectors_path) else np.zeros(0, dtype=np.float32)
+        n_rows = len(rows) // self.dim if self.dim else 0
+        if n_rows != len(self.chunks):
+            logging.warning("⚠️ Memory index was cut short by an interrupted write; dropping the unmatched tail.")
+            count = min(n_rows, len(self.chunks))
+            self.chunks = self.chunks[:count]
+            self._rewrite(rows[:count * (self.dim or 0)].reshape(count, -1))
+            return
+        if n_rows:
+            self._blocks = [rows.reshape(n_rows, self.dim)]
+
+    def _migrate(self) -> None:
+        """Converts the earlier whole-file index (vectors.npy + chunks.json) to the append-only files."""
+        old_vectors, old_chunks = os.path.join(self.memory_dir, "vectors.npy"), os.path.join(self.memory_dir, "chunks.json")
+        if os.path.exists(self.chunks_path) or not os.path.exists(old_chunks):
+            return
+        chunks = load_json(old_chunks, [])
+        matrix = np.load(old_vectors) if chunks and os.path.exists(old_vectors) else None
+        if matrix is not None and len(matrix) == len(chunks):
+            first: Dict[str, int] = {}
+            for i, chunk in enumerate(chunks):
+                chunk["batch"] = first.setdefault(chunk["doc"], i)
+            self.chunks, self.dim = chunks, int(matrix.shape[1])
+            self._rewrite(matrix)
+        for path in (old_vectors, old_chunks):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _rewrite(self, matrix: np.ndarray) -> None:
+        """Replaces both files with self.chunks and the matching rows."""
+        os.makedirs(self.memory_dir, exist_ok=True)
+        if self.dim:
+            write_json_atomic(self.meta_path, {"dim": self.dim})
+        tmp_vectors = self.vectors_path + ".tmp"
+        np.ascontiguousarray(matrix, dtype=np.float32).tofile(tmp_vectors)
+        tmp_chunks = self.chunks_path + ".tmp"
+        with open(tmp_chunks, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(chunk) + "\n" for chunk in self.chunks)
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_chunks, self.chunks_path)
+        self._blocks = [matrix.astype(np.float32)] if len(matrix) else []
+
+    def _append(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        os.makedirs(self.memory_dir, exist_ok=True)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            write_json_atomic(self.meta_path, {"dim": self.dim})
+        # Rows first: a crash in between leaves a row without a record, which _load drops
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.chunks_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        self.chunks.extend(records)
+        self._blocks.append(vectors)
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        if len(self._blocks) > 1:
+            self._blocks = [np.concatenate(self._blocks)]
+        return self._blocks[0] if self._blocks else None
+
+    def alive(self) -> np.ndarray:
+        """Rows from each document's latest batch; older batches and removal markers are dead."""
+        return np.fromiter((chunk["batch"] == self.latest[chunk["doc"]][1] and chunk["text"] is not None for chunk in self.chunks),
+                           dtype=bool, count=len(self.chunks))
+
+    def _compact_if_needed(self) -> None:
+        if self.dead < COMPACT_MIN_DEAD or self.dead <= len(self.chunks) - self.dead:
+            return
+        dead, alive = self.dead, self.alive()
+        matrix = self.matrix[alive]
+        self.chunks = [chunk for chunk, keep in zip(self.chunks, alive) if keep]
+        first: Dict[str, int] = {}
+        for i, chunk in enumerate(self.chunks):
+            chunk["batch"] = first.setdefault(chunk["doc"], i)
+        self._rewrite(matrix)
+        self._index_batches()
+        logging.info(f"🧹 Compacted the memory index ({dead} stale chunks dropped).")
+
+    # --- indexing -------------------------------------------------------
+
+    def index_document(self, key: str, kind: str, text: str) -> bool:
+        """
+        Adds or refreshes one document. Returns False if it was already indexed unchanged.
+
+        Args:
+            key (str): Diary name, a date (YYYY-MM-DD) or session ID (YYYY-MM-DDTHHMMSS).
+            kind (str): "diary" or "summary".
+            text (str): Full document text.
+        """
+        doc = f"{kind}:{key}"
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        previous = self.latest.get(doc)
+        if previous is not None and previous[0] == digest:
+            return False
+
+        chunks = chunk_text(text, self.settings["chunk_words"])
+        batch = len(self.chunks)
+        base = {"doc": doc, "key": key, "date": key[:10], "kind": kind, "hash": digest, "batch": batch}
+        if chunks:
+            vectors = normalize_rows(np.atleast_2d(self.embedder.encode(chunks)).astype(np.float32))
+            self._append([dict(base, text=chunk) for chunk in chunks], vectors)
+        elif previous is not None:
+            # Now empty: a zero row marked text=None retires the document's earlier chunks
+            self._append([dict(base, text=None)], np.zeros((1, self.dim), dtype=np.float32))
+        else:
+            return False
+        self.dead += (previous[2] if previous else 0) + (0 if chunks else 1)
+        self.latest[doc] = [digest, batch, len(chunks)]
+        self._compact_if_needed()
+        return True
+
+    def index_diary(self, key: str, content: str) -> bool:
+        return self.index_document(key, "diary", content)
+
+    def index_summary(self, key: str, categories: Dict[str, List[str]]) -> bool:
+        return self.index_document(key, "summary", summary_text(categories))
+
+    # --- retrieval ------------------------------------------------------
+
+    def recall(self, query: str, key: str, token_budget: Optional[int] = None) -> List[str]:
+        """
+        Earlier memories relevant to the query, newest-weighted, within a token budget.
+
+        Args:
+            query (str): Text describing the entry being written.
+            key (str): The entry's date or session ID; only documents that sort before it are used.
+            token_budget (int, optional): Defaults to settings["token_budget"].
+        """
+        if self.matrix is None or not self.chunks or not query.strip():
+            return []
+        budget = self.settings["token_budget"] if token_budget is None else token_budget
+        today = date_cls.fromisoformat(key[:10])
+
+        eligible = self.alive() & np.fromiter((chunk["key"] < key for chunk in self.chunks), dtype=bool, count=len(self.chunks))
+        if not eligible.any():
+            return []
+        query_vector = normalize_rows(np.atleast_2d(self.embedder.encode(query)).astype(np.float32))[0]
+        similarity = self.matrix @ query_vector
+        ages = np.fromiter(((today - date_cls.fromisoformat(chunk["date"])).days for chunk in self.chunks), dtype=np.float32, count=len(self.chunks))
+        recency = np.power(0.5, np.clip(ages, 0, None) / float(self.settings["half_life_days"]))
+        scores = np.where(eligible, similarity * (0.5 + 0.5 * recency), -np.inf)
+
+        n_candidates = min(int(self.settings["candidates"]), int(eligible.sum()))
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        memories: List[str] = []
+        used = 0
+        for i in top[np.argsort(-scores[top])]:
+            chunk = self.chunks[i]
+            text = f"({chunk['date']}) {chunk['text']}"
+            cost = estimate_tokens(text)
+            if used + cost > budget:
+                continue
+            memories.append(text)
+            used += cost
+        return memories
+
+
+def sync_memory(memory: DiaryMemory, diary_dir: str = DIARY_FOLDER, logs_dir: str = COMMANDER_LOGS_FOLDER) -> int:
+    """Indexes every saved diary and daily summary that is new or changed. Returns the number indexed."""
+    indexed = 0
+    for path in sorted(glob.glob(os.path.join(diary_dir, "*.txt"))):
+        key = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        if content.startswith("Error:"):
+            continue
+        indexed += memory.index_diary(key, content)
+    for path in sorted(glob.glob(os.path.join(logs_dir, "*.json"))):
+        key = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        indexed += memory.index_summary(key, data.get("categories", {}))
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index or query the commander's long-term diary memory")
+    parser.add_argument("--sync", action="store_true", help="Index new or changed diaries and daily summaries")
+    parser.add_argument("--query", help="Show what would be recalled for this text")
+    parser.add_argument("--before", default="9999-12-31", help="Only recall entries before this date/session ID")
+    parser.add_argument("--commander", help="Whose memory (default: --sync indexes every commander; --query uses the one in config.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    from embedder import load_embedder
+    embedder = load_embedder()
+
+    if args.sync:
+        for commander in [args.commander] if args.commander else known_commanders():
+            memory = DiaryMemory(embedder, commander_path(MEMORY_DIR, commander))
+            indexed = sync_memory(memory, commander_path(DIARY_FOLDER, commander), commander_path(COMMANDER_LOGS_FOLDER, commander))
+            logging.info(f"🧠 {commander}: indexed {indexed} new or changed documents ({len(memory.chunks)} chunks total).")
+    if args.query:
+        memory = DiaryMemory(embedder, commander_path(MEMORY_DIR, args.commander or DEFAULT_COMMANDER))
+        for text in memory.recall(args.query, args.before):
+            print(f"- {text}\n")
+
+
+if __name__ == "__main__":
+    main()
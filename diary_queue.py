@@ -0,0 +1,360 @@
+import os
+import glob
+import time
+import uuid
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from commanders import COMMANDER_LOGS_FOLDER, DEFAULT_COMMANDER, DIARY_FOLDER, commander_path, known_commanders
+from journal_trackers import STATE_DIR
+
+QUEUE_DB = os.path.join(STATE_DIR, "diary_queue.sqlite")  # one queue for every commander
+
+PRIORITY_LIVE = 10  # sessions ingest just closed
+PRIORITY_MANUAL = 5
+PRIORITY_BACKFILL = 0  # days and sessions that never got a diary
+
+DEFAULT_QUEUE_SETTINGS: Dict[str, Any] = {
+    "concurrency": 1,  # LM Studio answers one request at a time; raise for a server that batches
+    "max_attempts": 4,
+    "retry_base_seconds": 30,
+    "retry_max_seconds": 1800,
+    "lease_seconds": 300,  # renewed every lease_seconds / 3 while a job runs
+    "enqueue_on_ingest": True,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    commander TEXT NOT NULL,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL,
+    lease_token TEXT,
+    lease_until REAL,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    UNIQUE (commander, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, key DESC);
+"""
+
+STATES = ("pending", "running", "done", "failed")
+
+
+def load_queue_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merges the "diary_queue" block of config.json over DEFAULT_QUEUE_SETTINGS."""
+    if config is None:
+        from vector_store import load_config
+        config = load_config()
+    settings = dict(DEFAULT_QUEUE_SETTINGS)
+    settings.update(config.get("diary_queue", {}) or {})
+    return settings
+
+
+def job_kind(key: str) -> str:
+    """'2024-12-08' is a day, '2024-12-08T194512' a session."""
+    return "session" if "T" in key else "day"
+
+
+class DiaryQueue:
+    """
+    Diary generation jobs in SQLite, one per (commander, date or session ID).
+
+    A job is pending until a worker claims it, which marks it running under a lease that
+    the worker keeps renewing. Success marks it done; a failure puts it back to pending
+    with exponential backoff, or marks it failed after max_attempts. A worker that dies
+    simply stops renewing its lease, so the job is claimed again once the lease runs out,
+    and the lease token makes a late finish by the old worker a no-op. Jobs are unique
+    per commander and key, so enqueueing the same session twice never queues it twice.
+    """
+
+    def __init__(self, path: str = QUEUE_DB, settings: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.settings = settings if settings is not None else load_queue_settings()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # ingest processes enqueue while workers run
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call: workers are threads and ingest workers are processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, commander: str, key: str, priority: int = PRIORITY_MANUAL, force: bool = False) -> None:
+        """
+        Queues a diary for a date or session ID. An existing job keeps its state (taking the
+        higher priority); with force, a done or failed job is queued again from scratch.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (commander, key, kind, priority, state, run_after, created, updated) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?, ?) "
+                "ON CONFLICT (commander, key) DO UPDATE SET "
+                "priority = MAX(jobs.priority, excluded.priority), "
+                "state = CASE WHEN ? AND jobs.state IN ('done', 'failed') THEN 'pending' ELSE jobs.state END, "
+                "attempts = CASE WHEN ? AND jobs.state IN ('done', 'failed') THEN 0 ELSE jobs.attempts END, "
+                "run_after = CASE WHEN ? AND jobs.state IN ('done', 'failed') THEN excluded.run_after ELSE jobs.run_after END, "
+                "updated = excluded.updated",
+                (commander.upper(), key, job_kind(key), priority, now, now, now, force, force, force),
+            )
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """The most urgent runnable job (highest priority, then newest key), now leased to the caller."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = conn.execute(
+                        "SELECT * FROM jobs WHERE (state = 'pending' AND run_after <= ?) "
+                        "OR (state = 'running' AND lease_until < ?) "
+                        "ORDER BY priority DESC, key DESC LIMIT 1",
+                        (now, now),
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+                    if row["state"] == "running" and row["attempts"] >= self.settings["max_attempts"]:
+                        # Its last attempt died with the worker running it
+                        conn.execute("UPDATE jobs SET state = 'failed', error = ?, updated = ? WHERE id = ?",
+                                     ("worker lost (lease expired)", now, row["id"]))
+                        continue
+                    token = uuid.uuid4().hex
+                    conn.execute(
+                        "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_token = ?, "
+                        "lease_until = ?, updated = ? WHERE id = ?",
+                        (token, now + self.settings["lease_seconds"], now, row["id"]),
+                    )
+                    conn.execute("COMMIT")
+                    return dict(row, state="running", attempts=row["attempts"] + 1, lease_token=token)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, job: Dict[str, Any]) -> bool:
+        """Extends a running job's lease; False if another worker has taken it over."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND lease_token = ? AND state = 'running'",
+                (now + self.settings["lease_seconds"], now, job["id"], job["lease_token"]),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', error = NULL, lease_token = NULL, lease_until = NULL, updated = ? "
+                "WHERE id = ? AND lease_token = ?",
+                (now, job["id"], job["lease_token"]),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job: Dict[str, Any], error: str) -> Optional[str]:
+        """
+        Records a failed attempt; returns the job's new state (pending for a retry, or failed),
+        or None if another worker has taken the job over and nothing was changed.
+        """
+        now = time.time()
+        if job["attempts"] >= self.settings["max_attempts"]:
+            state, run_after = "failed", now
+        else:
+            delay = min(self.settings["retry_base_seconds"] * 2 ** (job["attempts"] - 1), self.settings["retry_max_seconds"])
+            state, run_after = "pending", now + delay
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, run_after = ?, error = ?, lease_token = NULL, lease_until = NULL, updated = ? "
+                "WHERE id = ? AND lease_token = ?",
+                (state, run_after, error[:500], now, job["id"], job["lease_token"]),
+            )
+            return state if cursor.rowcount == 1 else None
+
+    def retry_failed(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, run_after = ?, updated = ? WHERE state = 'failed'",
+                (now, now),
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            found = dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        return {state: found.get(state, 0) for state in STATES}
+
+    def jobs(self, state: str, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY priority DESC, key DESC LIMIT ?", (state, limit))
+            return [dict(row) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        """When the next pending job becomes runnable (or a running one's lease runs out); None if there is no work left."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(CASE state WHEN 'pending' THEN run_after ELSE lease_until END) FROM jobs "
+                "WHERE state IN ('pending', 'running')"
+            ).fetchone()
+        return row[0]
+
+
+def generate_job(job: Dict[str, Any]) -> None:
+    """Writes the diary for one job; raises if the log is missing or generation fails."""
+    from ai_generation import generate_diary, save_diary
+    from generate_diary_entry import COMMANDER_LOGS_FOLDER, SESSIONS_FOLDER, load_commander_log
+
+    folder = SESSIONS_FOLDER if job["kind"] == "session" else COMMANDER_LOGS_FOLDER
+    commander, activities = load_commander_log(job["key"], job["commander"], folder)
+    save_diary(job["key"], generate_diary(commander, job["key"], activities), commander)
+
+
+class _Lease(threading.Thread):
+    """Renews a job's lease in the background while the worker is busy with it."""
+
+    def __init__(self, queue: DiaryQueue, job: Dict[str, Any]):
+        super().__init__(name=f"lease-{job['id']}", daemon=True)
+        self.queue, self.job = queue, job
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.queue.settings["lease_seconds"] / 3):
+            if not self.queue.renew(self.job):
+                logging.warning(f"⚠️ Lost the lease on diary job {self.job['commander']} {self.job['key']}")
+                return
+
+
+def run_job(queue: DiaryQueue, job: Dict[str, Any], handler: Callable[[Dict[str, Any]], None] = generate_job) -> bool:
+    lease = _Lease(queue, job)
+    lease.start()
+    try:
+        handler(job)
+    except Exception as e:
+        state = queue.fail(job, str(e) or type(e).__name__)
+        if state is None:
+            logging.warning(f"⚠️ Diary job {job['commander']} {job['key']} failed after another worker took it over: {e}")
+        else:
+            logging.warning(f"⚠️ Diary job {job['commander']} {job['key']} failed (attempt {job['attempts']}, now {state}): {e}")
+        return False
+    finally:
+        lease.stopped.set()
+    if queue.complete(job):
+        logging.info(f"✅ Diary job {job['commander']} {job['key']} done")
+    else:
+        logging.warning(f"⚠️ Diary job {job['commander']} {job['key']} finished after another worker took it over")
+    return True
+
+
+def work(queue: DiaryQueue, concurrency: Optional[int] = None, forever: bool = False, poll_seconds: float = 5.0,
+         handler: Callable[[Dict[str, Any]], None] = generate_job) -> int:
+    """
+    Drains the queue with at most `concurrency` jobs in flight (default from the settings).
+    Waits out retry backoff until every job is done or failed; with forever, keeps polling
+    for new work instead. Returns the number of jobs that succeeded.
+    """
+    concurrency = max(1, concurrency or queue.settings["concurrency"])
+    succeeded = [0]
+    lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            job = queue.claim()
+            if job is not None:
+                if run_job(queue, job, handler):
+                    with lock:
+                        succeeded[0] += 1
+                continue
+            due = queue.next_due()
+            if due is None and not forever:
+                return
+            time.sleep(min(max((due or 0) - time.time(), 0.05), poll_seconds))
+
+    threads = [threading.Thread(target=worker, name=f"diary-worker-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return succeeded[0]
+
+
+def schedule_sessions(commander: str, session_ids: Iterable[str], queue: Optional[DiaryQueue] = None) -> int:
+    """Queues diaries for sessions ingest has just closed. Returns the number queued."""
+    session_ids = list(session_ids)
+    if not session_ids:
+        return 0
+    queue = queue or DiaryQueue()
+    for session_id in session_ids:
+        queue.enqueue(commander, session_id, PRIORITY_LIVE)
+    return len(session_ids)
+
+
+def missing_diaries(commander: str) -> List[str]:
+    """Days and sessions with a summary but no diary (or only a saved error message)."""
+    logs_dir = commander_path(COMMANDER_LOGS_FOLDER, commander)
+    diary_dir = commander_path(DIARY_FOLDER, commander)
+    keys = [os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(logs_dir, "*.json"))]
+    keys += [os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(logs_dir, "sessions", "*.json"))]
+    missing = []
+    for key in keys:
+        diary_path = os.path.join(diary_dir, f"{key}.txt")
+        if os.path.exists(diary_path):
+            with open(diary_path, "r", encoding="utf-8") as f:
+                if not f.read(6).startswith("Error:"):
+                    continue
+        missing.append(key)
+    return sorted(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue and run diary generation jobs")
+    parser.add_argument("--work", action="store_true", help="Run queued jobs until none are left")
+    parser.add_argument("--forever", action="store_true", help="With --work, keep waiting for new jobs")
+    parser.add_argument("--concurrency", type=int, help="Jobs in flight at once (default: diary_queue.concurrency in config.json)")
+    parser.add_argument("--enqueue", nargs="*", metavar="KEY", help="Queue diaries for these dates or session IDs")
+    parser.add_argument("--force", action="store_true", help="With --enqueue, redo jobs that are already done")
+    parser.add_argument("--backfill", action="store_true", help="Queue every day and session that has no diary yet")
+    parser.add_argument("--retry-failed", action="store_true", help="Give failed jobs a fresh set of attempts")
+    parser.add_argument("--commander", help="Commander for --enqueue (default: the commander in config.json) or --backfill (default: all)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    queue = DiaryQueue()
+
+    for key in args.enqueue or []:
+        queue.enqueue(args.commander or DEFAULT_COMMANDER, key, PRIORITY_MANUAL, force=args.force)
+        logging.info(f"📥 Queued {(args.commander or DEFAULT_COMMANDER).upper()} {key}")
+    if args.backfill:
+        commanders = [args.commander] if args.commander else known_commanders()
+        for commander in commanders:
+            keys = missing_diaries(commander)
+            for key in keys:
+                queue.enqueue(commander, key, PRIORITY_BACKFILL)
+            logging.info(f"📥 Queued {len(keys)} missing diaries for {commander.upper()}")
+    if args.retry_failed:
+        logging.info(f"🔁 {queue.retry_failed()} failed jobs queued again")
+    if args.work:
+        logging.info(f"✅ {work(queue, args.concurrency, args.forever)} diaries written")
+
+    counts = queue.counts()
+    print(", ".join(f"{state}: {n}" for state, n in counts.items()))
+    for job in queue.jobs("failed"):
+        print(f"- failed {job['commander']} {job['key']} after {job['attempts']} attempts: {job['error']}")
+
+
+if __name__ == "__main__":
+    main()
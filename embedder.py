@@ -0,0 +1,158 @@
+import os
+import re
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from instrumentation import span
+from vector_store import load_config, normalize_rows
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+ONNX_MODEL_DIR = os.path.join(BASE_DIR, "models", "all-MiniLM-L6-v2-onnx")
+
+DEFAULT_EMBEDDER_SETTINGS: Dict[str, Any] = {
+    "backend": "torch",
+    "model_name": "all-MiniLM-L6-v2",
+    "onnx_model": os.path.join(ONNX_MODEL_DIR, "model.onnx"),
+    "tokenizer": os.path.join(ONNX_MODEL_DIR, "tokenizer.json"),
+    "threads": 0,
+    "max_length": 256,
+    "batch_size": 64,
+    "dimensions": 384,
+}
+
+VALID_EMBEDDER_BACKENDS = ("torch", "onnx", "hashing")
+
+
+def load_embedder_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merges the "embedder" block of config.json over DEFAULT_EMBEDDER_SETTINGS."""
+    if config is None:
+        config = load_config()
+    settings = dict(DEFAULT_EMBEDDER_SETTINGS)
+    settings.update(config.get("embedder", {}) or {})
+    if settings["backend"] not in VALID_EMBEDDER_BACKENDS:
+        raise ValueError(f"Unsupported embedder backend '{settings['backend']}', expected one of {VALID_EMBEDDER_BACKENDS}")
+    return settings
+
+
+class TorchEmbedder:
+    """SentenceTransformer on PyTorch; the reference implementation."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", threads: int = 0, batch_size: int = 64):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        with span("embed.encode", backend="torch", texts=1 if isinstance(texts, str) else len(texts)):
+            vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEmbedder:
+    """
+    The same MiniLM model exported to ONNX (optionally int8-quantized) and run with
+    onnxruntime plus a Rust fast tokenizer, so neither torch nor transformers is imported.
+    Mean pooling and L2 normalisation match the sentence-transformers pipeline.
+    """
+
+    def __init__(self, model_path: str, tokenizer_path: str, threads: int = 0, max_length: int = 256, batch_size: int = 64):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return normalize_rows(pooled.astype(np.float32))
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, 0), dtype=np.float32)
+        with span("embed.encode", backend="onnx", texts=len(batch)):
+            vectors = np.concatenate([
+                self.encode_batch(batch[start:start + self.batch_size])
+                for start in range(0, len(batch), self.batch_size)
+            ])
+        return vectors[0] if single else vectors
+
+
+class HashingEmbedder:
+    """
+    Feature-hashed bag of words: deterministic, model-free and fast, but with no notion of
+    meaning beyond shared words. Meant for benchmarks and machines without the model files.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        vectors = np.zeros((len(batch), self.dimensions), dtype=np.float32)
+        with span("embed.encode", backend="hashing", texts=len(batch)):
+            for row, text in enumerate(batch):
+                for word in re.findall(r"\w+", text.lower()):
+                    digest = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+                    vectors[row, digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+            vectors = normalize_rows(vectors)
+        return vectors[0] if single else vectors
+
+
+def load_embedder(config: Optional[Dict[str, Any]] = None, settings: Optional[Dict[str, Any]] = None):
+    """
+    Builds the embedder selected by the "embedder" block of config.json.
+
+    Falls back to the torch path if the ONNX model has not been exported yet
+    (see export_onnx_embedder.py), and from torch to ONNX, then hashing, in builds that
+    leave sentence-transformers out (see captains_log.spec).
+    """
+    if settings is None:
+        settings = load_embedder_settings(config)
+
+    if settings["backend"] == "hashing":
+        return HashingEmbedder(settings["dimensions"])
+
+    if settings["backend"] == "onnx":
+        if os.path.exists(settings["onnx_model"]) and os.path.exists(settings["tokenizer"]):
+            logging.info(f"🧠 Using ONNX embedder: {settings['onnx_model']}")
+            return OnnxEmbedder(settings["onnx_model"], settings["tokenizer"], settings["threads"], settings["max_length"], settings["batch_size"])
+        logging.warning(f"⚠️ ONNX model not found at {settings['onnx_model']}; falling back to SentenceTransformer.")
+
+    try:
+        return TorchEmbedder(settings["model_name"], settings["threads"], settings["batch_size"])
+    except ImportError as e:
+        if settings["backend"] != "onnx" and os.path.exists(settings["onnx_model"]) and os.path.exists(settings["tokenizer"]):
+            logging.warning(f"⚠️ SentenceTransformer unavailable ({e}); using the ONNX embedder.")
+            return OnnxEmbedder(settings["onnx_model"], settings["tokenizer"], settings["threads"], settings["max_length"], settings["batch_size"])
+        logging.warning(f"⚠️ No embedding model available ({e}); using the hashing embedder, retrieval will be keyword-only.")
+        return HashingEmbedder(settings["dimensions"])
@@ -0,0 +1,277 @@
+import os
+import argparse
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from journal_trackers import STATE_DIR, JournalTracker, load_json, write_json_atomic
+
+EXPLORATION_FILE = os.path.join(STATE_DIR, "exploration.json")
+RECENT_DAYS_KEPT = 7
+RECENT_SYSTEMS_KEPT = 64  # systems whose scanned bodies are remembered, so re-scans are not counted twice
+MAX_NOTABLE_PER_SYSTEM = 5
+
+# Rough base values (Cr) for a plain FSS scan of a typical body. The game's formula also
+# depends on mass; these are close enough for "roughly N Cr" in a log entry.
+PLANET_VALUES = {
+    "Earthlike body": 270_000,
+    "Water world": 100_000,
+    "Ammonia world": 140_000,
+    "Metal rich body": 31_000,
+    "High metal content body": 14_000,
+    "Sudarsky class I gas giant": 3_800,
+    "Sudarsky class II gas giant": 28_000,
+    "Gas giant with water based life": 900,
+    "Gas giant with ammonia based life": 800,
+}
+TERRAFORMABLE_VALUES = {
+    "Water world": 270_000,
+    "High metal content body": 160_000,
+    "Rocky body": 130_000,
+}
+STAR_VALUES = {"N": 22_600, "H": 22_600, "SupermassiveBlackHole": 33_000}
+WHITE_DWARF_VALUE = 14_000
+DEFAULT_BODY_VALUE = 500
+DEFAULT_STAR_VALUE = 1_200
+
+FIRST_DISCOVERY_MULTIPLIER = 2.6
+MAPPED_MULTIPLIER = 3.33
+FIRST_MAPPED_MULTIPLIER = 1.11
+EFFICIENCY_MULTIPLIER = 1.25
+
+NOTABLE_CLASSES = frozenset({"Earthlike body", "Water world", "Ammonia world"})
+
+# Rough Vista Genomics payouts per genus, for samples not yet sold
+GENUS_VALUES = {
+    "aleoida": 7_000_000, "bacterium": 1_700_000, "cactoida": 3_600_000, "clypeus": 8_400_000,
+    "concha": 4_600_000, "electricae": 6_300_000, "fonticulua": 2_500_000, "frutexa": 3_000_000,
+    "fumerola": 6_300_000, "fungoida": 2_600_000, "osseus": 4_500_000, "recepta": 9_000_000,
+    "stratum": 5_000_000, "tubus": 6_000_000, "tussock": 3_500_000,
+}
+DEFAULT_GENUS_VALUE = 1_500_000
+
+
+def scan_value(event: Dict[str, Any]) -> Optional[int]:
+    """Estimated base value of a Scan, or None for belt clusters and rings."""
+    star_type = event.get("StarType")
+    if star_type:
+        if star_type.startswith("D"):
+            return WHITE_DWARF_VALUE
+        return STAR_VALUES.get(star_type, DEFAULT_STAR_VALUE)
+    planet_class = event.get("PlanetClass")
+    if not planet_class:
+        return None
+    if event.get("TerraformState") in ("Terraformable", "Terraforming"):
+        return TERRAFORMABLE_VALUES.get(planet_class, PLANET_VALUES.get(planet_class, DEFAULT_BODY_VALUE) + 100_000)
+    return PLANET_VALUES.get(planet_class, DEFAULT_BODY_VALUE)
+
+
+def new_record(timestamp: str, system_address: Any, system: str) -> Dict[str, Any]:
+    return {
+        "kind": "system", "t0": timestamp, "t1": timestamp, "address": system_address, "system": system,
+        "bodies": 0, "discovered": 0, "mapped": 0, "value": 0, "notable": [], "species": [], "bio_value": 0,
+    }
+
+
+class ExplorationTracker(JournalTracker):
+    """
+    Reduces the scan firehose to one small record per system visit: bodies scanned, first
+    discoveries, bodies mapped, estimated value, notable worlds and species sampled. Sales
+    add realized-value records.
+
+    Memory stays bounded however long the journal: each event is a couple of dict lookups
+    against the current record, scanned bodies are remembered for the last
+    RECENT_SYSTEMS_KEPT systems only, and records older than RECENT_DAYS_KEPT days are
+    dropped on save. Daily and session summaries aggregate the records they overlap.
+    """
+
+    EVENTS = frozenset({
+        "Scan", "FSSDiscoveryScan", "SAAScanComplete", "ScanOrganic",
+        "SellExplorationData", "MultiSellExplorationData", "SellOrganicData",
+        "FSDJump", "CarrierJump",
+    })
+
+    def __init__(self, path: str = EXPLORATION_FILE):
+        self.path = path
+        data = load_json(path, {})
+        self.last_timestamp: str = data.get("last_timestamp", "")
+        self.records: List[Dict[str, Any]] = data.get("records", [])
+        self.current: Optional[Dict[str, Any]] = data.get("current")
+        # SystemAddress -> {BodyID: [base value, first discovery, already mapped]}
+        self.bodies: "OrderedDict[str, Dict[str, List[Any]]]" = OrderedDict(data.get("bodies", []))
+
+    # --- ingest ---------------------------------------------------------
+
+    def _record_for(self, timestamp: str, system_address: Any, system: str) -> Dict[str, Any]:
+        current = self.current
+        if current is None or current["address"] != system_address:
+            if current is not None:
+                self.records.append(current)
+            current = self.current = new_record(timestamp, system_address, system)
+        current["t1"] = timestamp
+        if system and not current["system"]:
+            current["system"] = system
+        return current
+
+    def _system_bodies(self, system_address: Any) -> Dict[str, List[Any]]:
+        key = str(system_address)
+        bodies = self.bodies.get(key)
+        if bodies is None:
+            bodies = self.bodies[key] = {}
+            if len(self.bodies) > RECENT_SYSTEMS_KEPT:
+                self.bodies.popitem(last=False)
+        else:
+            self.bodies.move_to_end(key)
+        return bodies
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+
+        if event_type in ("FSDJump", "CarrierJump"):
+            if self.current is not None:
+                self.records.append(self.current)
+                self.current = None
+        elif event_type == "Scan":
+            self._scan(timestamp, event)
+        elif event_type == "SAAScanComplete":
+            self._mapped(timestamp, event)
+        elif event_type == "FSSDiscoveryScan":
+            self._record_for(timestamp, event.get("SystemAddress"), event.get("SystemName", ""))
+        elif event_type == "ScanOrganic":
+            if event.get("ScanType") != "Analyse":
+                return  # Log and Sample are the first two of the three samples
+            record = self._record_for(timestamp, event.get("SystemAddress"), "")
+            species = event.get("Species_Localised") or event.get("Species", "Unknown species")
+            genus = (event.get("Genus_Localised") or "").lower()
+            record["species"].append(species)
+            record["bio_value"] += GENUS_VALUES.get(genus, DEFAULT_GENUS_VALUE)
+        else:
+            self._sale(timestamp, event)
+
+    def _scan(self, timestamp: str, event: Dict[str, Any]) -> None:
+        base = scan_value(event)
+        if base is None:
+            return
+        bodies = self._system_bodies(event.get("SystemAddress"))
+        body_id = str(event.get("BodyID"))
+        if body_id in bodies:
+            return  # the same body scanned again (nav beacon, auto scan, detailed scan)
+        first = not event.get("WasDiscovered", True)
+        bodies[body_id] = [base, first, bool(event.get("WasMapped", True))]
+
+        record = self._record_for(timestamp, event.get("SystemAddress"), event.get("StarSystem", ""))
+        record["bodies"] += 1
+        record["value"] += round(base * (FIRST_DISCOVERY_MULTIPLIER if first else 1))
+        if first:
+            record["discovered"] += 1
+            planet_class = event.get("PlanetClass", "")
+            terraformable = event.get("TerraformState") in ("Terraformable", "Terraforming")
+            if (planet_class in NOTABLE_CLASSES or terraformable) and len(record["notable"]) < MAX_NOTABLE_PER_SYSTEM:
+                label = f"terraformable {planet_class.lower()}" if terraformable else planet_class.lower()
+                record["notable"].append(f"{event.get('BodyName', 'an unnamed body')} ({label})")
+
+    def _mapped(self, timestamp: str, event: Dict[str, Any]) -> None:
+        body = self._system_bodies(event.get("SystemAddress")).get(str(event.get("BodyID")))
+        record = self._record_for(timestamp, event.get("SystemAddress"), "")
+        record["mapped"] += 1
+        if body is None:
+            return
+        base, first, was_mapped = body
+        value = base * (FIRST_DISCOVERY_MULTIPLIER if first else 1) * MAPPED_MULTIPLIER
+        if not was_mapped:
+            value *= FIRST_MAPPED_MULTIPLIER
+        if event.get("ProbesUsed", 99) <= event.get("EfficiencyTarget", 0):
+            value *= EFFICIENCY_MULTIPLIER
+        record["value"] += round(value - base * (FIRST_DISCOVERY_MULTIPLIER if first else 1))
+
+    def _sale(self, timestamp: str, event: Dict[str, Any]) -> None:
+        event_type = event.get("event")
+        if event_type == "SellOrganicData":
+            earned = sum(item.get("Value", 0) + item.get("Bonus", 0) for item in event.get("BioData", []))
+            field = "organic"
+        else:
+            earned = event.get("TotalEarnings", event.get("BaseValue", 0) + event.get("Bonus", 0))
+            field = "exploration"
+        self.records.append({"kind": "sale", "t0": timestamp, "t1": timestamp, field: int(earned or 0)})
+
+    # --- persistence ----------------------------------------------------
+
+    def save(self) -> None:
+        if self.last_timestamp:
+            cutoff = (datetime.fromisoformat(self.last_timestamp.replace("Z", "")) - timedelta(days=RECENT_DAYS_KEPT)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.records = [record for record in self.records if record["t1"] >= cutoff]
+        write_json_atomic(self.path, {
+            "last_timestamp": self.last_timestamp,
+            "records": self.records,
+            "current": self.current,
+            "bodies": list(self.bodies.items()),
+        })
+
+    # --- summaries ------------------------------------------------------
+
+    def _records_between(self, start: str, end: str) -> List[Dict[str, Any]]:
+        records = self.records + ([self.current] if self.current is not None else [])
+        return [record for record in records if record["t1"] >= start and record["t0"] <= end]
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        lines = exploration_lines(self._records_between(date[:10], date[:10] + "~"))
+        return {"Exploration": lines} if lines else {}
+
+    def session_summary(self, start: str, end: str) -> Dict[str, List[str]]:
+        lines = exploration_lines(self._records_between(start, end))
+        return {"Exploration": lines} if lines else {}
+
+
+def exploration_lines(records: List[Dict[str, Any]]) -> List[str]:
+    systems = [record for record in records if record["kind"] == "system"]
+    sales = [record for record in records if record["kind"] == "sale"]
+    lines = []
+
+    bodies = sum(record["bodies"] for record in systems)
+    if bodies:
+        discovered = sum(record["discovered"] for record in systems)
+        mapped = sum(record["mapped"] for record in systems)
+        value = sum(record["value"] for record in systems)
+        visited = len({record["address"] for record in systems if record["bodies"]})
+        lines.append(f"Scanned **{bodies} bodies** in **{visited} systems** (**{discovered} first discoveries**, "
+                     f"{mapped} mapped), worth roughly **{value:,} Cr** in cartographic data.")
+        richest = max(systems, key=lambda record: record["value"])
+        if visited > 1 and richest["system"]:
+            lines.append(f"Richest system: **{richest['system']}**, about {richest['value']:,} Cr from {richest['bodies']} bodies.")
+        notable = [body for record in systems for body in record["notable"]]
+        if notable:
+            lines.append(f"First to find: {', '.join(notable[:MAX_NOTABLE_PER_SYSTEM])}" + (f" and {len(notable) - MAX_NOTABLE_PER_SYSTEM} more." if len(notable) > MAX_NOTABLE_PER_SYSTEM else "."))
+
+    species = [name for record in systems for name in record["species"]]
+    if species:
+        bio_value = sum(record["bio_value"] for record in systems)
+        shown = ", ".join(sorted(set(species))[:6])
+        lines.append(f"Sampled **{len(species)} species** ({shown}), roughly **{bio_value:,} Cr** to Vista Genomics.")
+
+    exploration = sum(record.get("exploration", 0) for record in sales)
+    organic = sum(record.get("organic", 0) for record in sales)
+    if exploration or organic:
+        parts = [f"exploration data for **{exploration:,} Cr**" if exploration else "", f"organic data for **{organic:,} Cr**" if organic else ""]
+        lines.append(f"Sold {' and '.join(part for part in parts if part)}.")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show exploration and exobiology facts for a day")
+    parser.add_argument("--day", help="YYYY-MM-DD (default: the most recent day recorded)")
+    args = parser.parse_args()
+
+    tracker = ExplorationTracker()
+    day = args.day or tracker.last_timestamp[:10]
+    lines = tracker.daily_summary(day).get("Exploration", [])
+    print(f"# Exploration {day}")
+    for line in lines or ["Nothing scanned."]:
+        print(f"- {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Exports all-MiniLM-L6-v2 to ONNX for the onnxruntime embedder in embedder.py.
+
+Needs torch and sentence-transformers once, at export time only:
+
+    python export_onnx_embedder.py --quantize
+
+then set "embedder": {"backend": "onnx"} in config.json (and point "onnx_model" at
+model_int8.onnx to use the quantized graph).
+"""
+import argparse
+import logging
+import os
+
+from embedder import ONNX_MODEL_DIR
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+
+def export_model(model_name: str, output_dir: str, opset: int) -> str:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)[0]
+
+    model = SentenceTransformer(model_name, device="cpu")
+    tokenizer = model.tokenizer
+    wrapper = LastHiddenState(model[0].auto_model).eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+
+    dummy = tokenizer(["Docked at Jameson Memorial in Shinrarta Dezhra."], return_tensors="pt")
+    model_path = os.path.join(output_dir, "model.onnx")
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"]),
+            model_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic, "last_hidden_state": dynamic},
+            opset_version=opset,
+        )
+    logging.info(f"✅ Exported {model_name} to {model_path}")
+    return model_path
+
+
+def quantize_model(model_path: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_path = os.path.join(os.path.dirname(model_path), "model_int8.onnx")
+    quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    logging.info(f"✅ Wrote int8 dynamic-quantized model to {quantized_path}")
+    return quantized_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the MiniLM embedder to ONNX")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model name")
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR, help="Where model.onnx and tokenizer.json are written")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset version")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamic-quantized model")
+    args = parser.parse_args()
+
+    model_path = export_model(args.model, args.output_dir, args.opset)
+    if args.quantize:
+        quantize_model(model_path)
+
+
+if __name__ == "__main__":
+    main()
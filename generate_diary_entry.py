@@ -2,23 +2,27 @@ import argparse
 import glob
 import json
 import os
+import sys
 import logging
 from ai_generation import generate_diary, save_diary
+from commanders import DEFAULT_COMMANDER, commander_path
 
 # === PATHS ===
 BASE_DIR = os.path.dirname(__file__)
 COMMANDER_LOGS_FOLDER = os.path.join(BASE_DIR, "rag_data", "commander_logs")
+SESSIONS_FOLDER = os.path.join(COMMANDER_LOGS_FOLDER, "sessions")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-def list_available_log_dates():
-    json_files = sorted(glob.glob(os.path.join(COMMANDER_LOGS_FOLDER, "*.json")))
+def list_available_log_dates(commander: str = DEFAULT_COMMANDER):
+    json_files = sorted(glob.glob(os.path.join(commander_path(COMMANDER_LOGS_FOLDER, commander), "*.json")))
     return [os.path.splitext(os.path.basename(f))[0] for f in json_files]
 
-def load_commander_log(date: str):
-    log_file = os.path.join(COMMANDER_LOGS_FOLDER, f"{date}.json")
+def load_commander_log(key: str, commander: str = DEFAULT_COMMANDER, folder: str = COMMANDER_LOGS_FOLDER):
+    """Loads a daily summary (key = date), or a session summary with folder=SESSIONS_FOLDER (key = session ID)."""
+    log_file = os.path.join(commander_path(folder, commander), f"{key}.json")
     if not os.path.exists(log_file):
-        raise FileNotFoundError(f"No log file for date: {date}")
+        raise FileNotFoundError(f"No log file for: {key}")
 
     with open(log_file, "r", encoding="utf-8") as f:
         data = json.load(f)
@@ -29,16 +33,29 @@ def load_commander_log(date: str):
         return commander, activities
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Generate Commander Toadie Mudguts' Personal Log")
+    parser = argparse.ArgumentParser(description="Generate a commander's Personal Log")
     parser.add_argument("--date", help="Log date (YYYY-MM-DD)")
+    parser.add_argument("--session", help="Session ID (YYYY-MM-DDTHHMMSS) to log a single play session instead of a whole day")
+    parser.add_argument("--commander", default=DEFAULT_COMMANDER, help="Whose log (default: the commander in config.json)")
     args = parser.parse_args()
 
+    if args.session:
+        try:
+            commander, session_activities = load_commander_log(args.session, args.commander, SESSIONS_FOLDER)
+            log_text = generate_diary(commander, args.session, session_activities)
+            print(f"\n📖 {commander}'s Personal Log ({args.session}):\n")
+            print(log_text)
+            save_diary(args.session, log_text, commander)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        sys.exit()
+
     date = args.date
-    available = list_available_log_dates()
+    available = list_available_log_dates(args.commander)
 
     if not available:
         print("❌ No commander logs found.")
-        exit()
+        sys.exit()
 
     if not date:
         print("\n📅 Available Commander Log Dates:")
@@ -53,10 +70,10 @@ if __name__ == "__main__":
             date = available[-1]  # Default to latest
 
     try:
-        commander, session_activities = load_commander_log(date)
+        commander, session_activities = load_commander_log(date, args.commander)
         log_text = generate_diary(commander, date, session_activities)
         print(f"\n📖 {commander}'s Personal Log ({date}):\n")
         print(log_text)
-        save_diary(date, log_text)
+        save_diary(date, log_text, commander)
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -0,0 +1,292 @@
+import os
+import glob
+import json
+import time
+import uuid
+import logging
+import argparse
+import functools
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+TRACE_FILE = os.path.join(BASE_DIR, "traces", "trace.jsonl")
+
+DEFAULT_INSTRUMENTATION_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "trace_file": TRACE_FILE,
+    "max_bytes": 5 * 2**20,
+    "backup_count": 3,
+    "metrics_port": 0,  # >0: long-running processes serve Prometheus text on /metrics
+}
+
+# Upper bounds (seconds) of the span duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.025, 0.1, 0.5, 1.0, 2.5, 10.0, 30.0, 120.0)
+
+_current_span: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar("current_span", default=None)
+
+
+def load_instrumentation_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merges the "instrumentation" block of config.json over DEFAULT_INSTRUMENTATION_SETTINGS."""
+    if config is None:
+        from vector_store import load_config  # vector_store itself is instrumented
+        config = load_config()
+    settings = dict(DEFAULT_INSTRUMENTATION_SETTINGS)
+    settings.update(config.get("instrumentation", {}) or {})
+    if not os.path.isabs(settings["trace_file"]):
+        settings["trace_file"] = os.path.join(BASE_DIR, settings["trace_file"])
+    return settings
+
+
+class Metrics:
+    """In-process span timings and counters, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.span_count: Dict[str, int] = defaultdict(int)
+        self.span_seconds: Dict[str, float] = defaultdict(float)
+        self.span_buckets: Dict[str, List[int]] = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.counters: Dict[str, float] = defaultdict(float)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self.lock:
+            self.span_count[name] += 1
+            self.span_seconds[name] += seconds
+            buckets = self.span_buckets[name]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.counters[name] += value
+
+    def render(self) -> str:
+        lines = [
+            "# HELP captains_log_span_seconds Time spent in instrumented pipeline stages.",
+            "# TYPE captains_log_span_seconds histogram",
+        ]
+        with self.lock:
+            for name in sorted(self.span_count):
+                for bound, hits in zip(DURATION_BUCKETS, self.span_buckets[name]):
+                    lines.append(f'captains_log_span_seconds_bucket{{span="{name}",le="{bound}"}} {hits}')
+                lines.append(f'captains_log_span_seconds_bucket{{span="{name}",le="+Inf"}} {self.span_count[name]}')
+                lines.append(f'captains_log_span_seconds_sum{{span="{name}"}} {self.span_seconds[name]:.6f}')
+                lines.append(f'captains_log_span_seconds_count{{span="{name}"}} {self.span_count[name]}')
+            for name in sorted(self.counters):
+                metric = "captains_log_" + name.replace(".", "_") + "_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {self.counters[name]:g}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+_settings: Optional[Dict[str, Any]] = None
+_trace_logger = logging.getLogger("captains_log.trace")
+_trace_logger.propagate = False
+
+
+def _configure() -> Dict[str, Any]:
+    """Reads settings and attaches the rotating trace file on first use."""
+    global _settings
+    if _settings is None:
+        _settings = load_instrumentation_settings()
+        if _settings["enabled"]:
+            os.makedirs(os.path.dirname(_settings["trace_file"]), exist_ok=True)
+            handler = RotatingFileHandler(_settings["trace_file"], maxBytes=_settings["max_bytes"],
+                                          backupCount=_settings["backup_count"], encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _trace_logger.addHandler(handler)
+            _trace_logger.setLevel(logging.INFO)
+    return _settings
+
+
+@contextmanager
+def trace_forwarding() -> Iterator[Optional[Any]]:
+    """
+    For process pools. Yields a queue to hand to each worker's forward_traces_to() (as the
+    pool initializer). Spans the workers send through it are written by this process alone,
+    so only one process ever appends to or rotates the trace file. Yields None when
+    tracing is off.
+
+        with trace_forwarding() as queue:
+            with ProcessPoolExecutor(initializer=forward_traces_to, initargs=(queue,)) as pool:
+                ...
+    """
+    if not _configure()["enabled"]:
+        yield None
+        return
+    import multiprocessing
+    queue = multiprocessing.Queue()
+    listener = QueueListener(queue, *_trace_logger.handlers)
+    listener.start()
+    try:
+        yield queue
+    finally:
+        listener.stop()
+        queue.close()
+
+
+def forward_traces_to(queue: Optional[Any]) -> None:
+    """Pool initializer: sends this worker's spans to the parent instead of opening the trace file."""
+    global _settings
+    _settings = load_instrumentation_settings()
+    for handler in list(_trace_logger.handlers):  # inherited from the parent on fork
+        _trace_logger.removeHandler(handler)
+    if queue is None:
+        _settings["enabled"] = False
+        return
+    _trace_logger.addHandler(QueueHandler(queue))
+    _trace_logger.setLevel(logging.INFO)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times a block and writes one JSON line to the trace file when it ends.
+
+    Yields the record's attribute dict, so the block can add what it learns along the way
+    (token counts, cache hits, result sizes). Nested spans share the outer span's trace ID.
+
+        with span("retrieve_knowledge", activities=len(activities)) as s:
+            ...
+            s["cache_hits"] = hits
+    """
+    settings = _configure()
+    parent = _current_span.get()
+    trace_id = parent[0] if parent else uuid.uuid4().hex[:16]
+    span_id = uuid.uuid4().hex[:8]
+    token = _current_span.set((trace_id, span_id))
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _current_span.reset(token)
+        metrics.observe(name, seconds)
+        if settings["enabled"]:
+            record = {
+                "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "trace": trace_id,
+                "span": span_id,
+                "parent": parent[1] if parent else None,
+                "name": name,
+                "ms": round(seconds * 1000, 3),
+                **attributes,
+            }
+            if error:
+                record["error"] = error
+            _trace_logger.info(json.dumps(record, default=str))
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator form of span(); the span is named after the function unless a name is given."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1) -> None:
+    """Adds to a named counter, e.g. count("llm.completion_tokens", 512)."""
+    metrics.count(name, value)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serves metrics.render() on http://host:port/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"📈 Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def serve_metrics_if_configured():
+    """For long-running processes: starts the /metrics endpoint if config.json sets a metrics_port."""
+    port = _configure()["metrics_port"]
+    return start_metrics_server(port) if port else None
+
+
+def read_trace(path: str = TRACE_FILE) -> List[Dict[str, Any]]:
+    """Span records from the trace file and its rotated backups, oldest first."""
+    backups = [p for p in glob.glob(path + ".*") if p.rsplit(".", 1)[-1].isdigit()]
+    paths = sorted(backups, key=lambda p: -int(p.rsplit(".", 1)[-1])) + ([path] if os.path.exists(path) else [])
+    records = []
+    for candidate in paths:
+        with open(candidate, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def summarize_trace(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-span call count, total and p50/p95 milliseconds, slowest total first."""
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for record in records:
+        durations[record["name"]].append(record["ms"])
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            "span": name,
+            "calls": len(values),
+            "total_ms": round(sum(values), 1),
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(int(len(values) * 0.95), len(values) - 1)],
+        })
+    return sorted(rows, key=lambda row: -row["total_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the pipeline trace file")
+    parser.add_argument("--trace", default=None, help="Trace file (default: from config.json)")
+    parser.add_argument("--last", type=int, default=0, help="Only the most recent N top-level traces")
+    args = parser.parse_args()
+
+    records = read_trace(args.trace or load_instrumentation_settings()["trace_file"])
+    if args.last:
+        recent = list(dict.fromkeys(record["trace"] for record in reversed(records)))[:args.last]
+        records = [record for record in records if record["trace"] in set(recent)]
+    if not records:
+        print("❌ No spans recorded yet.")
+        return
+    print(f"{'span':<28}{'calls':>8}{'total ms':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in summarize_trace(records):
+        print(f"{row['span']:<28}{row['calls']:>8}{row['total_ms']:>12,.1f}{row['p50_ms']:>10,.1f}{row['p95_ms']:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main()
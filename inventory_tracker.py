@@ -0,0 +1,245 @@
+import os
+import json
+import bisect
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from journal_trackers import STATE_DIR, JournalTracker, load_json, write_json_atomic
+
+INVENTORY_DIR = os.path.join(STATE_DIR, "inventory")
+SNAPSHOT_INTERVAL = 500  # delta records between full snapshots
+
+MATERIAL_STORES = ("Raw", "Manufactured", "Encoded")
+LOCKER_CATEGORIES = ("Items", "Components", "Consumables", "Data")
+
+Holdings = Dict[str, Dict[str, int]]
+Delta = Tuple[str, str, int]  # (store, name, change)
+
+
+def normalize_name(name: str) -> str:
+    """'$painite_name;' and 'Painite' both become 'painite'."""
+    name = (name or "").strip().lower()
+    if name.startswith("$") and name.endswith("_name;"):
+        name = name[1:-len("_name;")]
+    return name
+
+
+def apply_deltas(state: Holdings, deltas: Iterable[Delta]) -> None:
+    for store, name, change in deltas:
+        items = state.setdefault(store, {})
+        count = items.get(name, 0) + change
+        if count > 0:
+            items[name] = count
+        else:
+            items.pop(name, None)
+
+
+class InventoryTracker(JournalTracker):
+    """
+    Materials, cargo, ship locker and backpack holdings, maintained from journal events.
+
+    Every change is appended to deltas.jsonl as (store, name, change) triples; whole-store
+    snapshot events (Materials, Cargo, ShipLocker, Backpack) are reduced to the difference
+    from the tracked state. A full snapshot is written every SNAPSHOT_INTERVAL delta
+    records, so holdings at any timestamp are the nearest earlier snapshot plus the deltas
+    after it.
+    """
+
+    EVENTS = frozenset({
+        "Materials", "MaterialCollected", "MaterialDiscarded", "MaterialTrade", "EngineerCraft", "Synthesis",
+        "Cargo", "CollectCargo", "EjectCargo", "MarketBuy", "MarketSell", "MiningRefined",
+        "ShipLocker", "Backpack", "BackpackChange",
+    })
+
+    def __init__(self, state_dir: str = INVENTORY_DIR):
+        self.state_dir = state_dir
+        self.deltas_path = os.path.join(state_dir, "deltas.jsonl")
+        self.index_path = os.path.join(state_dir, "snapshot_index.json")
+        # [[timestamp, snapshot file, byte offset into deltas.jsonl], ...] in time order
+        self.snapshot_index: List[List[Any]] = load_json(self.index_path, [])
+        self.state: Holdings = {}
+        self.last_timestamp = ""
+        self.records_since_snapshot = 0
+        self.daily_net: Dict[str, Dict[Tuple[str, str], int]] = defaultdict(lambda: defaultdict(int))
+        self._deltas_file = None
+
+        os.makedirs(state_dir, exist_ok=True)
+        self.delta_offset = os.path.getsize(self.deltas_path) if os.path.exists(self.deltas_path) else 0
+        self.state, self.last_timestamp, self.records_since_snapshot = self._replay(None)
+
+    # --- reconstruction -------------------------------------------------
+
+    def _replay(self, until: Optional[str]) -> Tuple[Holdings, str, int]:
+        """Latest snapshot at or before `until` (None = newest) plus the deltas recorded after it."""
+        state: Holdings = {}
+        timestamp = ""
+        offset = 0
+        position = len(self.snapshot_index)
+        if until is not None:
+            position = bisect.bisect_right([entry[0] for entry in self.snapshot_index], until)
+        if position:
+            timestamp, snapshot_file, offset = self.snapshot_index[position - 1]
+            state = load_json(os.path.join(self.state_dir, snapshot_file), {})
+
+        replayed = 0
+        if os.path.exists(self.deltas_path):
+            with open(self.deltas_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    record = json.loads(line)
+                    if until is not None and record["t"] > until:
+                        break
+                    apply_deltas(state, record["d"])
+                    timestamp = record["t"]
+                    replayed += 1
+        return state, timestamp, replayed
+
+    def holdings_at(self, timestamp: Optional[str] = None) -> Holdings:
+        """
+        Reconstructs holdings as of an ISO timestamp (e.g. "2024-12-08T20:00:00Z").
+
+        Args:
+            timestamp (str, optional): Point in time; the latest state when omitted.
+        """
+        self._flush()
+        return self._replay(timestamp)[0]
+
+    # --- ingest ---------------------------------------------------------
+
+    def _diff_store(self, store: str, entries: Iterable[Dict[str, Any]], count_key: str = "Count") -> List[Delta]:
+        wanted: Dict[str, int] = defaultdict(int)
+        for entry in entries:
+            wanted[normalize_name(entry.get("Name", ""))] += int(entry.get(count_key, 0))
+        current = self.state.get(store, {})
+        deltas = [(store, name, count - current.get(name, 0)) for name, count in wanted.items() if count != current.get(name, 0)]
+        deltas.extend((store, name, -count) for name, count in current.items() if name not in wanted)
+        return deltas
+
+    def _material_store(self, name: str) -> str:
+        for store in MATERIAL_STORES:
+            if name in self.state.get(store, {}):
+                return store
+        return "Raw"
+
+    def event_deltas(self, event: Dict[str, Any]) -> List[Delta]:
+        event_type = event.get("event")
+
+        if event_type == "Materials":
+            deltas: List[Delta] = []
+            for store in MATERIAL_STORES:
+                deltas.extend(self._diff_store(store, event.get(store, [])))
+            return deltas
+        if event_type in ("MaterialCollected", "MaterialDiscarded"):
+            sign = 1 if event_type == "MaterialCollected" else -1
+            return [(event.get("Category", "Raw"), normalize_name(event.get("Name", "")), sign * int(event.get("Count", 1)))]
+        if event_type == "MaterialTrade":
+            paid, received = event.get("Paid", {}), event.get("Received", {})
+            return [
+                (paid.get("Category", "Raw"), normalize_name(paid.get("Material", "")), -int(paid.get("Quantity", 0))),
+                (received.get("Category", "Raw"), normalize_name(received.get("Material", "")), int(received.get("Quantity", 0))),
+            ]
+        if event_type in ("EngineerCraft", "Synthesis"):
+            deltas = []
+            for ingredient in event.get("Ingredients", []):
+                name = normalize_name(ingredient.get("Name", ""))
+                deltas.append((self._material_store(name), name, -int(ingredient.get("Count", 1))))
+            return deltas
+
+        if event_type == "Cargo":
+            if event.get("Vessel", "Ship") != "Ship" or "Inventory" not in event:
+                return []  # without Inventory the contents are only in Cargo.json
+            return self._diff_store("Cargo", event["Inventory"])
+        if event_type in ("CollectCargo", "MiningRefined"):
+            return [("Cargo", normalize_name(event.get("Type", "")), 1)]
+        if event_type in ("EjectCargo", "MarketSell"):
+            return [("Cargo", normalize_name(event.get("Type", "")), -int(event.get("Count", 1)))]
+        if event_type == "MarketBuy":
+            return [("Cargo", normalize_name(event.get("Type", "")), int(event.get("Count", 1)))]
+
+        if event_type in ("ShipLocker", "Backpack"):
+            if not any(category in event for category in LOCKER_CATEGORIES):
+                return []
+            entries = [entry for category in LOCKER_CATEGORIES for entry in event.get(category, [])]
+            return self._diff_store(event_type, entries)
+        if event_type == "BackpackChange":
+            deltas = [("Backpack", normalize_name(e.get("Name", "")), int(e.get("Count", 1))) for e in event.get("Added", [])]
+            deltas.extend(("Backpack", normalize_name(e.get("Name", "")), -int(e.get("Count", 1))) for e in event.get("Removed", []))
+            return deltas
+        return []
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if timestamp < self.last_timestamp:
+            return  # already applied in an earlier run
+        deltas = [delta for delta in self.event_deltas(event) if delta[1] and delta[2]]
+        if not deltas:
+            return
+
+        apply_deltas(self.state, deltas)
+        self._append({"t": timestamp, "d": deltas})
+        self.last_timestamp = timestamp
+        day = self.daily_net[timestamp[:10]]
+        for store, name, change in deltas:
+            day[(store, name)] += change
+
+        self.records_since_snapshot += 1
+        if self.records_since_snapshot >= SNAPSHOT_INTERVAL:
+            self._write_snapshot()
+
+    # --- persistence ----------------------------------------------------
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._deltas_file is None:
+            self._deltas_file = open(self.deltas_path, "ab")
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        self._deltas_file.write(line)
+        self.delta_offset += len(line)
+
+    def _flush(self) -> None:
+        if self._deltas_file is not None:
+            self._deltas_file.flush()
+
+    def _write_snapshot(self) -> None:
+        self._flush()
+        snapshot_file = f"snapshot_{len(self.snapshot_index):06d}.json"
+        write_json_atomic(os.path.join(self.state_dir, snapshot_file), self.state)
+        self.snapshot_index.append([self.last_timestamp, snapshot_file, self.delta_offset])
+        write_json_atomic(self.index_path, self.snapshot_index)
+        self.records_since_snapshot = 0
+
+    def save(self) -> None:
+        self._flush()
+        if self._deltas_file is not None:
+            self._deltas_file.close()
+            self._deltas_file = None
+
+    # --- summaries ------------------------------------------------------
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        changes = [(store, name, change) for (store, name), change in self.daily_net.get(date, {}).items() if change]
+        if not changes:
+            return {}
+        changes.sort(key=lambda delta: -abs(delta[2]))
+        parts = [f"**{change:+,} {name}** ({store})" for store, name, change in changes[:6]]
+        more = f" and {len(changes) - 6} more" if len(changes) > 6 else ""
+        return {"Inventory": [f"Net inventory change: {', '.join(parts)}{more}."]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show tracked inventory holdings")
+    parser.add_argument("--at", help="ISO timestamp, e.g. 2024-12-08T20:00:00Z (default: latest)")
+    parser.add_argument("--store", help="Only show one store (Raw, Manufactured, Encoded, Cargo, ShipLocker, Backpack)")
+    args = parser.parse_args()
+
+    holdings = InventoryTracker().holdings_at(args.at)
+    for store, items in sorted(holdings.items()):
+        if args.store and store != args.store or not items:
+            continue
+        print(f"\n## {store}")
+        for name, count in sorted(items.items()):
+            print(f"- {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from journal_trackers import STATE_DIR, load_json, write_json_atomic
+
+DEDUP_STATE_FILE = os.path.join(STATE_DIR, "dedup.json")
+MAX_FINGERPRINTS_PER_DAY = 50_000
+DAYS_KEPT = 2  # today and yesterday, so a part that straddles midnight is still caught
+
+# Fields that, together with timestamp and event, tell two different events apart.
+KEY_FIELDS = (
+    "MissionID", "MarketID", "SystemAddress", "BodyID", "StarSystem", "StationName", "Body",
+    "Type", "Name", "Count", "Reward", "TotalReward", "TotalSale", "Cost", "ShipID", "Slot", "Item",
+)
+
+# State dumps the game re-emits on every load or journal part. A repeat whose content has not
+# changed since the last one of the same type that day adds no summary lines, but trackers still
+# see it; only the listed fields count as content (everything but the timestamp when the list is empty).
+SNAPSHOT_FIELDS: Dict[str, tuple] = {
+    "Location": ("StarSystem", "Body", "Docked", "StationName"),
+    "Materials": ("Raw", "Manufactured", "Encoded"),
+    "Cargo": ("Vessel", "Inventory"),
+    "ShipLocker": ("Items", "Components", "Consumables", "Data"),
+    "Backpack": ("Items", "Components", "Consumables", "Data"),
+    "Loadout": ("ShipID", "Ship", "ShipName", "Modules"),
+    "Missions": ("Active", "Failed", "Complete"),
+    "Rank": (),
+    "Progress": (),
+    "Reputation": (),
+    "EngineerProgress": (),
+    "Statistics": (),
+}
+
+
+def digest(value: Any) -> str:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def event_fingerprint(event: Dict[str, Any]) -> str:
+    """Identity of one journal line: timestamp + event + key fields. Identical in every replay of it."""
+    return digest([event.get("timestamp"), event.get("event")] + [event.get(field) for field in KEY_FIELDS if field in event])
+
+
+def snapshot_fingerprint(event: Dict[str, Any]) -> str:
+    """Content of a state snapshot, ignoring when it was written."""
+    fields = SNAPSHOT_FIELDS[event["event"]]
+    if fields:
+        return digest([event.get(field) for field in fields])
+    return digest({key: value for key, value in event.items() if key != "timestamp"})
+
+
+class JournalDeduplicator:
+    """
+    Drops exact replays (the same line read twice from overlapping journal parts) before
+    events reach trackers and summaries, and flags re-emitted state snapshots whose content
+    has not changed. Those still go to trackers, which reconcile against them (e.g. materials
+    spent by events no tracker follows), but add nothing to the summaries.
+
+    Fingerprints are kept per day in insertion order and capped at MAX_FINGERPRINTS_PER_DAY,
+    and only the last DAYS_KEPT days are remembered, so memory and the state file stay
+    bounded no matter how much history is ingested.
+    """
+
+    def __init__(self, state_file: Optional[str] = DEDUP_STATE_FILE, max_per_day: int = MAX_FINGERPRINTS_PER_DAY):
+        self.state_file = state_file
+        self.max_per_day = max_per_day
+        data = load_json(state_file, {}) if state_file else {}
+        self.seen: Dict[str, "OrderedDict[str, None]"] = {
+            day: OrderedDict.fromkeys(fingerprints) for day, fingerprints in data.get("seen", {}).items()
+        }
+        self.snapshots: Dict[str, Dict[str, str]] = data.get("snapshots", {})
+        self.dropped = 0
+        self.unchanged = 0
+
+    def is_duplicate(self, event: Dict[str, Any]) -> bool:
+        """True if the event is a replay and should be skipped. Call once per event, in file order."""
+        day = event.get("timestamp", "")[:10]
+        seen = self.seen.get(day)
+        if seen is None:
+            seen = self.seen[day] = OrderedDict()
+            self.snapshots.setdefault(day, {})
+            for old_day in sorted(self.seen)[:-DAYS_KEPT]:
+                del self.seen[old_day]
+                self.snapshots.pop(old_day, None)
+
+        fingerprint = event_fingerprint(event)
+        if fingerprint in seen:
+            self.dropped += 1
+            return True
+        seen[fingerprint] = None
+        if len(seen) > self.max_per_day:
+            seen.popitem(last=False)
+        return False
+
+    def is_unchanged_snapshot(self, event: Dict[str, Any]) -> bool:
+        """True for a state snapshot identical to the day's previous one of its type. Call after is_duplicate()."""
+        event_type = event.get("event")
+        if event_type not in SNAPSHOT_FIELDS:
+            return False
+        content = snapshot_fingerprint(event)
+        day_snapshots = self.snapshots.setdefault(event.get("timestamp", "")[:10], {})
+        if day_snapshots.get(event_type) == content:
+            self.unchanged += 1
+            return True
+        day_snapshots[event_type] = content
+        return False
+
+    def save(self) -> None:
+        if not self.state_file:
+            return
+        write_json_atomic(self.state_file, {
+            "seen": {day: list(fingerprints) for day, fingerprints in self.seen.items()},
+            "snapshots": self.snapshots,
+        })
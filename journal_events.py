@@ -0,0 +1,42 @@
+from typing import Any, Dict, Optional, Tuple
+
+# Event types that produce a summary line; everything else is left to the trackers.
+DESCRIBED_EVENTS = frozenset({
+    "FSDJump", "Docked", "Undocked", "Location", "Bounty",
+    "Materials",
+})
+
+
+def describe_event(event_data: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Renders a meaningful journal event as a (category, summary line) pair, or None."""
+    event_type = event_data.get("event", "Unknown Event")
+
+    if event_type == "FSDJump":
+        system = event_data.get("StarSystem", "Unknown System")
+        return "Travel", f"Jumped to **{system}**."
+
+    elif event_type == "Docked":
+        station = event_data.get("StationName", "Unknown Station")
+        system = event_data.get("StarSystem", "Unknown System")
+        return "Docking", f"Docked at **{station}** in **{system}**."
+
+    elif event_type == "Undocked":
+        station = event_data.get("StationName", "Unknown Station")
+        return "Docking", f"Undocked from **{station}**."
+
+    elif event_type == "Location":
+        system = event_data.get("StarSystem", "Unknown System")
+        body = event_data.get("Body", "Deep Space")
+        return "Location", f"Current location: **{system}**, **{body}**."
+
+    elif event_type == "Bounty":
+        reward = event_data.get("Reward", 0)
+        return "Combat", f"Claimed a bounty of **{reward:,} Cr**."
+
+    elif event_type == "Materials":
+        raw_mats = len(event_data.get("Raw", []))
+        encoded_mats = len(event_data.get("Encoded", []))
+        manu_mats = len(event_data.get("Manufactured", []))
+        return "Materials", f"Gathered materials: **{raw_mats} Raw**, **{encoded_mats} Encoded**, **{manu_mats} Manufactured**."
+
+    return None
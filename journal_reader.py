@@ -0,0 +1,132 @@
+import os
+import json
+import mmap
+import logging
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+# Newline offsets are found with one vectorised compare per block of this many bytes.
+SCAN_BLOCK_BYTES = 16 * 2**20
+# Elite writes `{ "timestamp":"...", "event":"Name", ...`; both keys sit inside this prefix.
+HEADER_WINDOW = 128
+
+EVENT_KEY = b'"event":'
+TIMESTAMP_KEY = b'"timestamp":'
+
+
+def load_json_parser(preferred: str = "auto") -> Tuple[str, Callable[[bytes], Any]]:
+    """
+    Picks the fastest available JSON parser that accepts bytes: orjson, then pysimdjson,
+    then the standard library.
+
+    Args:
+        preferred (str): "auto", or force one of "orjson", "simdjson", "json".
+    """
+    if preferred in ("auto", "orjson"):
+        try:
+            import orjson
+            return "orjson", orjson.loads
+        except ImportError:
+            if preferred == "orjson":
+                raise
+    if preferred in ("auto", "simdjson"):
+        try:
+            import simdjson
+            parser = simdjson.Parser()
+            return "simdjson", lambda data: parser.parse(data, recursive=True)
+        except ImportError:
+            if preferred == "simdjson":
+                raise
+    return "json", lambda data: json.loads(data.decode("utf-8"))
+
+
+PARSER_NAME, parse_json = load_json_parser()
+
+
+def line_offsets(buffer) -> np.ndarray:
+    """Offsets of every b"\\n" in the buffer, found a block at a time so scratch memory stays small."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    blocks = [
+        np.flatnonzero(data[start:start + SCAN_BLOCK_BYTES] == 10) + start
+        for start in range(0, len(data), SCAN_BLOCK_BYTES)
+    ]
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int64)
+
+
+def header_field(buffer, key: bytes, start: int, end: int) -> Optional[bytes]:
+    """The string value of key within the first HEADER_WINDOW bytes of a line, without parsing it."""
+    position = buffer.find(key, start, min(start + HEADER_WINDOW, end))
+    if position < 0:
+        return None
+    position = buffer.find(b'"', position + len(key), end)  # Elite writes no space here; other tools may
+    if position < 0:
+        return None
+    close = buffer.find(b'"', position + 1, end)
+    return buffer[position + 1:close] if close >= 0 else None
+
+
+def read_events(path: str, wanted: Optional[frozenset] = None,
+                parser: Callable[[bytes], Any] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the events of one journal file in order.
+
+    The file is memory-mapped and split on newline offsets found in bulk. Each line's event
+    name is read straight from its first bytes; events outside `wanted` are never decoded
+    and come back as a light {"timestamp", "event"} dict, which is all the session clock
+    needs. Everything else is parsed from bytes with the fastest available parser.
+
+    Args:
+        path (str): Journal file.
+        wanted (frozenset, optional): Event names to parse in full; None parses every line.
+        parser (callable, optional): Overrides the module's JSON parser (for benchmarks).
+    """
+    parser = parser or parse_json
+    wanted_bytes = None if wanted is None else frozenset(name.encode("utf-8") for name in wanted)
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            start = 0
+            ends = line_offsets(buffer).tolist()
+            if not ends or ends[-1] != len(buffer) - 1:
+                ends.append(len(buffer))  # last line without a trailing newline
+            for end in ends:
+                line_start, start = start, end + 1
+                if end - line_start < 2:
+                    continue
+
+                if wanted_bytes is not None:
+                    name = header_field(buffer, EVENT_KEY, line_start, end)
+                    if name is not None and name not in wanted_bytes:
+                        timestamp = header_field(buffer, TIMESTAMP_KEY, line_start, end)
+                        if timestamp is not None:
+                            yield {"timestamp": timestamp.decode("ascii", "replace"), "event": name.decode("utf-8", "replace")}
+                            continue
+
+                try:
+                    event = parser(buffer[line_start:end])
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    yield event
+
+
+def main():
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="Count the events in journal files with the bulk reader")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    logging.info(f"🔎 JSON parser: {PARSER_NAME}")
+    counts = Counter(event.get("event") for path in args.paths for event in read_events(path))
+    for name, n in counts.most_common():
+        print(f"{n:>9}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+STATE_DIR = os.path.join(BASE_DIR, "ingest_state")
+
+
+def load_json(path: str, default: Any) -> Any:
+    """Reads a JSON state file, returning default if it is missing or unreadable."""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Could not read {path}, starting from scratch: {e}")
+        return default
+
+
+def write_json_atomic(path: str, data: Any, indent: Any = None) -> None:
+    """Writes JSON via a temp file + rename so a crash never leaves a half-written state file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+class JournalTracker:
+    """
+    Incremental consumer of journal events, fed by build_commander_summaries.extract_events.
+
+    Subclasses list the event types they need in EVENTS, update compact in-memory state in
+    handle_event, and persist it in save() so the next run continues where this one stopped.
+    """
+
+    EVENTS: frozenset = frozenset()
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        """Extra summary lines for a day, keyed by category. Empty by default."""
+        return {}
+
+    def session_summary(self, start: str, end: str) -> Dict[str, List[str]]:
+        """Extra summary lines for the session between two timestamps, keyed by category. Empty by default."""
+        return {}
+
+    def save(self) -> None:
+        pass
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import count
+
+# Companion files the game rewrites in the journal folder while it runs
+LIVE_FILES = ("Status.json", "NavRoute.json", "Market.json", "Cargo.json")
+POLL_INTERVAL = 0.05  # seconds between stat() sweeps; four stats per sweep is noise for the CPU
+DEBOUNCE_SECONDS = 0.01  # a changed file must keep the same mtime/size this long before it is read
+
+# Status.json Flags bits worth surfacing
+STATUS_FLAGS = {
+    0: "docked", 1: "landed", 4: "supercruise", 6: "hardpoints deployed", 11: "scooping fuel",
+    16: "low fuel", 17: "overheating", 19: "in danger", 20: "being interdicted", 23: "in SRV",
+}
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+
+
+def journal_directory(config: Optional[Dict[str, Any]] = None) -> str:
+    """The journal folder from config.json, falling back to the game's default location."""
+    if config is None:
+        from vector_store import load_config
+        config = load_config()
+    return os.path.expandvars(config.get("log_directory") or os.path.join(
+        "%USERPROFILE%", "Saved Games", "Frontier Developments", "Elite Dangerous"))
+
+
+class LiveState:
+    """
+    Latest parsed content of each companion file, shared between threads.
+
+    Readers get copies via get() or snapshot(); version increases on every real change so
+    a consumer can block in wait_for_change() instead of polling.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._changed = threading.Condition()
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.version = 0
+
+    def update(self, name: str, data: Dict[str, Any]) -> bool:
+        """Stores a file's new content; returns False (and does nothing) if it is unchanged."""
+        with self._changed:
+            if self._files.get(name) == data:
+                return False
+            self._files[name] = data
+            self.version += 1
+            self._changed.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(name, data)
+            except Exception as e:
+                logging.warning(f"⚠️ Live state listener failed on {name}: {e}")
+        return True
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._changed:
+            data = self._files.get(name)
+            return json.loads(json.dumps(data)) if data is not None else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._changed:
+            return json.loads(json.dumps({"version": self.version, **self._files}))
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """Blocks until version moves past the given one (or timeout); returns the current version."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    def subscribe(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Calls listener(file name, data) from the watcher thread after every change."""
+        with self._changed:
+            self._listeners.append(listener)
+
+
+class LiveStateWatcher(threading.Thread):
+    """
+    Polls the companion files' mtime and size and re-reads only the ones that changed.
+
+    A change is read once the file has held the same signature for DEBOUNCE_SECONDS, which
+    skips the half-written states the game leaves mid-rewrite; a read that still fails to
+    parse is retried on the next sweep. Idle cost is a handful of stat() calls per sweep
+    and the thread sleeps on an Event, so stop() returns immediately.
+    """
+
+    def __init__(self, journal_dir: str, state: Optional[LiveState] = None,
+                 files: Tuple[str, ...] = LIVE_FILES, interval: float = POLL_INTERVAL):
+        super().__init__(name="live-state-watcher", daemon=True)
+        self.journal_dir = journal_dir
+        self.state = state if state is not None else LiveState()
+        self.files = files
+        self.interval = interval
+        self._seen: Dict[str, Signature] = {}
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Signature]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self, name: str, path: str) -> bool:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            data = json.loads(raw.decode("utf-8")) if raw.strip() else None
+        except (OSError, ValueError):
+            return False
+        if isinstance(data, dict):
+            if self.state.update(name, data):
+                count("live_state.updates")
+        return True
+
+    def poll_once(self) -> int:
+        """One sweep over the files; returns how many were re-read."""
+        changed = []
+        for name in self.files:
+            path = os.path.join(self.journal_dir, name)
+            signature = self._signature(path)
+            if signature is not None and signature != self._seen.get(name):
+                changed.append((name, path, signature))
+        if not changed:
+            return 0
+
+        time.sleep(DEBOUNCE_SECONDS)
+        read = 0
+        for name, path, signature in changed:
+            if self._signature(path) != signature:
+                continue  # still being written; the next sweep picks it up
+            if self._read(name, path):
+                self._seen[name] = signature
+                read += 1
+        return read
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logging.warning(f"⚠️ Live state poll failed: {e}")
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+# One live state per process, filled by the watcher thread
+live_state = LiveState()
+_watcher: Optional[LiveStateWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def start_live_state(journal_dir: Optional[str] = None) -> LiveStateWatcher:
+    """Starts the shared watcher (once per process) and returns it; read live_state for the data."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = LiveStateWatcher(journal_dir or journal_directory(), live_state)
+            _watcher.poll_once()  # so the state is filled before the caller looks at it
+            _watcher.start()
+            logging.info(f"👀 Watching {', '.join(LIVE_FILES)} in {_watcher.journal_dir}")
+        return _watcher
+
+
+def status_lines(snapshot: Dict[str, Any]) -> List[str]:
+    """A few plain-language facts from a LiveState snapshot, for the `captains_log live` display."""
+    lines = []
+    status = snapshot.get("Status.json") or {}
+    flags = status.get("Flags", 0)
+    active = [label for bit, label in STATUS_FLAGS.items() if flags & (1 << bit)]
+    if active:
+        lines.append(f"Ship status: {', '.join(active)}.")
+    fuel = status.get("Fuel") or {}
+    if "FuelMain" in fuel:
+        lines.append(f"Fuel: {fuel['FuelMain']:.1f} t in the main tank.")
+    destination = status.get("Destination") or {}
+    if destination.get("Name"):
+        lines.append(f"Heading for {destination.get('Name_Localised') or destination['Name']}.")
+    route = (snapshot.get("NavRoute.json") or {}).get("Route") or []
+    if len(route) > 1:
+        lines.append(f"Plotted route: {len(route) - 1} jumps to {route[-1].get('StarSystem', 'somewhere')}.")
+    market = snapshot.get("Market.json") or {}
+    if market.get("StationName"):
+        lines.append(f"Market open: {market['StationName']} ({len(market.get('Items', []))} commodities).")
+    cargo = snapshot.get("Cargo.json") or {}
+    if cargo.get("Count"):
+        lines.append(f"Hold: {cargo['Count']} t of cargo.")
+    return lines
+
+
+def main():
+    from instrumentation import serve_metrics_if_configured
+
+    parser = argparse.ArgumentParser(description="Watch the game's Status/NavRoute/Market/Cargo files and print live state")
+    parser.add_argument("--journal-dir", help="Journal folder (default: log_directory from config.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    serve_metrics_if_configured()
+    live_state.subscribe(lambda name, data: logging.info(f"🔄 {name} changed"))
+    start_live_state(args.journal_dir)
+    seen = 0
+    try:
+        while True:
+            version = live_state.wait_for_change(seen, timeout=1.0)
+            if version > seen:
+                seen = version
+                for line in status_lines(live_state.snapshot()):
+                    print(f"- {line}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Optional
+
+from instrumentation import count, span
+from vector_store import load_config
+
+
+def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 1200, temperature: float = 0.7, top_p: float = 0.9,
+                    timeout: int = 180, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Sends a chat request to the LM Studio server from config.json and returns the reply text.
+    Raises on HTTP errors or malformed responses; callers decide how to degrade.
+    """
+    import requests  # ~0.1 s to import; only paid when a diary is actually generated
+
+    if config is None:
+        config = load_config()
+    with span("llm.chat_completion", model=config.get("model_name", ""), max_tokens=max_tokens) as s:
+        response = requests.post(
+            config.get("lm_studio_api", ""),
+            json={
+                "model": config.get("model_name", ""),
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "top_p": top_p,
+            },
+            timeout=timeout
+        )
+        s["status"] = response.status_code
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get("usage") or {}
+        for key in ("prompt_tokens", "completion_tokens"):
+            if key in usage:
+                s[key] = usage[key]
+                count(f"llm.{key}", usage[key])
+        return data["choices"][0]["message"]["content"]
@@ -0,0 +1,242 @@
+import os
+import json
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from journal_trackers import STATE_DIR, JournalTracker, load_json, write_json_atomic
+from ship_catalog import Catalog
+
+LOADOUT_DIR = os.path.join(STATE_DIR, "loadout")
+DEFAULT_SHIP = "Krait Mk II 'Rust Lancer'"
+
+# Slots and items that are paint, decals and other cosmetics rather than outfitting
+COSMETIC_SLOTS = frozenset({"ShipCockpit", "CargoHatch", "PlanetaryApproachSuite", "VesselVoice", "PaintJob", "Decal1", "Decal2", "Decal3",
+                            "ShipName0", "ShipName1", "ShipID0", "ShipID1", "Bobble01", "WeaponColour", "EngineColour", "ShipKitSpoiler",
+                            "ShipKitWings", "ShipKitTail", "ShipKitBumper", "StringLights"})
+
+
+def is_outfitting(slot: str) -> bool:
+    return bool(slot) and slot not in COSMETIC_SLOTS and not slot.startswith(("Decal", "Bobble", "ShipKit", "ShipName", "ShipID"))
+
+
+def empty_item(item: Optional[str]) -> bool:
+    return not item or item.lower() == "null"
+
+
+class LoadoutTracker(JournalTracker):
+    """
+    The commander's ships, the active one and each ship's fitted modules, kept current from
+    outfitting and shipyard events. Names come from the compiled ship catalog, so each event
+    costs a few dict lookups. Every change is appended to history.jsonl with the ship active
+    at that moment, which is what ship_description() reads for past dates.
+    """
+
+    EVENTS = frozenset({
+        "LoadGame", "Loadout", "ModuleBuy", "ModuleSell", "ModuleStore", "ModuleRetrieve", "ModuleSwap",
+        "ShipyardSwap", "ShipyardNew", "ShipyardSell", "SetUserShipName",
+    })
+
+    def __init__(self, state_dir: str = LOADOUT_DIR, catalog: Optional[Catalog] = None):
+        self.state_path = os.path.join(state_dir, "state.json")
+        self.history_path = os.path.join(state_dir, "history.jsonl")
+        self.catalog = catalog or Catalog()
+        data = load_json(self.state_path, {})
+        self.last_timestamp: str = data.get("last_timestamp", "")
+        self.current_ship_id: Optional[str] = data.get("current_ship_id")
+        self.ships: Dict[str, Dict[str, Any]] = data.get("ships", {})
+        self.daily_changes: Dict[str, List[str]] = defaultdict(list)
+        self.daily_ship: Dict[str, str] = {}
+        self.pending: List[Dict[str, Any]] = []
+
+    # --- helpers --------------------------------------------------------
+
+    def _ship(self, ship_id: Any, symbol: Optional[str] = None) -> Dict[str, Any]:
+        ship = self.ships.setdefault(str(ship_id), {"ship": symbol or "", "name": "", "ident": "", "modules": {}})
+        if symbol:
+            ship["ship"] = symbol.lower()
+        return ship
+
+    def describe(self, ship: Dict[str, Any]) -> str:
+        name = self.catalog.ship_name(ship["ship"])
+        return f"{name} '{ship['name']}'" if ship.get("name") else name
+
+    def _record(self, timestamp: str, change: str, line: Optional[str] = None) -> None:
+        ship = self.ships.get(str(self.current_ship_id)) if self.current_ship_id is not None else None
+        if ship is None:
+            return
+        self.pending.append({"t": timestamp, "change": change, "ship_id": self.current_ship_id, "ship": ship["ship"], "name": ship["name"]})
+        day = timestamp[:10]
+        self.daily_ship[day] = self.describe(ship)
+        if line:
+            self.daily_changes[day].append(line)
+
+    def _activate(self, timestamp: str, ship_id: Any, symbol: Optional[str] = None, name: Optional[str] = None, ident: Optional[str] = None) -> None:
+        ship = self._ship(ship_id, symbol)
+        if name is not None:
+            ship["name"] = name
+        if ident is not None:
+            ship["ident"] = ident
+        previous = self.current_ship_id
+        self.current_ship_id = str(ship_id)
+        if str(ship_id) != str(previous):
+            self._record(timestamp, "ship", f"Swapped to the **{self.describe(ship)}**." if previous is not None else None)
+        else:
+            self.daily_ship[timestamp[:10]] = self.describe(ship)
+
+    # --- ingest ---------------------------------------------------------
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+
+        if event_type == "LoadGame" and event.get("ShipID") is not None:
+            self._activate(timestamp, event["ShipID"], event.get("Ship"), event.get("ShipName"), event.get("ShipIdent"))
+        elif event_type == "Loadout" and event.get("ShipID") is not None:
+            self._activate(timestamp, event["ShipID"], event.get("Ship"), event.get("ShipName"), event.get("ShipIdent"))
+            ship = self._ship(event["ShipID"])
+            modules = {m["Slot"]: m["Item"].lower() for m in event.get("Modules", []) if m.get("Slot") and m.get("Item")}
+            changed = [slot for slot in set(modules) | set(ship["modules"]) if is_outfitting(slot) and modules.get(slot) != ship["modules"].get(slot)]
+            had_modules = bool(ship["modules"])
+            ship["modules"] = modules
+            if changed and had_modules:
+                self._record(timestamp, "refit", f"Refit: **{len(changed)} module{'s' if len(changed) != 1 else ''}** changed on the {self.describe(ship)}.")
+        elif event_type in ("ShipyardSwap", "ShipyardNew"):
+            ship_id = event.get("ShipID", event.get("NewShipID"))
+            if ship_id is not None:
+                self._activate(timestamp, ship_id, event.get("ShipType"))
+        elif event_type == "ShipyardSell":
+            ship = self.ships.pop(str(event.get("SellShipID")), None)
+            if ship:
+                self.daily_changes[timestamp[:10]].append(f"Sold the **{self.describe(ship)}**.")
+        elif event_type == "SetUserShipName" and event.get("ShipID") is not None:
+            ship = self._ship(event["ShipID"], event.get("Ship"))
+            old = self.describe(ship)
+            ship["name"] = event.get("UserShipName", "")
+            ship["ident"] = event.get("UserShipId", ship["ident"])
+            if str(event["ShipID"]) == str(self.current_ship_id):
+                self._record(timestamp, "rename", f"Renamed the {old} to **'{ship['name']}'**.")
+        else:
+            self._outfit(timestamp, event)
+
+    def _outfit(self, timestamp: str, event: Dict[str, Any]) -> None:
+        event_type = event.get("event")
+        ship_id = event.get("ShipID", self.current_ship_id)
+        if ship_id is None:
+            return
+        modules = self._ship(ship_id, event.get("Ship"))["modules"]
+        slot = event.get("Slot", "")
+        line = None
+
+        if event_type in ("ModuleBuy", "ModuleRetrieve"):
+            item = event.get("BuyItem") if event_type == "ModuleBuy" else event.get("RetrievedItem")
+            if empty_item(item):
+                return
+            modules[slot] = item.lower()
+            line = f"Fitted **{self.catalog.module_name(item)}** ({slot})."
+            replaced = event.get("SellItem") or event.get("StoredItem") or event.get("SwapOutItem")
+            if not empty_item(replaced):
+                line = line[:-1] + f", replacing the {self.catalog.module_name(replaced)}."
+        elif event_type in ("ModuleSell", "ModuleStore"):
+            item = event.get("SellItem") if event_type == "ModuleSell" else event.get("StoredItem")
+            replacement = event.get("ReplacementItem")
+            if empty_item(replacement):
+                modules.pop(slot, None)
+            else:
+                modules[slot] = replacement.lower()
+            if not empty_item(item):
+                verb = "Sold" if event_type == "ModuleSell" else "Stored"
+                line = f"{verb} the **{self.catalog.module_name(item)}** ({slot})."
+        elif event_type == "ModuleSwap":
+            from_slot, to_slot = event.get("FromSlot", ""), event.get("ToSlot", "")
+            from_item, to_item = event.get("FromItem"), event.get("ToItem")
+            for target, item in ((to_slot, from_item), (from_slot, to_item)):
+                if empty_item(item):
+                    modules.pop(target, None)
+                else:
+                    modules[target] = item.lower()
+            slot = to_slot
+            line = f"Moved the **{self.catalog.module_name(from_item)}** to {to_slot}."
+        else:
+            return
+
+        if is_outfitting(slot) and str(ship_id) == str(self.current_ship_id):
+            self._record(timestamp, "module", line)
+
+    # --- persistence ----------------------------------------------------
+
+    def save(self) -> None:
+        if self.pending:
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            with open(self.history_path, "a", encoding="utf-8") as f:
+                for record in self.pending:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.pending = []
+        write_json_atomic(self.state_path, {
+            "last_timestamp": self.last_timestamp,
+            "current_ship_id": self.current_ship_id,
+            "ships": self.ships,
+        })
+
+    # --- summaries ------------------------------------------------------
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        lines = []
+        if date in self.daily_ship:
+            lines.append(f"Flying the **{self.daily_ship[date]}**.")
+        lines.extend(self.daily_changes.get(date, []))
+        return {"Ship": lines} if lines else {}
+
+    def fitted(self, ship_id: Optional[str] = None) -> Dict[str, str]:
+        """Slot -> module name for a ship (the active one by default), outfitting only."""
+        ship = self.ships.get(str(ship_id if ship_id is not None else self.current_ship_id))
+        if not ship:
+            return {}
+        return {slot: self.catalog.module_name(item) for slot, item in sorted(ship["modules"].items()) if is_outfitting(slot)}
+
+
+def ship_description(date: str, state_dir: str = LOADOUT_DIR, catalog: Optional[Catalog] = None) -> Optional[str]:
+    """
+    The ship flown by the end of a day (a date or session ID), e.g. "Krait Mk II 'Rust Lancer'",
+    or None if no ship has been seen by then.
+    """
+    history_path = os.path.join(state_dir, "history.jsonl")
+    if not os.path.exists(history_path):
+        return None
+    cutoff = date[:10] + "~"
+    latest = None
+    with open(history_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["t"] > cutoff:
+                break
+            latest = record
+    if latest is None:
+        return None
+    catalog = catalog or Catalog()
+    name = catalog.ship_name(latest["ship"])
+    return f"{name} '{latest['name']}'" if latest.get("name") else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the tracked ships and loadouts")
+    parser.add_argument("--date", help="Which ship was flown on this day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if args.date:
+        print(f"🚀 {ship_description(args.date) or 'No ship recorded yet.'}")
+        return
+    tracker = LoadoutTracker()
+    for ship_id, ship in tracker.ships.items():
+        marker = "▶" if ship_id == str(tracker.current_ship_id) else " "
+        print(f"{marker} {tracker.describe(ship)} [{ship_id}]")
+        if ship_id == str(tracker.current_ship_id):
+            for slot, name in tracker.fitted().items():
+                print(f"      {slot:<28} {name}")
+
+
+if __name__ == "__main__":
+    main()
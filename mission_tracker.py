@@ -0,0 +1,192 @@
+import os
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from journal_trackers import STATE_DIR, JournalTracker, load_json, write_json_atomic
+
+MISSIONS_FILE = os.path.join(STATE_DIR, "missions.json")
+OUTCOME_DAYS_KEPT = 7  # long enough for any day or session an incremental run can still rewrite
+MAX_KINDS_LISTED = 5
+
+OUTCOMES = ("accepted", "completed", "failed", "abandoned", "expired")
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace("Z", ""))
+
+
+def mission_kind(name: str) -> str:
+    """'Mission_Delivery_RankEmp_name' -> 'Delivery RankEmp', the grouping key for aggregates."""
+    kind = name or "Unknown"
+    if kind.lower().startswith("mission_"):
+        kind = kind[8:]
+    if kind.lower().endswith("_name"):
+        kind = kind[:-5]
+    return kind.replace("_", " ").strip() or "Unknown"
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m" if minutes >= 60 else f"{minutes}m"
+
+
+def aggregate_lines(outcomes: List[List[Any]]) -> List[str]:
+    """
+    Compact summary lines for a list of [timestamp, kind, outcome, reward, duration] records:
+    one totals line, then one line per mission kind (the busiest MAX_KINDS_LISTED).
+    """
+    if not outcomes:
+        return []
+    totals = {outcome: 0 for outcome in OUTCOMES}
+    kinds: Dict[str, Dict[str, Any]] = {}
+    earned = 0
+    for _, kind, outcome, reward, duration in outcomes:
+        totals[outcome] += 1
+        bucket = kinds.setdefault(kind, {"counts": {}, "reward": 0, "duration": 0.0, "timed": 0})
+        bucket["counts"][outcome] = bucket["counts"].get(outcome, 0) + 1
+        if outcome == "completed":
+            earned += reward
+            bucket["reward"] += reward
+            if duration is not None:
+                bucket["duration"] += duration
+                bucket["timed"] += 1
+
+    parts = [f"**{totals[outcome]} {outcome}**" for outcome in OUTCOMES if totals[outcome]]
+    lines = [f"Missions: {', '.join(parts)}" + (f", earning **{earned:,} Cr**." if earned else ".")]
+
+    ranked = sorted(kinds.items(), key=lambda kv: (-sum(kv[1]["counts"].values()), kv[0]))
+    for kind, bucket in ranked[:MAX_KINDS_LISTED]:
+        counts = ", ".join(f"{bucket['counts'][outcome]} {outcome}" for outcome in OUTCOMES if bucket["counts"].get(outcome))
+        # A plain lead word per kind: compress_activities groups lines by the text before "**"
+        line = f"{kind} missions: **{counts}**"
+        if bucket["reward"]:
+            line += f" for **{bucket['reward']:,} Cr**"
+        if bucket["timed"]:
+            line += f" (about {format_duration(bucket['duration'] / bucket['timed'])} each)"
+        lines.append(line + ".")
+    if len(ranked) > MAX_KINDS_LISTED:
+        lines.append(f"…and {len(ranked) - MAX_KINDS_LISTED} other kinds of mission.")
+    return lines
+
+
+class MissionTracker(JournalTracker):
+    """
+    Mission lifecycle state machine keyed by MissionID. Accepted missions stay open until
+    they are completed, failed, abandoned, or pass their expiry; redirects update the open
+    entry. Open missions persist between runs, so a mission accepted in one journal and
+    turned in days later still gets its duration and payout.
+
+    Every transition is appended to a short outcome log (the last OUTCOME_DAYS_KEPT days),
+    which daily_summary and session_summary fold into a few aggregate lines instead of one
+    line per mission.
+    """
+
+    EVENTS = frozenset({
+        "MissionAccepted", "MissionCompleted", "MissionFailed", "MissionAbandoned",
+        "MissionRedirected", "Missions",
+    })
+
+    def __init__(self, path: str = MISSIONS_FILE):
+        self.path = path
+        data = load_json(path, {})
+        self.last_timestamp: str = data.get("last_timestamp", "")
+        self.open: Dict[str, Dict[str, Any]] = data.get("open", {})
+        # [[timestamp, kind, outcome, reward, duration seconds or None], ...] in time order
+        self.outcomes: List[List[Any]] = data.get("outcomes", [])
+
+    def _log(self, timestamp: str, kind: str, outcome: str, reward: int = 0, duration: Optional[float] = None) -> None:
+        self.outcomes.append([timestamp, kind, outcome, reward, duration])
+
+    def _close(self, timestamp: str, mission_id: str, outcome: str, reward: int = 0, fallback_name: str = "") -> None:
+        mission = self.open.pop(mission_id, None)
+        if mission is None:
+            # Accepted before tracking began: the outcome still counts, without a duration
+            self._log(timestamp, mission_kind(fallback_name), outcome, reward)
+            return
+        duration = (parse_timestamp(timestamp) - parse_timestamp(mission["accepted"])).total_seconds()
+        self._log(timestamp, mission["kind"], outcome, reward, duration)
+
+    def _expire(self, timestamp: str) -> None:
+        for mission_id, mission in list(self.open.items()):
+            expiry = mission.get("expiry")
+            if expiry and expiry < timestamp:
+                self._close(expiry, mission_id, "expired")
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+        self._expire(timestamp)
+
+        if event_type == "Missions":
+            # Login snapshot: anything we think is open but the game no longer lists is gone
+            listed = {str(m.get("MissionID")) for key in ("Active", "Failed", "Complete") for m in event.get(key, [])}
+            for mission_id in [mid for mid in self.open if mid not in listed]:
+                self._close(timestamp, mission_id, "expired")
+            return
+
+        mission_id = str(event.get("MissionID", ""))
+        if not mission_id:
+            return
+        if event_type == "MissionAccepted":
+            kind = mission_kind(event.get("Name", ""))
+            self.open[mission_id] = {
+                "kind": kind,
+                "accepted": timestamp,
+                "expiry": event.get("Expiry"),
+                "destination": event.get("DestinationSystem"),
+                "reward": event.get("Reward", 0),
+            }
+            self._log(timestamp, kind, "accepted")
+        elif event_type == "MissionRedirected":
+            mission = self.open.get(mission_id)
+            if mission is not None:
+                mission["destination"] = event.get("NewDestinationSystem", mission.get("destination"))
+                mission["redirected"] = True
+        elif event_type == "MissionCompleted":
+            self._close(timestamp, mission_id, "completed", int(event.get("Reward", 0) or 0), event.get("Name", ""))
+        elif event_type == "MissionFailed":
+            self._close(timestamp, mission_id, "failed", 0, event.get("Name", ""))
+        elif event_type == "MissionAbandoned":
+            self._close(timestamp, mission_id, "abandoned", 0, event.get("Name", ""))
+
+    def save(self) -> None:
+        if self.outcomes:
+            cutoff = (parse_timestamp(self.last_timestamp) - timedelta(days=OUTCOME_DAYS_KEPT)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.outcomes = [record for record in self.outcomes if record[0] >= cutoff]
+        write_json_atomic(self.path, {
+            "last_timestamp": self.last_timestamp,
+            "open": self.open,
+            "outcomes": self.outcomes,
+        })
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        lines = aggregate_lines([record for record in self.outcomes if record[0][:10] == date])
+        return {"Missions": lines} if lines else {}
+
+    def session_summary(self, start: str, end: str) -> Dict[str, List[str]]:
+        lines = aggregate_lines([record for record in self.outcomes if start <= record[0] <= end])
+        return {"Missions": lines} if lines else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show open missions and recent mission outcomes")
+    parser.add_argument("--day", help="Aggregate outcomes for one day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    tracker = MissionTracker()
+    if args.day:
+        for line in tracker.daily_summary(args.day).get("Missions", ["No missions recorded."]):
+            print(f"- {line}")
+        return
+    print(f"📋 {len(tracker.open)} open missions")
+    for mission_id, mission in sorted(tracker.open.items(), key=lambda kv: kv[1]["accepted"]):
+        destination = f" → {mission['destination']}" if mission.get("destination") else ""
+        print(f"  [{mission_id}] {mission['kind']}{destination}, accepted {mission['accepted']}, {mission.get('reward', 0):,} Cr")
+
+
+if __name__ == "__main__":
+    main()
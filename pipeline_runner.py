@@ -0,0 +1,338 @@
+"""
+`captains_log run`: the whole refresh (ingest, digests, memory, Galnet, lore, diaries) as one dependency graph.
+
+Every stage declares the files it reads and writes. After a stage succeeds, a stamp records
+a content hash of its inputs (including its own script) and of its outputs; on the next run
+a stage is skipped while its inputs are unchanged and its outputs are as it left them.
+Stages whose dependencies are finished run in parallel, each as its own `captains_log
+<command>` process.
+
+    captains_log run                       # everything that is out of date
+    captains_log run lore --force lore     # rebuild the lore store (and whatever it needs)
+    captains_log run --dry-run             # show what would run and why
+"""
+import os
+import sys
+import glob
+import time
+import hashlib
+import logging
+import argparse
+import importlib.util
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from journal_trackers import BASE_DIR, STATE_DIR, load_json, write_json_atomic
+
+PIPELINE_DIR = os.path.join(STATE_DIR, "pipeline")
+STAMPS_FILE = os.path.join(PIPELINE_DIR, "stamps.json")
+HASH_CACHE_FILE = os.path.join(PIPELINE_DIR, "file_hashes.json")
+
+DEFAULT_PIPELINE_SETTINGS: Dict[str, Any] = {
+    "jobs": 2,
+    "galnet_max_age_hours": 24,  # Galnet has no local input to hash, so it is refreshed by age
+}
+
+
+def load_pipeline_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merges the "pipeline" block of config.json over DEFAULT_PIPELINE_SETTINGS."""
+    if config is None:
+        from vector_store import load_config
+        config = load_config()
+    settings = dict(DEFAULT_PIPELINE_SETTINGS)
+    settings.update(config.get("pipeline", {}) or {})
+    return settings
+
+
+class FileHasher:
+    """
+    SHA-1 of file contents, cached by (size, mtime) so an unchanged file is only stat()ed.
+    Years of journals are hashed once; later runs only read the files that changed.
+    """
+
+    def __init__(self, path: str = HASH_CACHE_FILE):
+        self.path = path
+        self.cache: Dict[str, List[Any]] = load_json(path, {})
+        self.seen: set = set()
+
+    def file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        self.seen.add(path)
+        cached = self.cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.cache[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return self.cache[path][2]
+
+    def save(self) -> None:
+        # Drop files that no longer match any stage's patterns
+        write_json_atomic(self.path, {path: entry for path, entry in self.cache.items() if path in self.seen})
+
+
+def expand(patterns: List[str]) -> List[str]:
+    """Files matching the patterns (relative to the repo unless absolute); '!pattern' excludes."""
+    included, excluded = set(), set()
+    for pattern in patterns:
+        target = excluded if pattern.startswith("!") else included
+        path = os.path.join(BASE_DIR, os.path.expandvars(pattern.lstrip("!")))
+        target.update(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+    return sorted(included - excluded)
+
+
+def tree_hash(hasher: FileHasher, files: List[str], extra: Tuple[str, ...] = ()) -> str:
+    digest = hashlib.sha1()
+    for part in extra:
+        digest.update(part.encode("utf-8") + b"\0")
+    for path in files:
+        digest.update(os.path.relpath(path, BASE_DIR).encode("utf-8") + b"\0" + hasher.file_hash(path).encode("ascii") + b"\0")
+    return digest.hexdigest()
+
+
+class Stage:
+    """
+    One step of the refresh.
+
+    Args:
+        name (str): Stage name, as used on the command line.
+        command (List[str]): captains_log command and arguments that run it.
+        deps (Tuple[str, ...]): Stages that must finish first.
+        inputs (List[str]): Glob patterns of files read; the command's own script is always included.
+        outputs (List[str]): Glob patterns of files written; the stage reruns if they are changed or deleted.
+        stale_when (Callable, optional): Extra check given the last stamp; returns a reason to run, or None.
+        optional (bool): A failure is reported but does not stop the stages after it.
+    """
+
+    def __init__(self, name: str, command: List[str], deps: Tuple[str, ...] = (), inputs: Optional[List[str]] = None,
+                 outputs: Optional[List[str]] = None, stale_when: Optional[Callable[[Optional[Dict[str, Any]]], Optional[str]]] = None,
+                 optional: bool = False):
+        self.name = name
+        self.command = command
+        self.deps = deps
+        self.inputs = inputs or []
+        self.outputs = outputs or []
+        self.stale_when = stale_when
+        self.optional = optional
+
+    def script(self) -> Optional[str]:
+        from captains_log import COMMANDS
+        spec = importlib.util.find_spec(COMMANDS[self.command[0]][0])
+        return spec.origin if spec and spec.origin and os.path.isfile(spec.origin) else None
+
+    def input_hash(self, hasher: FileHasher) -> str:
+        script = self.script()
+        return tree_hash(hasher, expand(self.inputs) + ([script] if script else []), tuple(self.command))
+
+    def output_hash(self, hasher: FileHasher) -> Optional[str]:
+        files = expand(self.outputs)
+        return tree_hash(hasher, files) if files else None
+
+
+def stamp_older_than(hours: float) -> Callable[[Optional[Dict[str, Any]]], Optional[str]]:
+    def check(stamp: Optional[Dict[str, Any]]) -> Optional[str]:
+        if stamp and time.time() - stamp.get("finished_at", 0) < hours * 3600:
+            return None
+        return f"last refreshed over {hours:g}h ago"
+    return check
+
+
+def diary_jobs_due(stamp: Optional[Dict[str, Any]]) -> Optional[str]:
+    from diary_queue import DiaryQueue
+    due = DiaryQueue().next_due()
+    return "diary jobs queued" if due is not None and due <= time.time() else None
+
+
+def fallback_digests(stamp: Optional[Dict[str, Any]]) -> Optional[str]:
+    from commanders import known_commanders
+    from rolling_summaries import DigestStore
+    pending = sum(len(DigestStore.for_commander(commander).fallbacks()) for commander in known_commanders())
+    return f"{pending} fallback digests to retry" if pending else None
+
+
+def pipeline_stages(config: Optional[Dict[str, Any]] = None) -> Dict[str, Stage]:
+    from live_state import journal_directory
+    settings = load_pipeline_settings(config)
+    logs = "rag_data/commander_logs"
+    stages = [
+        Stage("ingest", ["ingest"],
+              inputs=[os.path.join(journal_directory(config), "Journal.*.log")],
+              outputs=[f"{logs}/*.md", f"{logs}/*.json", f"{logs}/sessions/*", f"{logs}/cmdr_*/**/*", "rag_data/processed_index.json"]),
+        # Sagas fold every month into the next, so this can take many LLM calls; it runs here
+        # rather than inside ingest so new summaries land without waiting on the LLM
+        Stage("digests", ["digests"], deps=("ingest",), stale_when=fallback_digests,
+              inputs=[f"{logs}/*.json", f"{logs}/cmdr_*/*.json", "diary_logs/*.txt", "diary_logs/cmdr_*/*.txt"],
+              outputs=["ingest_state/digests/**/*", "ingest_state/cmdr_*/digests/**/*"]),
+        # Embeds only new or changed diaries and daily summaries; save_diary indexes its own entries
+        Stage("memory", ["memory", "--sync"], deps=("ingest",),
+              inputs=[f"{logs}/*.json", f"{logs}/cmdr_*/*.json", "diary_logs/*.txt", "diary_logs/cmdr_*/*.txt", "config.json"],
+              outputs=["ingest_state/memory/*", "ingest_state/cmdr_*/memory/*"]),
+        Stage("convert_logs", ["convert-logs"], deps=("ingest",),
+              inputs=[f"{logs}/*.md"], outputs=[f"{logs}/json/*.json"]),
+        Stage("galnet_fetch", ["galnet"], stale_when=stamp_older_than(settings["galnet_max_age_hours"]),
+              outputs=["rag_data/galnet_articles.json"], optional=True),
+        Stage("galnet_normalize", ["normalize-galnet"], deps=("galnet_fetch",),
+              inputs=["rag_data/galnet_articles.json"], outputs=["rag_data/galnet_articles_rag.json"]),
+        Stage("validate", ["validate"], deps=("galnet_normalize",),
+              inputs=["rag_data/*.json", "!rag_data/processed_index.json"]),
+        # The loader reads every top-level rag_data/*.json; processed_index.json is ingest's bookkeeping.
+        # Only the files it alone writes are outputs: Chroma's own files change whenever a reader
+        # opens the store, and the diaries stage keeps its retrieval cache in the same folder
+        Stage("lore", ["lore"], deps=("validate",),
+              inputs=["rag_data/*.json", "!rag_data/processed_index.json", "config.json"],
+              outputs=["elite_rag_db/lore_*", "elite_rag_db/collection_version.json"]),
+        Stage("diaries", ["queue", "--work"], deps=("ingest", "digests", "memory", "lore"), stale_when=diary_jobs_due),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+def with_dependencies(stages: Dict[str, Stage], targets: List[str]) -> List[str]:
+    """The targets plus everything they depend on, in dependency order."""
+    ordered: List[str] = []
+
+    def visit(name: str) -> None:
+        if name not in ordered:
+            for dep in stages[name].deps:
+                visit(dep)
+            ordered.append(name)
+
+    for name in targets:
+        visit(name)
+    return ordered
+
+
+def launcher() -> List[str]:
+    if getattr(sys, "frozen", False):  # the PyInstaller build: the executable is captains_log itself
+        return [sys.executable]
+    return [sys.executable, os.path.join(BASE_DIR, "captains_log.py")]
+
+
+class PipelineRunner:
+    """Runs the stale stages of a set of targets, independent ones in parallel."""
+
+    def __init__(self, stages: Dict[str, Stage], stamps_file: str = STAMPS_FILE, hasher: Optional[FileHasher] = None):
+        self.stages = stages
+        self.stamps_file = stamps_file
+        self.stamps: Dict[str, Dict[str, Any]] = load_json(stamps_file, {})
+        self.hasher = hasher or FileHasher()
+
+    def stale_reason(self, stage: Stage, forced: bool) -> Tuple[Optional[str], str]:
+        """(why the stage must run or None, its current input hash)."""
+        input_hash = stage.input_hash(self.hasher)
+        stamp = self.stamps.get(stage.name)
+        if forced:
+            return "forced", input_hash
+        if stamp is None:
+            return "never run", input_hash
+        if stamp.get("inputs") != input_hash:
+            return "inputs changed", input_hash
+        if stage.outputs:
+            output_hash = stage.output_hash(self.hasher)
+            if output_hash != stamp.get("outputs"):
+                return ("outputs missing" if output_hash is None else "outputs changed"), input_hash
+        if stage.stale_when is not None:
+            return stage.stale_when(stamp), input_hash
+        return None, input_hash
+
+    def _execute(self, stage: Stage) -> Tuple[int, float]:
+        start = time.perf_counter()
+        result = subprocess.run(launcher() + stage.command, cwd=BASE_DIR)
+        return result.returncode, time.perf_counter() - start
+
+    def run(self, targets: List[str], force: Tuple[str, ...] = (), jobs: int = 2, dry_run: bool = False,
+            skip: Tuple[str, ...] = ()) -> Dict[str, str]:
+        """
+        Brings the targets up to date. Returns each stage's outcome: ran, up to date, failed,
+        skipped (asked to; later stages use its existing outputs) or blocked (a stage it
+        needs failed).
+        """
+        order = with_dependencies(self.stages, targets)
+        outcome: Dict[str, str] = {name: "skipped" for name in order if name in skip}
+        running: Dict[Any, Tuple[Stage, str]] = {}
+
+        def ready(name: str) -> bool:
+            return name not in outcome and all(dep in outcome for dep in self.stages[name].deps) \
+                and name not in {stage.name for stage, _ in running.values()}
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while len(outcome) < len(order):
+                for name in [n for n in order if ready(n)]:
+                    stage = self.stages[name]
+                    blocked = [dep for dep in stage.deps
+                               if outcome[dep] == "blocked" or (outcome[dep] == "failed" and not self.stages[dep].optional)]
+                    if blocked:
+                        outcome[name] = "blocked"
+                        logging.warning(f"⏭️ {name}: not run, {', '.join(blocked)} did not finish")
+                        continue
+                    reason, input_hash = self.stale_reason(stage, name in force)
+                    if reason is None:
+                        outcome[name] = "up to date"
+                        logging.info(f"✅ {name}: up to date")
+                    elif dry_run:
+                        outcome[name] = "would run"
+                        logging.info(f"🔎 {name}: would run ({reason})")
+                    else:
+                        logging.info(f"▶️ {name}: {reason}, running `captains_log {' '.join(stage.command)}`")
+                        running[pool.submit(self._execute, stage)] = (stage, input_hash)
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, input_hash = running.pop(future)
+                    try:
+                        returncode, seconds = future.result()
+                    except OSError as e:
+                        returncode, seconds = -1, 0.0
+                        logging.error(f"❌ {stage.name}: could not start: {e}")
+                    if returncode == 0:
+                        outcome[stage.name] = "ran"
+                        self.stamps[stage.name] = {
+                            "inputs": input_hash,
+                            "outputs": stage.output_hash(self.hasher),
+                            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                            "finished_at": time.time(),
+                            "seconds": round(seconds, 2),
+                        }
+                        write_json_atomic(self.stamps_file, self.stamps, indent=2)
+                        logging.info(f"🏁 {stage.name}: done in {seconds:.1f}s")
+                    else:
+                        outcome[stage.name] = "failed"
+                        level = logging.warning if stage.optional else logging.error
+                        level(f"{'⚠️' if stage.optional else '❌'} {stage.name}: exited with {returncode}")
+        self.hasher.save()
+        return outcome
+
+
+def main():
+    config = load_json(os.path.join(BASE_DIR, "config.json"), {})  # not vector_store.load_config: no numpy for --help
+    stages = pipeline_stages(config)
+    parser = argparse.ArgumentParser(description="Run every out-of-date pipeline stage, independent stages in parallel")
+    parser.add_argument("targets", nargs="*", metavar="STAGE",
+                        help=f"Stages to bring up to date, with their dependencies (default: all of {', '.join(stages)})")
+    parser.add_argument("--force", nargs="*", metavar="STAGE", help="Run these stages even if up to date (no names: all)")
+    parser.add_argument("--skip", nargs="*", default=[], metavar="STAGE",
+                        help="Don't run these stages; the ones after them use their existing outputs (e.g. galnet_fetch without Firefox)")
+    parser.add_argument("--jobs", type=int, help="Stages run at once (default: pipeline.jobs in config.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Only show which stages would run and why")
+    args = parser.parse_args()
+
+    unknown = set(args.targets + (args.force or []) + args.skip) - set(stages)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))} (choose from {', '.join(stages)})")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    targets = args.targets or list(stages)
+    force = tuple(stages) if args.force == [] else tuple(args.force or ())
+    jobs = args.jobs or load_pipeline_settings(config)["jobs"]
+    outcome = PipelineRunner(stages).run(targets, force, jobs, args.dry_run, tuple(args.skip))
+    print(", ".join(f"{name}: {state}" for name, state in outcome.items()))
+    if any(state == "failed" and not stages[name].optional for name, state in outcome.items()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import os
 import json
 import logging
+import sys
 from typing import Any, Dict, List
 import chromadb
-from sentence_transformers import SentenceTransformer
+from embedder import load_embedder
+from vector_store import CHROMA_DB_PATH, bump_collection_version, export_numpy_index, get_lore_collection, knowledge_text, load_vector_settings
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -12,21 +14,22 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(me
 DATA_FOLDER: str = os.path.join(os.path.dirname(__file__), "rag_data")
 
 # Initialize ChromaDB client
+vector_settings = load_vector_settings()
 try:
-    chroma_client = chromadb.PersistentClient(path="elite_rag_db")
-    collection = chroma_client.get_or_create_collection("elite_dangerous_lore")
+    chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    collection = get_lore_collection(chroma_client, vector_settings)
     logging.info("✅ Connected to ChromaDB.")
 except Exception as e:
     logging.error(f"❌ ERROR: Failed to connect to ChromaDB: {e}")
-    exit(1)
+    sys.exit(1)
 
 # Initialize embedding model
 try:
-    embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+    embedding_model = load_embedder()
     logging.info("✅ Embedding model loaded.")
 except Exception as e:
     logging.error(f"❌ ERROR: Failed to load embedding model: {e}")
-    exit(1)
+    sys.exit(1)
 
 def add_knowledge_entry(entry: Dict[str, Any]) -> None:
     """
@@ -39,10 +42,7 @@ def add_knowledge_entry(entry: Dict[str, Any]) -> None:
         if not isinstance(entry, dict):
             raise TypeError(f"Expected dictionary, got {type(entry)}")
         
-        text = (
-            f"{entry['name']}: {entry['description']} "
-            f"(Capital: {entry.get('capital', 'Unknown')}, Leader: {entry.get('leader', 'Unknown')})"
-        )
+        text = knowledge_text(entry)
         embedding: List[float] = embedding_model.encode(text).tolist()
         collection.add(ids=[entry["id"]], embeddings=[embedding], metadatas=[{"text": text}])
         logging.info(f"✅ Added to database: {entry['name']}")
@@ -101,4 +101,14 @@ try:
 except Exception as e:
     logging.error(f"❌ ERROR: Failed to retrieve stored data - {e}")
 
+# Export the same vectors for the in-memory NumPy retrieval backend
+try:
+    exported = export_numpy_index(collection, vector_settings)
+    logging.info(f"📦 Exported {exported} vectors for the NumPy retrieval backend.")
+except Exception as e:
+    logging.error(f"❌ ERROR: Failed to export NumPy index - {e}")
+
+# Invalidate cached retrieval results computed against the previous contents
+logging.info(f"🔖 Lore collection version is now {bump_collection_version()}.")
+
 logging.info("\n✅ All knowledge data stored successfully!")
@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from vector_store import CHROMA_DB_PATH, read_collection_version
+
+RETRIEVAL_CACHE_PATH = os.path.join(CHROMA_DB_PATH, "retrieval_cache.json")
+MAX_CACHE_ENTRIES = 20000
+
+# Settings that change which neighbours come back; a change to any of them empties the cache.
+RESULT_SETTINGS = ("backend", "distance", "hnsw_ef_search", "quantization", "keep_float32", "rescore_factor")
+
+
+def settings_signature(settings: Dict[str, Any]) -> str:
+    return json.dumps({key: settings.get(key) for key in RESULT_SETTINGS}, sort_keys=True)
+
+
+class RetrievalCache:
+    """
+    Remembers the lore texts returned for each (query text, top_k) against one version of
+    the collection. rag_data_loader.py bumps the collection version whenever it rewrites
+    the collection, and a cache file written for any other version is discarded on load.
+    """
+
+    def __init__(self, settings: Dict[str, Any], path: str = RETRIEVAL_CACHE_PATH, version: Optional[int] = None):
+        self.path = path
+        self.version = read_collection_version() if version is None else version
+        self.signature = settings_signature(settings)
+        self.entries: Dict[str, List[str]] = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def key(text: str, top_k: int) -> str:
+        return f"{hashlib.sha1(text.encode('utf-8')).hexdigest()}:{top_k}"
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring unreadable retrieval cache {self.path}: {e}")
+            return
+        if data.get("version") == self.version and data.get("settings") == self.signature:
+            self.entries = data.get("entries", {})
+        else:
+            logging.info("♻️ Lore collection changed since the retrieval cache was written; starting fresh.")
+            self.dirty = True
+
+    def refresh(self) -> None:
+        """Drops every entry if the collection has been rebuilt since this cache was opened."""
+        version = read_collection_version()
+        if version != self.version:
+            self.version = version
+            self.entries = {}
+            self.dirty = True
+
+    def get(self, text: str, top_k: int) -> Optional[List[str]]:
+        texts = self.entries.get(self.key(text, top_k))
+        if texts is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return texts
+
+    def put(self, text: str, top_k: int, texts: List[str]) -> None:
+        self.entries[self.key(text, top_k)] = texts
+        self.dirty = True
+        if len(self.entries) > MAX_CACHE_ENTRIES:
+            # Dicts keep insertion order, so this drops the oldest entries first.
+            for stale in list(self.entries)[:len(self.entries) - MAX_CACHE_ENTRIES]:
+                del self.entries[stale]
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "settings": self.signature, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
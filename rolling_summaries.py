@@ -0,0 +1,216 @@
+import os
+import glob
+import json
+import hashlib
+import logging
+import argparse
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from commanders import DEFAULT_COMMANDER, commander_path, known_commanders
+from journal_trackers import STATE_DIR, load_json, write_json_atomic
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+DIARY_FOLDER = os.path.join(BASE_DIR, "diary_logs")
+COMMANDER_LOGS_FOLDER = os.path.join(BASE_DIR, "rag_data", "commander_logs")
+DIGEST_DIR = os.path.join(STATE_DIR, "digests")
+
+WEEK_WORDS = 150
+MONTH_WORDS = 200
+SAGA_WORDS = 250
+DAY_INPUT_WORDS = 250  # cap on what one day contributes to its week's prompt
+STORY_TOKEN_BUDGET = 600
+STORY_RECENT_WEEKS = 3
+
+
+def words(text: str, limit: int) -> str:
+    parts = text.split()
+    return " ".join(parts[:limit]) + (" …" if len(parts) > limit else "")
+
+
+def iso_week(day: str) -> str:
+    year, week, _ = date_cls.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_month(week: str) -> str:
+    """ISO convention: a week belongs to the month containing its Thursday."""
+    year, week_no = week.split("-W")
+    return date_cls.fromisocalendar(int(year), int(week_no), 4).strftime("%Y-%m")
+
+
+def day_text(day: str, logs_dir: str = COMMANDER_LOGS_FOLDER, diary_dir: str = DIARY_FOLDER) -> str:
+    """What one day contributes: its summary lines (deduplicated) and its diary, if any."""
+    parts = []
+    summary_path = os.path.join(logs_dir, f"{day}.json")
+    if os.path.exists(summary_path):
+        with open(summary_path, "r", encoding="utf-8") as f:
+            categories = json.load(f).get("categories", {})
+        lines = list(dict.fromkeys(line.replace("**", "") for entries in categories.values() for line in entries))
+        parts.append(" ".join(lines))
+    diary_path = os.path.join(diary_dir, f"{day}.txt")
+    if os.path.exists(diary_path):
+        with open(diary_path, "r", encoding="utf-8") as f:
+            diary = f.read()
+        if not diary.startswith("Error:"):
+            parts.append(diary)
+    return words(" ".join(parts), DAY_INPUT_WORDS)
+
+
+def available_days(logs_dir: str = COMMANDER_LOGS_FOLDER, diary_dir: str = DIARY_FOLDER) -> List[str]:
+    days = {os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(logs_dir, "*.json"))}
+    days |= {os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(diary_dir, "*.txt"))}
+    return sorted(day for day in days if len(day) == 10)
+
+
+def fingerprint(parts: List[Tuple[str, str]]) -> str:
+    digest = hashlib.sha1()
+    for key, text in parts:
+        digest.update(key.encode("utf-8") + b"\0" + text.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def summarize(title: str, parts: List[Tuple[str, str]], word_limit: int) -> Tuple[str, bool]:
+    """
+    Asks the local LLM for a digest; falls back to a plain truncation if it is unavailable.
+    Returns (digest, whether it is the fallback).
+    """
+    from llm_client import chat_completion
+
+    material = "\n\n".join(f"[{key}] {text}" for key, text in parts if text)
+    messages = [
+        {"role": "system", "content": "You condense a starship commander's log notes into a factual digest. Past tense, third person, no preamble."},
+        {"role": "user", "content": f"{title}\n\n{material}\n\nWrite a digest of at most {word_limit} words covering where they went, what they did and what changed."},
+    ]
+    try:
+        return words(chat_completion(messages, max_tokens=word_limit * 2, temperature=0.3), word_limit), False
+    except Exception as e:
+        logging.warning(f"⚠️ LLM digest failed for {title}, using an extractive digest: {e}")
+        texts = [text for _, text in parts if text]
+        # An equal share per input, so the newest day/month is never truncated away entirely
+        return " ".join(words(text, max(word_limit // len(texts), 1)) for text in texts), True
+
+
+class DigestStore:
+    """
+    Weekly digests built from days, monthly digests built from weeks, and a rolling "saga"
+    that folds each month into the story so far. Every digest is cached on disk with a hash
+    of its inputs and regenerated only when those inputs change, so a refresh after one
+    new day touches one week, one month and the sagas from that month on. A fallback
+    digest written while the LLM was unreachable is marked as such and regenerated by the
+    next refresh even though its inputs are unchanged.
+    """
+
+    def __init__(self, digest_dir: str = DIGEST_DIR, logs_dir: str = COMMANDER_LOGS_FOLDER, diary_dir: str = DIARY_FOLDER):
+        self.digest_dir = digest_dir
+        self.logs_dir = logs_dir
+        self.diary_dir = diary_dir
+
+    @classmethod
+    def for_commander(cls, commander: str = DEFAULT_COMMANDER) -> "DigestStore":
+        """The digests built from one commander's summaries and diaries."""
+        return cls(commander_path(DIGEST_DIR, commander), commander_path(COMMANDER_LOGS_FOLDER, commander),
+                   commander_path(DIARY_FOLDER, commander))
+
+    def _path(self, level: str, key: str) -> str:
+        return os.path.join(self.digest_dir, level, f"{key}.json")
+
+    def get(self, level: str, key: str) -> Optional[Dict[str, Any]]:
+        return load_json(self._path(level, key), None)
+
+    def _refresh(self, level: str, key: str, parts: List[Tuple[str, str]], title: str, word_limit: int) -> Tuple[str, bool]:
+        source_hash = fingerprint(parts)
+        cached = self.get(level, key)
+        if cached and cached.get("source_hash") == source_hash and not cached.get("fallback"):
+            return cached["text"], False
+        text, fallback = summarize(title, parts, word_limit)
+        write_json_atomic(self._path(level, key), {"key": key, "source_hash": source_hash, "text": text, "fallback": fallback}, indent=2)
+        logging.info(f"📚 Regenerated {level} digest {key}")
+        return text, True
+
+    def refresh(self, days: Optional[List[str]] = None) -> int:
+        """Brings every digest up to date with the day summaries and diaries on disk. Returns the number regenerated."""
+        days = available_days(self.logs_dir, self.diary_dir) if days is None else days
+        weeks: Dict[str, List[str]] = defaultdict(list)
+        for day in days:
+            weeks[iso_week(day)].append(day)
+
+        regenerated = 0
+        months: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        for week in sorted(weeks):
+            parts = [(day, day_text(day, self.logs_dir, self.diary_dir)) for day in sorted(weeks[week])]
+            text, changed = self._refresh("weekly", week, parts, f"Log notes for week {week}:", WEEK_WORDS)
+            regenerated += changed
+            months[week_month(week)].append((week, text))
+
+        saga = ""
+        for month in sorted(months):
+            text, changed = self._refresh("monthly", month, months[month], f"Weekly digests for {month}:", MONTH_WORDS)
+            regenerated += changed
+            saga, changed = self._refresh("saga", month, [("story so far", saga), (month, text)], f"The story so far, then what happened in {month}:", SAGA_WORDS)
+            regenerated += changed
+        return regenerated
+
+    def fallbacks(self) -> List[str]:
+        """The level/key of every digest still holding an extractive fallback."""
+        found = []
+        for path in sorted(glob.glob(os.path.join(self.digest_dir, "*", "*.json"))):
+            if load_json(path, {}).get("fallback"):
+                found.append(f"{os.path.basename(os.path.dirname(path))}/{os.path.splitext(os.path.basename(path))[0]}")
+        return found
+
+    def latest_saga_before(self, month: str) -> Optional[Dict[str, Any]]:
+        """The newest saga from before `month` (YYYY-MM); months without play have none of their own."""
+        months = [os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(self.digest_dir, "saga", "*.json"))]
+        earlier = [m for m in months if m < month]
+        return self.get("saga", max(earlier)) if earlier else None
+
+    def story_so_far(self, key: str, token_budget: int = STORY_TOKEN_BUDGET) -> str:
+        """
+        Cached context for an entry dated `key` (a date or session ID), at a bounded token cost:
+        the saga up to the previous month plus the last few weekly digests. Never generates.
+        """
+        day = date_cls.fromisoformat(key[:10])
+        first_of_month = day.replace(day=1)
+        saga = self.latest_saga_before(first_of_month.strftime("%Y-%m"))
+
+        recent = []
+        this_week = iso_week(day.isoformat())
+        for weeks_back in range(STORY_RECENT_WEEKS, 0, -1):
+            week = iso_week((day - timedelta(weeks=weeks_back)).isoformat())
+            digest = self.get("weekly", week)
+            if digest and week != this_week and week_month(week) == first_of_month.strftime("%Y-%m"):
+                recent.append(f"Week {week}: {digest['text']}")
+
+        # ~4 characters per token; drop the oldest weeks first, then trim the saga.
+        budget_chars = token_budget * 4
+        while recent and sum(len(text) for text in recent) > budget_chars:
+            recent.pop(0)
+        saga_text = saga["text"] if saga else ""
+        saga_text = saga_text[:max(budget_chars - sum(len(text) for text in recent), 0)]
+        return "\n".join(part for part in [saga_text] + recent if part)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build weekly/monthly digests and the rolling story so far")
+    parser.add_argument("--show", help="Print the story so far for a date (YYYY-MM-DD) instead of refreshing")
+    parser.add_argument("--commander", help="Whose digests (default: refresh every commander; --show uses the one in config.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if args.show:
+        store = DigestStore.for_commander(args.commander or DEFAULT_COMMANDER)
+        print(store.story_so_far(args.show) or "(no digests yet)")
+        return
+    for commander in [args.commander] if args.commander else known_commanders():
+        store = DigestStore.for_commander(commander)
+        regenerated = store.refresh()
+        pending = len(store.fallbacks())
+        logging.info(f"✅ Digests for {commander} up to date ({regenerated} regenerated"
+                     f"{f', {pending} fallbacks to retry' if pending else ''}).")
+
+
+if __name__ == "__main__":
+    main()
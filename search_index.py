@@ -0,0 +1,228 @@
+import os
+import re
+import glob
+import sqlite3
+import logging
+import argparse
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from commanders import COMMANDER_LOGS_FOLDER, DIARY_FOLDER, commander_path, display_name, is_primary, known_commanders
+from journal_trackers import STATE_DIR
+
+SEARCH_DB = os.path.join(STATE_DIR, "search_index.sqlite")  # every commander's diaries and summaries
+SNIPPET_TOKENS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    commander TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    date TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_date ON docs (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(body, tokenize = 'porter unicode61');
+"""
+
+
+def document_kind(path: str) -> str:
+    if path.endswith(".txt"):
+        return "diary"
+    return "session" if os.path.basename(os.path.dirname(path)) == "sessions" else "summary"
+
+
+def document_text(path: str) -> Optional[str]:
+    """The searchable text of a diary or Markdown summary; None for a saved error message."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.startswith("Error:"):
+        return None
+    return text.replace("**", "") if path.endswith(".md") else text
+
+
+def commander_documents(commander: str) -> List[str]:
+    """Diaries plus daily and session Markdown summaries of one commander."""
+    logs_dir = commander_path(COMMANDER_LOGS_FOLDER, commander)
+    return (glob.glob(os.path.join(commander_path(DIARY_FOLDER, commander), "*.txt"))
+            + glob.glob(os.path.join(logs_dir, "*.md"))
+            + glob.glob(os.path.join(logs_dir, "sessions", "*.md")))
+
+
+FTS_OPERATORS = ("AND", "OR", "NOT")
+
+
+def fts_query(query: str) -> str:
+    """
+    Makes free text safe for MATCH: every word and "quoted phrase" becomes a required term.
+    Bare punctuation is dropped, and AND/OR/NOT stay operators when they sit between two terms.
+    """
+    tokens = [token for token in re.findall(r'"[^"]+"|[^\s"]+', query) if re.search(r"\w", token)]
+    parts: List[str] = []
+    for i, token in enumerate(tokens):
+        if token in FTS_OPERATORS:
+            if parts and parts[-1] not in FTS_OPERATORS and i + 1 < len(tokens) and tokens[i + 1] not in FTS_OPERATORS:
+                parts.append(token)
+        else:
+            parts.append(token if token.startswith('"') else '"' + token + '"')
+    return " ".join(parts)
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index over diaries and Markdown summaries, ranked with bm25.
+
+    Documents are keyed by path and carry their commander, kind and date, so date and
+    commander filters use a plain index next to the full-text match. Writers call
+    index_files() right after saving; sync() catches up on anything else by comparing
+    size and mtime, so only new or edited files are read.
+    """
+
+    def __init__(self, path: str = SEARCH_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # parallel ingest processes write here too
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _upsert(self, conn: sqlite3.Connection, path: str, commander: str) -> bool:
+        stat = os.stat(path)
+        row = conn.execute("SELECT id, size, mtime_ns FROM docs WHERE path = ?", (path,)).fetchone()
+        if row and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+            return False
+        if row:
+            conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row["id"],))
+            conn.execute("DELETE FROM docs WHERE id = ?", (row["id"],))
+        text = document_text(path)
+        if text is None:
+            return False
+        key = os.path.splitext(os.path.basename(path))[0]
+        cursor = conn.execute(
+            "INSERT INTO docs (path, commander, kind, key, date, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, commander.upper(), document_kind(path), key, key[:10], stat.st_size, stat.st_mtime_ns),
+        )
+        conn.execute("INSERT INTO docs_fts (rowid, body) VALUES (?, ?)", (cursor.lastrowid, text))
+        return True
+
+    def index_files(self, paths: Iterable[str], commander: str) -> int:
+        """(Re)indexes just-written files in one transaction. Returns the number that changed."""
+        with self._connect() as conn:
+            return sum(self._upsert(conn, os.path.abspath(path), commander) for path in paths)
+
+    def sync(self, commanders: Optional[List[str]] = None) -> Tuple[int, int]:
+        """Indexes new and edited documents and drops deleted ones. Returns (indexed, removed)."""
+        indexed = removed = 0
+        with self._connect() as conn:
+            for commander in commanders or known_commanders():
+                paths = {os.path.abspath(path) for path in commander_documents(commander)}
+                indexed += sum(self._upsert(conn, path, commander) for path in sorted(paths))
+                for row in conn.execute("SELECT id, path FROM docs WHERE commander = ?", (commander.upper(),)).fetchall():
+                    if row["path"] not in paths:
+                        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row["id"],))
+                        conn.execute("DELETE FROM docs WHERE id = ?", (row["id"],))
+                        removed += 1
+        return indexed, removed
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def search(self, query: str, since: Optional[str] = None, until: Optional[str] = None, commander: Optional[str] = None,
+               kinds: Optional[List[str]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Best matches first, each with a snippet around the hits.
+
+        Args:
+            query (str): Words and "quoted phrases", all required; raw FTS5 syntax (OR, NEAR, prefix*) is tried first.
+            since (str, optional): Earliest date (YYYY-MM-DD), inclusive.
+            until (str, optional): Latest date (YYYY-MM-DD), inclusive.
+            commander (str, optional): Only this commander's documents.
+            kinds (List[str], optional): Any of "diary", "summary", "session".
+            limit (int): Maximum results.
+        """
+        where, params = ["docs_fts MATCH :query"], {"query": query, "limit": limit}
+        if since:
+            where.append("docs.date >= :since")
+            params["since"] = since
+        if until:
+            where.append("docs.date <= :until")
+            params["until"] = until
+        if commander:
+            where.append("docs.commander = :commander")
+            params["commander"] = commander.upper()
+        if kinds:
+            where.append(f"docs.kind IN ({', '.join(f':kind{i}' for i in range(len(kinds)))})")
+            params.update({f"kind{i}": kind for i, kind in enumerate(kinds)})
+        # Rank first, then build snippets for the few rows kept rather than for every match
+        sql = (
+            f"SELECT docs.commander, docs.kind, docs.key, docs.path, hits.rank AS score, "
+            f"snippet(docs_fts, 0, '[', ']', ' … ', {SNIPPET_TOKENS}) AS snippet "
+            f"FROM (SELECT docs_fts.rowid AS id, docs_fts.rank AS rank FROM docs_fts "
+            f"{'JOIN docs ON docs.id = docs_fts.rowid ' if len(where) > 1 else ''}"
+            f"WHERE {' AND '.join(where)} ORDER BY docs_fts.rank LIMIT :limit) AS hits "
+            f"JOIN docs ON docs.id = hits.id JOIN docs_fts ON docs_fts.rowid = hits.id "
+            f"WHERE docs_fts MATCH :query ORDER BY hits.rank"
+        )
+        with self._connect() as conn:
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 syntax (stray punctuation, a lone AND, ...); search the words literally
+                params["query"] = fts_query(query)
+                rows = conn.execute(sql, params).fetchall() if params["query"] else []
+        return [dict(row) for row in rows]
+
+
+def index_written(paths: Iterable[str], commander: str) -> None:
+    """For writers: indexes files they just saved, never failing the save itself."""
+    try:
+        SearchIndex().index_files(paths, commander)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to update the search index: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over diaries and daily/session summaries")
+    parser.add_argument("query", nargs="*", help='Words and "quoted phrases" (all must match); FTS5 syntax such as OR and prefix* works too')
+    parser.add_argument("--since", help="Earliest date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Latest date (YYYY-MM-DD)")
+    parser.add_argument("--commander", help="Only this commander (default: all)")
+    parser.add_argument("--kind", nargs="*", choices=["diary", "summary", "session"], help="Only these kinds of document")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--sync", action="store_true", help="Index new, edited and deleted files first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    index = SearchIndex()
+    if args.sync or index.count() == 0:
+        indexed, removed = index.sync()
+        logging.info(f"🔎 Search index synced ({indexed} indexed, {removed} removed, {index.count()} documents).")
+    if not args.query:
+        return
+
+    # An argument with spaces was quoted on the command line, so it is meant as a phrase
+    query = " ".join(f'"{part}"' if " " in part and '"' not in part else part for part in args.query)
+    results = index.search(query, args.since, args.until, args.commander, args.kind, args.limit)
+    if not results:
+        print("No matches.")
+    for result in results:
+        who = "" if is_primary(result["commander"]) else f"{display_name(result['commander'])} · "
+        print(f"{result['key']}  {who}{result['kind']}  ({-result['score']:.2f})")
+        print(f"    {' '.join(result['snippet'].split())}")
+
+
+if __name__ == "__main__":
+    main()
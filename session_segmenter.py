@@ -0,0 +1,113 @@
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from commanders import DEFAULT_COMMANDER
+from journal_trackers import STATE_DIR, load_json, write_json_atomic
+
+SESSION_STATE_FILE = os.path.join(STATE_DIR, "open_session.json")
+IDLE_GAP_MINUTES = 45
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace("Z", ""))
+
+
+def session_id_for(timestamp: str) -> str:
+    """'2024-12-08T19:45:12Z' -> '2024-12-08T194512', matching the journal file naming."""
+    return parse_timestamp(timestamp).strftime("%Y-%m-%dT%H%M%S")
+
+
+class SessionSegmenter:
+    """
+    Splits the event stream into play sessions instead of calendar days.
+
+    A LoadGame always opens a new session and a Shutdown closes the current one. A gap of
+    more than IDLE_GAP_MINUTES between events also starts a new session, which covers
+    crashes and journals that end without a Shutdown. Continued only marks a journal
+    rolling over to its next part, so it keeps the session open. Header events never open
+    a session, and sessions that recorded nothing are dropped rather than summarized.
+    Each event costs O(1). The session still open at the end of a run is saved and
+    resumed by the next run.
+    """
+
+    # Read in full; every other event only contributes its timestamp and name.
+    EVENTS = frozenset({"LoadGame"})
+    # Written at the top of every journal file, before the LoadGame that starts the session
+    HEADER_EVENTS = frozenset({"Fileheader", "Commander", "Continued"})
+
+    def __init__(self, state_file: str = SESSION_STATE_FILE, idle_gap_minutes: int = IDLE_GAP_MINUTES,
+                 commander: Optional[str] = None):
+        self.state_file = state_file
+        self.idle_gap_seconds = idle_gap_minutes * 60
+        self.current: Optional[Dict[str, Any]] = load_json(state_file, None)
+        self.completed: List[Dict[str, Any]] = []
+        # Upper case, as in the commander partitions and the diary queue
+        self.commander = (self.current["commander"] if self.current else commander or DEFAULT_COMMANDER).upper()
+        self._last_seen: Optional[datetime] = parse_timestamp(self.current["end"]) if self.current else None
+
+    def _open(self, timestamp: str) -> None:
+        self.current = {
+            "session_id": session_id_for(timestamp),
+            "commander": self.commander,
+            "start": timestamp,
+            "end": timestamp,
+            "categories": {},
+        }
+
+    def _close(self) -> None:
+        if self.current is not None:
+            self.completed.append(self.current)
+            self.current = None
+
+    def handle_event(self, event: Dict[str, Any], described: Optional[Tuple[str, str]] = None) -> None:
+        """
+        Advances the state machine by one event.
+
+        Args:
+            event (Dict[str, Any]): The parsed journal event.
+            described (Tuple[str, str], optional): Its (category, summary line) from describe_event.
+        """
+        timestamp = event.get("timestamp")
+        if not timestamp:
+            return
+        event_type = event.get("event")
+
+        if self.current is not None and timestamp < self.current["end"]:
+            return  # already covered by an earlier run
+        seen = parse_timestamp(timestamp)
+
+        if event_type == "LoadGame":
+            self._close()
+            self.commander = (event.get("Commander") or self.commander).upper()
+            self._open(timestamp)
+        elif self.current is None:
+            if event_type == "Shutdown" or event_type in self.HEADER_EVENTS:
+                return
+            self._open(timestamp)
+        elif self._last_seen is not None and (seen - self._last_seen).total_seconds() > self.idle_gap_seconds:
+            self._close()
+            if event_type in self.HEADER_EVENTS:
+                return
+            self._open(timestamp)
+
+        self.current["end"] = timestamp
+        self._last_seen = seen
+        if described:
+            category, text = described
+            self.current["categories"].setdefault(category, []).append(text)
+
+        if event_type == "Shutdown":
+            self._close()
+
+    def drain(self) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Returns (sessions completed since the last drain, the session still open)."""
+        completed, self.completed = self.completed, []
+        return [session for session in completed if session["categories"]], self.current
+
+    def save(self) -> None:
+        if self.current is None:
+            if os.path.exists(self.state_file):
+                os.remove(self.state_file)
+        else:
+            write_json_atomic(self.state_file, self.current)
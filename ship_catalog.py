@@ -0,0 +1,216 @@
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+import sqlite3
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from journal_trackers import STATE_DIR
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+SHIPS_DIR = os.path.join(BASE_DIR, "archive")
+MODULES_FILE = os.path.join(BASE_DIR, "rag_data", "modules.json")
+CATALOG_DB = os.path.join(STATE_DIR, "catalog.sqlite")
+
+# Journal ship symbols (Loadout.Ship, ShipyardSwap.ShipType, ...) to catalog IDs.
+SHIP_SYMBOLS = {
+    "sidewinder": "ship_sidewinder_mk_i", "eagle": "ship_eagle_mk_ii", "hauler": "ship_hauler",
+    "adder": "ship_adder", "empire_eagle": "ship_imperial_eagle", "viper": "ship_viper_mk_iii",
+    "viper_mkiv": "ship_viper_mk_iv", "cobramkiii": "ship_cobra_mk_iii", "cobramkiv": "ship_cobra_mk_iv",
+    "cobramkv": "ship_cobra_mk_v", "diamondback": "ship_diamondback_scout", "diamondbackxl": "ship_diamondback_explorer",
+    "type6": "ship_type_6_transporter", "type7": "ship_type_7_transporter", "type8": "ship_type_8_transporter",
+    "type9": "ship_type_9_heavy", "type9_military": "ship_type_10_defender", "dolphin": "ship_dolphin",
+    "empire_courier": "ship_imperial_courier", "empire_trader": "ship_imperial_clipper", "cutter": "ship_imperial_cutter",
+    "independant_trader": "ship_keelback", "asp": "ship_asp_explorer", "asp_scout": "ship_asp_scout",
+    "vulture": "ship_vulture", "federation_dropship": "ship_federal_dropship",
+    "federation_dropship_mkii": "ship_federal_assault_ship", "federation_gunship": "ship_federal_gunship",
+    "federation_corvette": "ship_federal_corvette", "typex": "ship_alliance_chieftain", "typex_2": "ship_alliance_crusader",
+    "typex_3": "ship_alliance_challenger", "krait_mkii": "ship_krait_mk_ii", "krait_light": "ship_krait_phantom",
+    "python": "ship_python", "python_nx": "ship_python_mk_ii", "ferdelance": "ship_fer_de_lance", "mamba": "ship_mamba",
+    "orca": "ship_orca", "belugaliner": "ship_beluga_liner", "anaconda": "ship_anaconda", "mandalay": "ship_mandalay",
+}
+
+# Module symbols with size, class and mount stripped (see module_base) to catalog IDs.
+MODULE_SYMBOLS = {
+    "armour_grade1": "armor_lightweight", "armour_grade2": "armor_reinforced", "armour_grade3": "armor_military",
+    "armour_mirrored": "armor_mirrored", "armour_reactive": "armor_reactive",
+    "int_hullreinforcement": "module_hrp", "int_modulereinforcement": "module_mrp",
+    "int_hyperdrive": "module_fsd", "int_hyperdrive_overcharge": "module_fsd", "int_powerplant": "module_power_plant",
+    "int_engine": "module_thrusters", "int_powerdistributor": "module_power_distributor",
+    "int_lifesupport": "module_life_support", "int_sensors": "module_sensors", "int_fueltank": "module_fuel_tank",
+    "int_fuelscoop": "module_fuel_scoop", "int_cargorack": "module_cargo_rack", "int_passengercabin": "module_passenger_cabin",
+    "int_fighterbay": "module_fighter_hangar", "int_refinery": "module_refinery",
+    "int_dronecontrol_collection": "module_limpet_controller_collect", "int_dronecontrol_prospector": "module_limpet_controller_prospect",
+    "int_detailedsurfacescanner": "module_detailed_surface_scanner", "int_repairer": "module_auto_field_maintenance_unit",
+    "int_shieldcellbank": "module_shield_cell_bank",
+    "hpt_beamlaser": "hardpoint_beam_laser", "hpt_pulselaser": "hardpoint_pulse_laser", "hpt_pulselaserburst": "hardpoint_burst_laser",
+    "hpt_multicannon": "hardpoint_multicannon", "hpt_cannon": "hardpoint_cannon", "hpt_railgun": "hardpoint_railgun",
+    "hpt_plasmaaccelerator": "hardpoint_plasma_accelerator", "hpt_slugshot": "hardpoint_fragment_cannon",
+    "hpt_mininglaser": "hardpoint_mining_laser", "hpt_basicmissilerack": "hardpoint_missile_rack",
+    "hpt_dumbfiremissilerack": "hardpoint_missile_rack", "hpt_advancedtorppylon": "hardpoint_torpedo_pylon",
+    "hpt_plasmashockcannon": "hardpoint_shock_cannon",
+    "hpt_shieldbooster": "utility_shield_booster", "hpt_chafflauncher": "utility_chaff_launcher",
+    "hpt_heatsinklauncher": "utility_heat_sink_launcher", "hpt_plasmapointdefence": "utility_point_defense",
+    "hpt_crimescanner": "utility_kill_warrant_scanner", "hpt_cargoscanner": "utility_manifest_scanner",
+    "hpt_xenoscanner": "utility_xeno_scanner", "hpt_cloudscanner": "utility_frame_shift_wake_scanner",
+    "hpt_electroniccountermeasure": "utility_electronic_countermeasure",
+}
+
+# Symbol tokens that describe a variant rather than the module itself
+VARIANT_TOKEN = re.compile(r"^(size\d+|class\d+|fixed|gimbal|turret|tiny|small|medium|large|huge|free|scatter|advanced|basic|strong)$")
+RATINGS = "EDCBA"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ships (id TEXT PRIMARY KEY, name TEXT NOT NULL, manufacturer TEXT, role TEXT, size TEXT, description TEXT);
+CREATE TABLE IF NOT EXISTS modules (id TEXT PRIMARY KEY, name TEXT NOT NULL, category TEXT, module_type TEXT, description TEXT);
+CREATE TABLE IF NOT EXISTS symbols (symbol TEXT PRIMARY KEY, kind TEXT NOT NULL, catalog_id TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def source_files() -> List[str]:
+    # ships_combined.json is merge_ships' output, so it would only duplicate the others
+    ships = [p for p in sorted(glob.glob(os.path.join(SHIPS_DIR, "ships_*.json"))) if not p.endswith("ships_combined.json")]
+    return ships + [MODULES_FILE]
+
+
+def sources_signature(paths: List[str]) -> str:
+    """Cheap change detector: names, sizes and mtimes of the source files, plus the symbol tables."""
+    parts = [f"{os.path.basename(p)}:{os.path.getsize(p)}:{int(os.path.getmtime(p))}" for p in paths if os.path.exists(p)]
+    parts.append(json.dumps([SHIP_SYMBOLS, MODULE_SYMBOLS], sort_keys=True))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def load_entries(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Skipping catalog source {path}: {e}")
+        return []
+    return [entry for entry in data if isinstance(entry, dict) and entry.get("id")] if isinstance(data, list) else []
+
+
+def compile_catalog(db_path: str = CATALOG_DB) -> None:
+    """(Re)builds the SQLite catalog from the ship and module JSON sources and the symbol tables."""
+    paths = source_files()
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executescript("DELETE FROM ships; DELETE FROM modules; DELETE FROM symbols;")
+        for path in paths[:-1]:
+            conn.executemany(
+                "INSERT OR REPLACE INTO ships VALUES (?, ?, ?, ?, ?, ?)",
+                [(e["id"], e.get("name", e["id"]), e.get("manufacturer"), e.get("role"), e.get("size"), e.get("description")) for e in load_entries(path)],
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO modules VALUES (?, ?, ?, ?, ?)",
+            [(e["id"], e.get("name", e["id"]), e.get("category"), e.get("module_type"), e.get("description")) for e in load_entries(paths[-1])],
+        )
+        conn.executemany("INSERT INTO symbols VALUES (?, 'ship', ?)", SHIP_SYMBOLS.items())
+        conn.executemany("INSERT INTO symbols VALUES (?, 'module', ?)", MODULE_SYMBOLS.items())
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('sources', ?)", (sources_signature(paths),))
+        conn.commit()
+    finally:
+        conn.close()
+    logging.info(f"🛠️ Compiled ship/module catalog: {db_path}")
+
+
+def open_catalog(db_path: str = CATALOG_DB) -> sqlite3.Connection:
+    """Opens the catalog, compiling it first if it is missing or its sources changed."""
+    signature = sources_signature(source_files())
+    stale = True
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+            stale = row is None or row[0] != signature
+        except sqlite3.DatabaseError:
+            pass
+        finally:
+            conn.close()
+    if stale:
+        compile_catalog(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def module_base(item: str) -> Tuple[str, Optional[str]]:
+    """
+    'int_hyperdrive_size5_class5' -> ('int_hyperdrive', '5A'),
+    'hpt_beamlaser_gimbal_medium' -> ('hpt_beamlaser', None),
+    'krait_mkii_armour_grade3' -> ('armour_grade3', None).
+    """
+    item = item.lower()
+    if "_armour_" in item:
+        return "armour_" + item.split("_armour_", 1)[1], None
+    tokens = item.split("_")
+    size = next((t[4:] for t in tokens if t.startswith("size") and t[4:].isdigit()), None)
+    grade = next((int(t[5:]) for t in tokens if t.startswith("class") and t[5:].isdigit()), None)
+    rating = f"{size}{RATINGS[grade - 1]}" if size and grade and 1 <= grade <= len(RATINGS) else None
+    return "_".join(t for t in tokens if not VARIANT_TOKEN.match(t)), rating
+
+
+class Catalog:
+    """In-memory view of the compiled catalog: every lookup is a dict access."""
+
+    def __init__(self, db_path: str = CATALOG_DB):
+        conn = open_catalog(db_path)
+        try:
+            ships = {row["id"]: dict(row) for row in conn.execute("SELECT * FROM ships")}
+            modules = {row["id"]: dict(row) for row in conn.execute("SELECT * FROM modules")}
+            self.ships: Dict[str, Dict[str, Any]] = {}
+            self.modules: Dict[str, Dict[str, Any]] = {}
+            for row in conn.execute("SELECT symbol, kind, catalog_id FROM symbols"):
+                table, target = (ships, self.ships) if row["kind"] == "ship" else (modules, self.modules)
+                if row["catalog_id"] in table:
+                    target[row["symbol"]] = table[row["catalog_id"]]
+        finally:
+            conn.close()
+
+    def ship(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.ships.get((symbol or "").lower())
+
+    def ship_name(self, symbol: str) -> str:
+        entry = self.ship(symbol)
+        return entry["name"] if entry else (symbol or "Unknown Ship").replace("_", " ").title()
+
+    def module(self, item: str) -> Optional[Dict[str, Any]]:
+        return self.modules.get(module_base(item or "")[0])
+
+    def module_name(self, item: str) -> str:
+        base, rating = module_base(item or "")
+        entry = self.modules.get(base)
+        name = entry["name"] if entry else base.split("_", 1)[-1].replace("_", " ").title()
+        return f"{rating} {name}" if rating else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile or query the ship/module catalog")
+    parser.add_argument("--compile", action="store_true", help="Rebuild the catalog even if its sources are unchanged")
+    parser.add_argument("--ship", help="Look up a journal ship symbol, e.g. krait_mkii")
+    parser.add_argument("--module", help="Look up a journal module symbol, e.g. int_hyperdrive_size5_class5")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if args.compile:
+        compile_catalog()
+    catalog = Catalog()
+    if args.ship:
+        entry = catalog.ship(args.ship)
+        print(f"🚀 {catalog.ship_name(args.ship)}" + (f" ({entry['manufacturer']}, {entry['role']})" if entry else " (not in catalog)"))
+    if args.module:
+        entry = catalog.module(args.module)
+        print(f"🔧 {catalog.module_name(args.module)}" + (f" ({entry['category']})" if entry else " (not in catalog)"))
+    if not (args.ship or args.module):
+        print(f"📚 {len(catalog.ships)} ship symbols, {len(catalog.modules)} module symbols mapped.")
+
+
+if __name__ == "__main__":
+    main()
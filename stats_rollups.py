@@ -0,0 +1,260 @@
+import os
+import json
+import sqlite3
+import argparse
+from datetime import date as date_cls
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from journal_trackers import STATE_DIR, JournalTracker, load_json
+
+ROLLUPS_FILE = os.path.join(STATE_DIR, "rollups.sqlite")
+LEGACY_ROLLUPS_JSON = os.path.join(STATE_DIR, "rollups.json")  # imported once, then removed
+PERIODS = ("day", "week", "month", "all")
+
+CREDIT_SOURCES = {
+    "bounty": "bounties",
+    "combat_bonds": "combat bonds",
+    "missions": "missions",
+    "trade": "trade sales",
+    "exploration": "exploration data",
+    "exobiology": "exobiology data",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    credits TEXT NOT NULL,
+    jumps INTEGER NOT NULL,
+    jump_distance_ly REAL NOT NULL,
+    missions_accepted INTEGER NOT NULL,
+    missions_completed INTEGER NOT NULL,
+    systems_visited INTEGER NOT NULL,
+    PRIMARY KEY (period, key)
+);
+CREATE TABLE IF NOT EXISTS bucket_systems (
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    system TEXT NOT NULL,
+    PRIMARY KEY (period, key, system)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+BucketKey = Tuple[str, str]  # (period, key)
+
+
+def period_keys(timestamp: str) -> Dict[str, str]:
+    """'2024-12-08T19:45:12Z' -> {'day': '2024-12-08', 'week': '2024-W49', 'month': '2024-12', 'all': 'all'}"""
+    day = timestamp[:10]
+    year, week, _ = date_cls.fromisoformat(day).isocalendar()
+    return {"day": day, "week": f"{year}-W{week:02d}", "month": day[:7], "all": "all"}
+
+
+def new_bucket() -> Dict[str, Any]:
+    return {
+        "credits": {},
+        "jumps": 0,
+        "jump_distance_ly": 0.0,
+        "missions_accepted": 0,
+        "missions_completed": 0,
+        "systems_visited": 0,
+    }
+
+
+def legacy_path(path: str) -> str:
+    """The rollups.json next to a rollups database (each commander partition had its own)."""
+    return os.path.join(os.path.dirname(path), os.path.basename(LEGACY_ROLLUPS_JSON))
+
+
+def connect(path: str = ROLLUPS_FILE) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if os.path.exists(legacy_path(path)):
+        import_legacy_json(conn, legacy_path(path))
+    return conn
+
+
+def import_legacy_json(conn: sqlite3.Connection, legacy: str) -> None:
+    """Moves the earlier rollups.json (a set of systems per bucket) into the database."""
+    data = load_json(legacy, {})
+    with conn:
+        for period, buckets in data.get("tables", {}).items():
+            for key, bucket in buckets.items():
+                systems = bucket.get("systems", [])
+                conn.executemany("INSERT OR IGNORE INTO bucket_systems VALUES (?, ?, ?)", [(period, key, system) for system in systems])
+                write_bucket(conn, period, key, dict(new_bucket(), **{k: v for k, v in bucket.items() if k != "systems"}, systems_visited=len(systems)))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_timestamp', ?)", (data.get("last_timestamp", ""),))
+    os.remove(legacy)
+
+
+def write_bucket(conn: sqlite3.Connection, period: str, key: str, bucket: Dict[str, Any]) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (period, key, json.dumps(bucket["credits"]), bucket["jumps"], bucket["jump_distance_ly"],
+         bucket["missions_accepted"], bucket["missions_completed"], bucket["systems_visited"]),
+    )
+
+
+def read_bucket(conn: sqlite3.Connection, period: str, key: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT * FROM buckets WHERE period = ? AND key = ?", (period, key)).fetchone()
+    if row is None:
+        return None
+    bucket = {name: row[name] for name in new_bucket()}
+    bucket["credits"] = json.loads(row["credits"])
+    return bucket
+
+
+class StatsRollups(JournalTracker):
+    """
+    Running totals per day, ISO week, month and all time: credits earned by source, jump
+    count and distance, missions accepted/completed and the number of distinct systems
+    visited. Each event updates four buckets, so ingest cost is O(new events).
+
+    Buckets live in SQLite, one row each, so reading a day for a prompt is one primary-key
+    lookup however long the history. The distinct systems behind each count are kept in
+    their own table; save() inserts the systems seen this run and bumps the count by the
+    ones that were new. Only the buckets touched by a run are loaded and written back.
+    """
+
+    EVENTS = frozenset({
+        "Bounty", "FactionKillBond", "MissionAccepted", "MissionCompleted", "MarketSell",
+        "SellExplorationData", "MultiSellExplorationData", "SellOrganicData",
+        "FSDJump", "CarrierJump", "Location",
+    })
+
+    def __init__(self, path: str = ROLLUPS_FILE):
+        self.conn = connect(path)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_timestamp'").fetchone()
+        self.last_timestamp: str = row["value"] if row else ""
+        self.touched: Dict[BucketKey, Dict[str, Any]] = {}
+        self.new_systems: Dict[BucketKey, Set[str]] = {}
+
+    def _buckets(self, timestamp: str) -> List[Tuple[BucketKey, Dict[str, Any]]]:
+        buckets = []
+        for period, key in period_keys(timestamp).items():
+            bucket = self.touched.get((period, key))
+            if bucket is None:
+                bucket = self.touched[(period, key)] = read_bucket(self.conn, period, key) or new_bucket()
+            buckets.append(((period, key), bucket))
+        return buckets
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+
+        credits = 0
+        source = None
+        if event_type == "Bounty":
+            source, credits = "bounty", event.get("TotalReward", event.get("Reward", 0))
+        elif event_type == "FactionKillBond":
+            source, credits = "combat_bonds", event.get("Reward", 0)
+        elif event_type == "MissionCompleted":
+            source, credits = "missions", event.get("Reward", 0)
+        elif event_type == "MarketSell":
+            source, credits = "trade", event.get("TotalSale", 0)
+        elif event_type in ("SellExplorationData", "MultiSellExplorationData"):
+            source, credits = "exploration", event.get("TotalEarnings", event.get("BaseValue", 0) + event.get("Bonus", 0))
+        elif event_type == "SellOrganicData":
+            source, credits = "exobiology", sum(item.get("Value", 0) + item.get("Bonus", 0) for item in event.get("BioData", []))
+
+        for bucket_key, bucket in self._buckets(timestamp):
+            if source:
+                bucket["credits"][source] = bucket["credits"].get(source, 0) + int(credits or 0)
+            elif event_type == "MissionAccepted":
+                bucket["missions_accepted"] += 1
+            elif event_type in ("FSDJump", "CarrierJump", "Location"):
+                if event_type == "FSDJump":
+                    bucket["jumps"] += 1
+                    bucket["jump_distance_ly"] += float(event.get("JumpDist", 0.0))
+                if event.get("StarSystem"):
+                    self.new_systems.setdefault(bucket_key, set()).add(event["StarSystem"])
+            if event_type == "MissionCompleted":
+                bucket["missions_completed"] += 1
+
+    def save(self) -> None:
+        with self.conn:
+            for (period, key), bucket in self.touched.items():
+                for system in self.new_systems.get((period, key), ()):
+                    cursor = self.conn.execute("INSERT OR IGNORE INTO bucket_systems VALUES (?, ?, ?)", (period, key, system))
+                    bucket["systems_visited"] += cursor.rowcount
+                write_bucket(self.conn, period, key, bucket)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_timestamp', ?)", (self.last_timestamp,))
+        self.touched.clear()
+        self.new_systems.clear()
+
+
+def load_bucket(period: str, key: str, path: str = ROLLUPS_FILE) -> Optional[Dict[str, Any]]:
+    """Reads one rollup bucket straight from disk, e.g. load_bucket("week", "2024-W49")."""
+    if not os.path.exists(path) and not os.path.exists(legacy_path(path)):
+        return None
+    conn = connect(path)
+    try:
+        return read_bucket(conn, period, key)
+    finally:
+        conn.close()
+
+
+def format_bucket(bucket: Dict[str, Any]) -> List[str]:
+    lines = []
+    credits = bucket.get("credits", {})
+    if credits:
+        total = sum(credits.values())
+        parts = ", ".join(f"{CREDIT_SOURCES.get(src, src)} {amount:,} Cr" for src, amount in sorted(credits.items(), key=lambda kv: -kv[1]) if amount)
+        lines.append(f"Earned **{total:,} Cr** ({parts}).")
+    if bucket.get("jumps"):
+        lines.append(f"Made **{bucket['jumps']} jumps** covering **{bucket['jump_distance_ly']:,.1f} ly**.")
+    if bucket.get("systems_visited"):
+        lines.append(f"Visited **{bucket['systems_visited']} systems**.")
+    if bucket.get("missions_accepted") or bucket.get("missions_completed"):
+        lines.append(f"Missions: **{bucket['missions_accepted']} accepted**, **{bucket['missions_completed']} completed**.")
+    return lines
+
+
+def stats_lines(date: str, path: str = ROLLUPS_FILE) -> List[str]:
+    """Ledger lines for a day, for the diary prompt. Accepts a date or a session ID."""
+    bucket = load_bucket("day", date[:10], path)
+    return format_bucket(bucket) if bucket else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query credits, jumps and mission rollups")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--day", help="YYYY-MM-DD")
+    group.add_argument("--week", help="ISO week, YYYY-Www (e.g. 2024-W49)")
+    group.add_argument("--month", help="YYYY-MM")
+    group.add_argument("--list", choices=PERIODS[:3], help="List every key recorded for a period")
+    args = parser.parse_args()
+
+    if args.list:
+        conn = connect()
+        for row in conn.execute("SELECT key FROM buckets WHERE period = ? ORDER BY key", (args.list,)):
+            print(row["key"])
+        return
+
+    period, key = "all", "all"
+    for candidate in ("day", "week", "month"):
+        if getattr(args, candidate):
+            period, key = candidate, getattr(args, candidate)
+
+    bucket = load_bucket(period, key)
+    if not bucket:
+        print(f"❌ No stats recorded for {period} {key}.")
+        return
+    print(f"📊 {period} {key}")
+    for line in format_bucket(bucket):
+        print(f"- {line.replace('**', '')}")
+    for source, amount in sorted(bucket["credits"].items()):
+        print(f"  {CREDIT_SOURCES.get(source, source):<18} {amount:>15,} Cr")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Canned sentences the stub stitches together; which ones is decided by a hash of the request.
+PHRASES = [
+    "The drives hummed all the way out past the nav beacon.",
+    "Docking control was short with me again, as usual.",
+    "Cargo racks rattled every time the Lancer dropped out of supercruise.",
+    "Somewhere behind me a Python pilot was taking notes on my route.",
+    "The station bar served something that claimed to be coffee.",
+    "I counted the credits twice and they still came up short of a new paint job.",
+    "A quiet system, a quiet jump, and far too much time to think.",
+    "Got word of another Thargoid sighting two sectors over.",
+]
+
+
+def stub_reply(messages: List[Dict[str, str]], words: int) -> str:
+    """A deterministic reply of about `words` words: the same request always gets the same text."""
+    seed = hashlib.sha1(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+    sentences: List[str] = []
+    count = 0
+    i = 0
+    while count < words:
+        sentence = PHRASES[seed[i % len(seed)] % len(PHRASES)]
+        sentences.append(sentence)
+        count += len(sentence.split())
+        i += 1
+    return " ".join(sentences) + "\n\n**[End of Log]**"
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Answers OpenAI-style /v1/chat/completions and /v1/completions requests like LM Studio would."""
+
+    latency = 0.0
+    token_latency = 0.0
+    reply_words = 200
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_error(400, "Invalid JSON")
+            return
+
+        messages = request.get("messages") or [{"role": "user", "content": request.get("prompt", "")}]
+        words = min(self.reply_words, int(request.get("max_tokens", self.reply_words)))
+        text = stub_reply(messages, words)
+        completion_tokens = len(text.split())
+        time.sleep(self.latency + self.token_latency * completion_tokens)
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        body = json.dumps({
+            "id": "stub-" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:12],
+            "object": "chat.completion",
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "text": text, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug("stub llm: " + format % args)
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, token_latency: float = 0.0, reply_words: int = 200,
+                      host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Starts the stub in a daemon thread and returns the server; its URL is
+    f"http://{host}:{server.server_address[1]}/v1/chat/completions". Call shutdown() when done.
+
+    Args:
+        port (int): 0 picks a free port.
+        latency (float): Seconds added to every response.
+        token_latency (float): Extra seconds per generated word, to mimic generation speed.
+        reply_words (int): Upper bound on reply length (also capped by the request's max_tokens).
+    """
+    handler = type("ConfiguredStubLLMHandler", (StubLLMHandler,), {
+        "latency": latency, "token_latency": token_latency, "reply_words": reply_words,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1/chat/completions"
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Deterministic offline stand-in for the LM Studio server")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Extra seconds per generated word")
+    parser.add_argument("--reply-words", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    server = start_stub_server(args.port, args.latency, args.token_latency, args.reply_words)
+    logging.info(f"🤖 Stub LLM listening on {stub_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
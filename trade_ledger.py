@@ -0,0 +1,247 @@
+import os
+import argparse
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List
+
+from inventory_tracker import normalize_name
+from journal_trackers import STATE_DIR, JournalTracker, load_json, write_json_atomic
+
+LEDGER_FILE = os.path.join(STATE_DIR, "trade_ledger.json")
+RECENT_DAYS_KEPT = 7
+MAX_FLOWS_LISTED = 5
+UNKNOWN_MARKET = "an unknown market"
+
+# Cargo picked up for free (mining, salvage, mission cargo) has a zero cost basis
+FREE_CARGO_EVENTS = frozenset({"MiningRefined", "CollectCargo"})
+
+
+def market_label(station: str, system: str = "") -> str:
+    """'Jameson Memorial (Shinrarta Dezhra)': station names repeat across systems, so routes key on both."""
+    return f"{station} ({system})" if system else station
+
+
+def route_key(bought_at: str, sold_at: str) -> str:
+    return f"{bought_at} → {sold_at}"
+
+
+class TradeLedger(JournalTracker):
+    """
+    Realized trade profit from the market event stream.
+
+    Each commodity keeps a deque of FIFO lots [units, unit cost, market]. A sale consumes
+    the oldest lots first, so its profit is the sale price minus what those exact units
+    cost, and it is credited to the route(s) bought at → sold at. Units sold without a
+    matching lot (cargo from before tracking began) count at the game's AvgPricePaid.
+
+    Lots, all-time route and commodity totals and per-day totals are checkpointed together
+    with last_timestamp, so a re-ingest resumes rather than replaying history. The last
+    RECENT_DAYS_KEPT days of individual trades back the daily and session summaries.
+    """
+
+    EVENTS = frozenset({
+        "Docked", "Location", "MarketBuy", "MarketSell", "EjectCargo", "Died",
+        "MiningRefined", "CollectCargo",
+    })
+
+    def __init__(self, path: str = LEDGER_FILE):
+        self.path = path
+        data = load_json(path, {})
+        self.last_timestamp: str = data.get("last_timestamp", "")
+        self.station: str = data.get("station", UNKNOWN_MARKET)
+        self.markets: Dict[str, str] = data.get("markets", {})  # MarketID -> market_label
+        self.names: Dict[str, str] = data.get("names", {})  # commodity -> display name
+        self.lots: Dict[str, Deque[List[Any]]] = {name: deque(lots) for name, lots in data.get("lots", {}).items()}
+        # {key: {"units", "revenue", "cost", "profit", "sales"}} for routes, commodities and days
+        self.routes: Dict[str, Dict[str, int]] = data.get("routes", {})
+        self.commodities: Dict[str, Dict[str, int]] = data.get("commodities", {})
+        self.days: Dict[str, Dict[str, int]] = data.get("days", {})
+        # [[timestamp, "buy"/"sell", commodity, bought at, sold at, units, revenue, cost], ...]
+        self.recent: List[List[Any]] = data.get("recent", [])
+
+    # --- ingest ---------------------------------------------------------
+
+    def _market(self, event: Dict[str, Any]) -> str:
+        market_id = event.get("MarketID")
+        return self.markets.get(str(market_id), self.station) if market_id is not None else self.station
+
+    def _commodity(self, event: Dict[str, Any], key: str = "Type") -> str:
+        name = normalize_name(event.get(key, ""))
+        localised = event.get(f"{key}_Localised")
+        if localised and name not in self.names:
+            self.names[name] = localised
+        return name
+
+    def _consume(self, commodity: str, units: int) -> List[List[Any]]:
+        """Takes units off the oldest lots; returns [[units, unit cost, station], ...] actually covered."""
+        lots = self.lots.get(commodity)
+        taken = []
+        while units > 0 and lots:
+            lot = lots[0]
+            used = min(units, lot[0])
+            taken.append([used, lot[1], lot[2]])
+            units -= used
+            lot[0] -= used
+            if lot[0] == 0:
+                lots.popleft()
+        if lots is not None and not lots:
+            del self.lots[commodity]
+        return taken
+
+    @staticmethod
+    def _add(table: Dict[str, Dict[str, int]], key: str, units: int, revenue: int, cost: int, sales: int = 1) -> None:
+        row = table.setdefault(key, {"units": 0, "revenue": 0, "cost": 0, "profit": 0, "sales": 0})
+        row["units"] += units
+        row["revenue"] += revenue
+        row["cost"] += cost
+        row["profit"] += revenue - cost
+        row["sales"] += sales
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+
+        if event_type in ("Docked", "Location"):
+            if event_type == "Location" and not event.get("Docked"):
+                return
+            station = event.get("StationName")
+            self.station = market_label(station, event.get("StarSystem", "")) if station else UNKNOWN_MARKET
+            if event.get("MarketID") is not None:
+                self.markets[str(event["MarketID"])] = self.station
+        elif event_type == "Died":
+            self.lots.clear()
+        elif event_type == "EjectCargo":
+            self._consume(self._commodity(event), int(event.get("Count", 0)))
+        elif event_type in FREE_CARGO_EVENTS:
+            commodity = self._commodity(event)
+            self.lots.setdefault(commodity, deque()).append([int(event.get("Count", 1)), 0, self.station])
+        elif event_type == "MarketBuy":
+            commodity = self._commodity(event)
+            units = int(event.get("Count", 0))
+            if units <= 0:
+                return
+            station = self._market(event)
+            cost = int(event.get("TotalCost", units * event.get("BuyPrice", 0)))
+            self.lots.setdefault(commodity, deque()).append([units, cost / units, station])
+            self.recent.append([timestamp, "buy", commodity, station, None, units, 0, cost])
+        elif event_type == "MarketSell":
+            self._sell(timestamp, event)
+
+    def _sell(self, timestamp: str, event: Dict[str, Any]) -> None:
+        commodity = self._commodity(event)
+        units = int(event.get("Count", 0))
+        if units <= 0:
+            return
+        sold_at = self._market(event)
+        unit_price = event.get("TotalSale", units * event.get("SellPrice", 0)) / units
+
+        covered = self._consume(commodity, units)
+        uncovered = units - sum(used for used, _, _ in covered)
+        if uncovered:
+            covered.append([uncovered, event.get("AvgPricePaid", 0), UNKNOWN_MARKET])
+
+        day = timestamp[:10]
+        for i, (used, unit_cost, bought_at) in enumerate(covered):
+            revenue, cost = round(used * unit_price), round(used * unit_cost)
+            self._add(self.routes, route_key(bought_at, sold_at), used, revenue, cost)
+            # One sale split across lots from several stations is still one sale of the commodity
+            self._add(self.commodities, commodity, used, revenue, cost, int(i == 0))
+            self._add(self.days, day, used, revenue, cost, int(i == 0))
+            self.recent.append([timestamp, "sell", commodity, bought_at, sold_at, used, revenue, cost])
+
+    # --- persistence ----------------------------------------------------
+
+    def save(self) -> None:
+        if self.recent:
+            cutoff = (datetime.fromisoformat(self.last_timestamp.replace("Z", "")) - timedelta(days=RECENT_DAYS_KEPT)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.recent = [record for record in self.recent if record[0] >= cutoff]
+        write_json_atomic(self.path, {
+            "last_timestamp": self.last_timestamp,
+            "station": self.station,
+            "markets": self.markets,
+            "names": self.names,
+            "lots": {name: list(lots) for name, lots in self.lots.items()},
+            "routes": self.routes,
+            "commodities": self.commodities,
+            "days": self.days,
+            "recent": self.recent,
+        })
+
+    # --- summaries ------------------------------------------------------
+
+    def display(self, commodity: str) -> str:
+        return self.names.get(commodity, commodity.replace("_", " ").title())
+
+    def _trade_lines(self, records: List[List[Any]]) -> List[str]:
+        bought_units = bought_cost = 0
+        flows: Dict[tuple, List[int]] = {}
+        for _, kind, commodity, bought_at, sold_at, units, revenue, cost in records:
+            if kind == "buy":
+                bought_units += units
+                bought_cost += cost
+                continue
+            flow = flows.setdefault((commodity, bought_at, sold_at), [0, 0, 0])
+            flow[0] += units
+            flow[1] += revenue
+            flow[2] += revenue - cost
+        if not bought_units and not flows:
+            return []
+
+        lines = []
+        if bought_units:
+            lines.append(f"Bought **{bought_units:,} units** of cargo for **{bought_cost:,} Cr**.")
+        if flows:
+            sold = sum(flow[0] for flow in flows.values())
+            revenue = sum(flow[1] for flow in flows.values())
+            profit = sum(flow[2] for flow in flows.values())
+            lines.append(f"Sold **{sold:,} units** for **{revenue:,} Cr**, a realized {'profit' if profit >= 0 else 'loss'} of **{abs(profit):,} Cr**.")
+            ranked = sorted(flows.items(), key=lambda kv: -kv[1][2])
+            # Each run leads with its own commodity and route: compress_activities groups lines by the text before "**"
+            for (commodity, bought_at, sold_at), (units, _, flow_profit) in ranked[:MAX_FLOWS_LISTED]:
+                outcome = f"a profit of **{flow_profit:,} Cr**" if flow_profit >= 0 else f"a loss of **{-flow_profit:,} Cr**"
+                lines.append(f"{self.display(commodity)} run {route_key(bought_at, sold_at)}: **{units:,} units** for {outcome}.")
+            if len(ranked) > MAX_FLOWS_LISTED:
+                lines.append(f"…and {len(ranked) - MAX_FLOWS_LISTED} smaller runs.")
+        return lines
+
+    def daily_summary(self, date: str) -> Dict[str, List[str]]:
+        lines = self._trade_lines([record for record in self.recent if record[0][:10] == date])
+        return {"Trade": lines} if lines else {}
+
+    def session_summary(self, start: str, end: str) -> Dict[str, List[str]]:
+        lines = self._trade_lines([record for record in self.recent if start <= record[0] <= end])
+        return {"Trade": lines} if lines else {}
+
+    def rankings(self, table: str = "routes", limit: int = 10, key: str = "profit") -> List[tuple]:
+        """Top entries of the routes, commodities or days table by profit (or units/revenue/sales)."""
+        rows = getattr(self, table)
+        return sorted(rows.items(), key=lambda kv: -kv[1][key])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank trade routes, commodities and days by realized profit")
+    parser.add_argument("--by", choices=("routes", "commodities", "days"), default="routes")
+    parser.add_argument("--sort", choices=("profit", "units", "revenue", "sales"), default="profit")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--lots", action="store_true", help="Show the open FIFO lots still in the hold")
+    args = parser.parse_args()
+
+    ledger = TradeLedger()
+    if args.lots:
+        for commodity, lots in sorted(ledger.lots.items()):
+            for units, unit_cost, station in lots:
+                print(f"- {ledger.display(commodity)}: {units:,} @ {unit_cost:,.0f} Cr from {station}")
+        return
+
+    for rank, (key, row) in enumerate(ledger.rankings(args.by, args.limit, args.sort), start=1):
+        label = ledger.display(key) if args.by == "commodities" else key
+        margin = row["profit"] / row["units"] if row["units"] else 0
+        print(f"{rank:>3}. {label}: {row['profit']:,} Cr profit on {row['units']:,} units "
+              f"({margin:,.0f} Cr/unit, {row['sales']} sales)")
+
+
+if __name__ == "__main__":
+    main()
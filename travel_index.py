@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from journal_trackers import STATE_DIR, JournalTracker
+
+TRAVEL_DB = os.path.join(STATE_DIR, "travel_index.sqlite")
+MIN_RETURN_GAP_DAYS = 7  # shorter absences are not worth a "returned after N days" line
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS systems (
+    name TEXT PRIMARY KEY,
+    first_visit TEXT NOT NULL,
+    last_visit TEXT NOT NULL,
+    visits INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS systems_first_visit ON systems (first_visit);
+-- Case-insensitive lookups ("sol" finds Sol) use this; the primary key compares case-sensitively
+CREATE INDEX IF NOT EXISTS systems_name_nocase ON systems (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS stations (
+    name TEXT NOT NULL,
+    system TEXT NOT NULL,
+    first_visit TEXT NOT NULL,
+    last_visit TEXT NOT NULL,
+    visits INTEGER NOT NULL,
+    PRIMARY KEY (name, system)
+);
+CREATE INDEX IF NOT EXISTS stations_first_visit ON stations (first_visit);
+CREATE TABLE IF NOT EXISTS jumps (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    last_jump TEXT NOT NULL,
+    PRIMARY KEY (origin, destination)
+);
+CREATE TABLE IF NOT EXISTS returns (
+    system TEXT NOT NULL,
+    visit TEXT NOT NULL,
+    gap_days INTEGER NOT NULL,
+    PRIMARY KEY (system, visit)
+);
+CREATE INDEX IF NOT EXISTS returns_visit ON returns (visit);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def connect(path: str = TRAVEL_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def day_range(date: str):
+    """Bounds that select every ISO timestamp on a day with an indexed range scan."""
+    return date[:10], date[:10] + "~"
+
+
+def days_between(earlier: str, later: str) -> int:
+    parse = lambda ts: datetime.fromisoformat(ts.replace("Z", ""))
+    return (parse(later) - parse(earlier)).days
+
+
+class TravelIndex(JournalTracker):
+    """
+    Persistent visit index: systems and stations with first/last visit and visit counts,
+    jump edges with counts, and notable returns. Stored in SQLite with primary-key
+    upserts, so each event is a constant number of indexed writes and lookups such as
+    "when did I last visit Sol" never scan the summaries.
+    """
+
+    EVENTS = frozenset({"FSDJump", "CarrierJump", "Location", "Docked"})
+
+    def __init__(self, path: str = TRAVEL_DB):
+        self.conn = connect(path)
+        self.current_system = self._meta("current_system")
+        self.last_timestamp = self._meta("last_timestamp") or ""
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _visit_system(self, system: str, timestamp: str) -> None:
+        row = self.conn.execute("SELECT last_visit FROM systems WHERE name = ?", (system,)).fetchone()
+        if row is None:
+            self.conn.execute("INSERT INTO systems VALUES (?, ?, ?, 1)", (system, timestamp, timestamp))
+            return
+        gap = days_between(row["last_visit"], timestamp)
+        if gap >= MIN_RETURN_GAP_DAYS:
+            self.conn.execute("INSERT OR REPLACE INTO returns VALUES (?, ?, ?)", (system, timestamp, gap))
+        self.conn.execute("UPDATE systems SET last_visit = ?, visits = visits + 1 WHERE name = ?", (timestamp, system))
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        timestamp = event.get("timestamp", "")
+        if not timestamp or timestamp < self.last_timestamp:
+            return
+        self.last_timestamp = timestamp
+        event_type = event.get("event")
+        system = event.get("StarSystem")
+        if not system:
+            return
+
+        if event_type == "Docked":
+            station = event.get("StationName", "Unknown Station")
+            self.conn.execute(
+                "INSERT INTO stations VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (name, system) DO UPDATE SET last_visit = excluded.last_visit, visits = visits + 1",
+                (station, system, timestamp, timestamp),
+            )
+            return
+
+        if system == self.current_system:
+            return  # Location re-reported on login, or a carrier jump we already saw
+        if event_type in ("FSDJump", "CarrierJump") and self.current_system:
+            self.conn.execute(
+                "INSERT INTO jumps VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (origin, destination) DO UPDATE SET count = count + 1, last_jump = excluded.last_jump",
+                (self.current_system, system, timestamp),
+            )
+        self._visit_system(system, timestamp)
+        self.current_system = system
+
+    def save(self) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("current_system", self.current_system), ("last_timestamp", self.last_timestamp)],
+        )
+        self.conn.commit()
+
+
+def system_visits(conn: sqlite3.Connection, system: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT * FROM systems WHERE name = ? COLLATE NOCASE", (system,)).fetchone()
+    return dict(row) if row else None
+
+
+def most_visited_stations(conn: sqlite3.Connection, limit: int = 10) -> List[Dict[str, Any]]:
+    return [dict(row) for row in conn.execute("SELECT * FROM stations ORDER BY visits DESC LIMIT ?", (limit,))]
+
+
+def busiest_routes(conn: sqlite3.Connection, limit: int = 10) -> List[Dict[str, Any]]:
+    return [dict(row) for row in conn.execute("SELECT * FROM jumps ORDER BY count DESC LIMIT ?", (limit,))]
+
+
+def travel_facts(date: str, path: str = TRAVEL_DB) -> List[str]:
+    """First visits and long-awaited returns on a day, for the diary prompt. Accepts a date or a session ID."""
+    if not os.path.exists(path):
+        return []
+    start, end = day_range(date)
+    conn = connect(path)
+    try:
+        facts = [
+            f"First ever visit to **{row['name']}**."
+            for row in conn.execute("SELECT name FROM systems WHERE first_visit >= ? AND first_visit < ? ORDER BY first_visit", (start, end))
+        ]
+        facts += [
+            f"First time docking at **{row['name']}** in **{row['system']}**."
+            for row in conn.execute("SELECT name, system FROM stations WHERE first_visit >= ? AND first_visit < ? ORDER BY first_visit", (start, end))
+        ]
+        facts += [
+            f"Back in **{row['system']}** after **{row['gap_days']} days** away."
+            for row in conn.execute("SELECT system, gap_days FROM returns WHERE visit >= ? AND visit < ? ORDER BY visit", (start, end))
+        ]
+        return facts
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the travel index of visited systems and stations")
+    parser.add_argument("--system", help="Show first/last visit and visit count for a system")
+    parser.add_argument("--top-stations", type=int, metavar="N", help="Most visited stations")
+    parser.add_argument("--top-routes", type=int, metavar="N", help="Most flown jump edges")
+    parser.add_argument("--date", help="Travel facts for a day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    conn = connect()
+    if args.system:
+        visit = system_visits(conn, args.system)
+        if visit:
+            print(f"🪐 {visit['name']}: {visit['visits']} visits, first {visit['first_visit']}, last {visit['last_visit']}")
+        else:
+            print(f"❌ Never visited {args.system}.")
+    if args.top_stations:
+        for row in most_visited_stations(conn, args.top_stations):
+            print(f"{row['visits']:>5}  {row['name']} ({row['system']}), last {row['last_visit']}")
+    if args.top_routes:
+        for row in busiest_routes(conn, args.top_routes):
+            print(f"{row['count']:>5}  {row['origin']} → {row['destination']}")
+    if args.date:
+        for fact in travel_facts(args.date):
+            print(f"- {fact.replace('**', '')}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import span
+
+# === PATHS ===
+BASE_DIR = os.path.dirname(__file__)
+CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+CHROMA_DB_PATH = "elite_rag_db"
+LORE_COLLECTION_NAME = "elite_dangerous_lore"
+COLLECTION_VERSION_PATH = os.path.join(CHROMA_DB_PATH, "collection_version.json")
+
+# Rows decoded per step when scoring a float16/int8 matrix, to bound the float32 scratch space.
+SCORE_BLOCK_ROWS = 65536
+
+# Chroma's own defaults are L2 space, M=16, construction_ef=100, search_ef=10.
+# MiniLM embeddings are compared by cosine similarity, so that is our default.
+DEFAULT_VECTOR_SETTINGS: Dict[str, Any] = {
+    "backend": "chroma",
+    "distance": "cosine",
+    "hnsw_m": 16,
+    "hnsw_ef_construction": 200,
+    "hnsw_ef_search": 64,
+    "quantization": "float32",
+    "keep_float32": True,
+    "rescore_factor": 4,
+}
+
+VALID_DISTANCES = ("cosine", "l2", "ip")
+VALID_BACKENDS = ("chroma", "numpy")
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """Loads config.json, returning an empty dict if it is missing."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_vector_settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merges the "vector_store" block of config.json over DEFAULT_VECTOR_SETTINGS.
+
+    Args:
+        config (Dict[str, Any], optional): Parsed config; loaded from CONFIG_PATH when omitted.
+    """
+    if config is None:
+        config = load_config()
+    settings = dict(DEFAULT_VECTOR_SETTINGS)
+    settings.update(config.get("vector_store", {}) or {})
+    if settings["distance"] not in VALID_DISTANCES:
+        raise ValueError(f"Unsupported distance '{settings['distance']}', expected one of {VALID_DISTANCES}")
+    if settings["backend"] not in VALID_BACKENDS:
+        raise ValueError(f"Unsupported backend '{settings['backend']}', expected one of {VALID_BACKENDS}")
+    if settings["backend"] == "numpy" and settings["distance"] != "cosine":
+        # The exported matrix holds unit-length rows, so it can only rank by cosine similarity
+        raise ValueError(f"The numpy backend only supports cosine distance, not '{settings['distance']}'")
+    if settings["quantization"] not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization '{settings['quantization']}', expected one of {QUANTIZATIONS}")
+    return settings
+
+
+def hnsw_metadata(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Translates vector settings into the collection metadata keys Chroma understands."""
+    return {
+        "hnsw:space": settings["distance"],
+        "hnsw:M": int(settings["hnsw_m"]),
+        "hnsw:construction_ef": int(settings["hnsw_ef_construction"]),
+        "hnsw:search_ef": int(settings["hnsw_ef_search"]),
+    }
+
+
+def get_lore_collection(chroma_client, settings: Optional[Dict[str, Any]] = None, name: str = LORE_COLLECTION_NAME):
+    """
+    Opens (or creates) the lore collection with the configured HNSW parameters.
+
+    The distance metric, M and construction_ef are fixed once the index is built; if the
+    stored collection disagrees with config.json a warning is logged and the collection
+    must be rebuilt (delete elite_rag_db/ and re-run rag_data_loader.py) to pick them up.
+
+    Args:
+        chroma_client: A chromadb client.
+        settings (Dict[str, Any], optional): Output of load_vector_settings().
+        name (str): Collection name.
+    """
+    if settings is None:
+        settings = load_vector_settings()
+    wanted = hnsw_metadata(settings)
+    collection = chroma_client.get_or_create_collection(name, metadata=wanted)
+
+    existing = collection.metadata or {}
+    stale = {
+        key: (existing.get(key), value)
+        for key, value in wanted.items()
+        if key != "hnsw:search_ef" and existing.get(key, value) != value
+    }
+    if stale:
+        logging.warning(f"⚠️ Collection '{name}' was built with different HNSW settings {stale}; rebuild it to apply config.json.")
+    return collection
+
+
+def read_collection_version(path: str = COLLECTION_VERSION_PATH) -> int:
+    """Returns the lore collection's change counter (0 if it has never been bumped)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("version", 0))
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def bump_collection_version(path: str = COLLECTION_VERSION_PATH) -> int:
+    """Increments the change counter; anything cached against the old version becomes stale."""
+    version = read_collection_version(path) + 1
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": version}, f)
+    return version
+
+
+def knowledge_text(entry: Dict[str, Any]) -> str:
+    """Renders a RAG knowledge entry into the text that gets embedded and stored."""
+    return (
+        f"{entry['name']}: {entry['description']} "
+        f"(Capital: {entry.get('capital', 'Unknown')}, Leader: {entry.get('leader', 'Unknown')})"
+    )
+
+
+class RetrievalBackend:
+    """Answers nearest-neighbour queries over the lore corpus."""
+
+    def query(self, embeddings: np.ndarray, top_k: int) -> List[List[str]]:
+        """
+        Returns the stored texts of the top_k nearest entries for each query embedding.
+
+        Args:
+            embeddings (np.ndarray): Query embeddings, shape (n_queries, dim).
+            top_k (int): Neighbours per query.
+        """
+        raise NotImplementedError
+
+
+class ChromaBackend(RetrievalBackend):
+    """Queries a Chroma collection (persistent SQLite metadata + HNSW index)."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def query(self, embeddings: np.ndarray, top_k: int) -> List[List[str]]:
+        embeddings = np.atleast_2d(np.asarray(embeddings))
+        with span("vector.query", backend="chroma", queries=len(embeddings), top_k=top_k):
+            results = self.collection.query(query_embeddings=embeddings.tolist(), n_results=top_k)
+        return [
+            [md["text"] for md in metadatas if md and md.get("text")]
+            for metadatas in results.get("metadatas") or []
+        ]
+
+
+class NumpyBackend(RetrievalBackend):
+    """
+    Exact brute-force search over a memory-mapped, L2-normalised embedding matrix.
+    Rows and queries are unit length, so this always ranks by cosine similarity;
+    load_vector_settings rejects any other distance for this backend.
+
+    For a corpus of a few thousand entries one matrix multiply is cheaper than an HNSW
+    walk, and startup is just an mmap plus a small JSON read. The matrix may be stored
+    as float16 or per-vector scaled int8; in that case the best rescore_factor * top_k
+    candidates are re-ranked against the float32 matrix when it was kept on disk.
+    """
+
+    def __init__(self, index_dir: str = CHROMA_DB_PATH, quantization: str = "float32", rescore_factor: int = 4):
+        paths = numpy_index_paths(index_dir, quantization)
+        self.quantization = quantization
+        self.rescore_factor = max(int(rescore_factor), 1)
+        self.matrix = np.load(paths["vectors"], mmap_mode="r")
+        self.scales = np.load(paths["scales"], mmap_mode="r") if quantization == "int8" else None
+        self.full = None
+        if quantization != "float32" and os.path.exists(paths["float32"]):
+            self.full = np.load(paths["float32"], mmap_mode="r")
+        with open(paths["texts"], "r", encoding="utf-8") as f:
+            self.texts: List[str] = json.load(f)
+        if len(self.texts) != self.matrix.shape[0]:
+            raise ValueError(f"{paths['texts']} has {len(self.texts)} texts but {paths['vectors']} has {self.matrix.shape[0]} vectors")
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """Similarity of each query to every stored vector, decoding quantized rows block by block."""
+        if self.quantization == "float32":
+            return queries @ self.matrix.T
+        out = np.empty((len(queries), len(self.texts)), dtype=np.float32)
+        for start in range(0, len(self.texts), SCORE_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            out[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def query(self, embeddings: np.ndarray, top_k: int) -> List[List[str]]:
+        queries = normalize_rows(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        with span("vector.query", backend="numpy", quantization=self.quantization, queries=len(queries), top_k=top_k):
+            return self._query(queries, top_k)
+
+    def _query(self, queries: np.ndarray, top_k: int) -> List[List[str]]:
+        top_k = min(top_k, len(self.texts))
+        if top_k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = self.scores(queries)
+        n_candidates = top_k if self.full is None else min(top_k * self.rescore_factor, len(self.texts))
+        top = np.argpartition(-scores, n_candidates - 1, axis=1)[:, :n_candidates]
+        if self.full is None:
+            top_scores = np.take_along_axis(scores, top, axis=1)
+        else:
+            # Only the candidate rows of the float32 matrix are paged in.
+            top_scores = np.einsum("qkd,qd->qk", np.asarray(self.full[top], dtype=np.float32), queries)
+        order = np.argsort(-top_scores, axis=1)[:, :top_k]
+        ranked = np.take_along_axis(top, order, axis=1)
+        return [[self.texts[i] for i in row] for row in ranked]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scales each row to unit length so a dot product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization. Returns (codes, scales) with row ~= codes * scale."""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def numpy_index_paths(index_dir: str = CHROMA_DB_PATH, quantization: str = "float32") -> Dict[str, str]:
+    """File locations of the NumPy index for a given storage format."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization '{quantization}', expected one of {QUANTIZATIONS}")
+    float32_path = os.path.join(index_dir, "lore_vectors.npy")
+    return {
+        "texts": os.path.join(index_dir, "lore_texts.json"),
+        "float32": float32_path,
+        "vectors": float32_path if quantization == "float32" else os.path.join(index_dir, f"lore_vectors_{quantization}.npy"),
+        "scales": os.path.join(index_dir, "lore_scales_int8.npy"),
+    }
+
+
+def write_numpy_index(texts: List[str], embeddings, index_dir: str = CHROMA_DB_PATH, quantization: str = "float32", keep_float32: bool = True) -> None:
+    """
+    Writes the matrix and texts files read by NumpyBackend.
+
+    Args:
+        texts (List[str]): Stored text for each row.
+        embeddings: Matching embeddings, shape (len(texts), dim).
+        index_dir (str): Directory the files are written to.
+        quantization (str): "float32", "float16" or "int8".
+        keep_float32 (bool): Also keep the float32 matrix so quantized results can be re-scored.
+    """
+    paths = numpy_index_paths(index_dir, quantization)
+    matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1))
+    os.makedirs(index_dir, exist_ok=True)
+
+    if quantization == "float16":
+        np.save(paths["vectors"], matrix.astype(np.float16))
+    elif quantization == "int8":
+        codes, scales = quantize_int8(matrix)
+        np.save(paths["vectors"], codes)
+        np.save(paths["scales"], scales)
+
+    if quantization == "float32" or keep_float32:
+        np.save(paths["float32"], matrix)
+    elif os.path.exists(paths["float32"]):
+        os.remove(paths["float32"])
+
+    with open(paths["texts"], "w", encoding="utf-8") as f:
+        json.dump(texts, f)
+
+
+def export_numpy_index(collection, settings: Optional[Dict[str, Any]] = None) -> int:
+    """Dumps every entry of a Chroma collection into the NumPy backend files. Returns the entry count."""
+    if settings is None:
+        settings = load_vector_settings()
+    stored = collection.get(include=["embeddings", "metadatas"])
+    texts = [(md or {}).get("text", "") for md in stored.get("metadatas") or []]
+    embeddings = stored.get("embeddings")
+    if embeddings is None or len(texts) == 0:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+    write_numpy_index(texts, embeddings, quantization=settings["quantization"], keep_float32=settings["keep_float32"])
+    return len(texts)
+
+
+def open_retrieval_backend(settings: Optional[Dict[str, Any]] = None) -> RetrievalBackend:
+    """
+    Opens the backend selected by the "backend" key of the vector settings.
+
+    The NumPy backend needs the files written by rag_data_loader.py; if they are missing
+    we fall back to Chroma so retrieval keeps working.
+    """
+    if settings is None:
+        settings = load_vector_settings()
+
+    if settings["backend"] == "numpy":
+        paths = numpy_index_paths(CHROMA_DB_PATH, settings["quantization"])
+        if os.path.exists(paths["vectors"]) and os.path.exists(paths["texts"]):
+            return NumpyBackend(CHROMA_DB_PATH, settings["quantization"], settings["rescore_factor"])
+        logging.warning(f"⚠️ NumPy index not found at {paths['vectors']}; falling back to Chroma. Re-run rag_data_loader.py.")
+
+    import chromadb
+    chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    return ChromaBackend(get_lore_collection(chroma_client, settings))